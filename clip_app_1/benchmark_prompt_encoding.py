@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compact transcript encoding against the timestamp format.
+
+For each transcript this prints prompt tokens for:
+1. The current "[HH:MM:SS - HH:MM:SS] text" format
+2. The compact format (segment IDs, relative offsets, merged segments)
+3. Compact with far-context summaries outside a focus range
+
+as a signed change against the timestamp format (negative = fewer
+tokens), the segment count above which compact pays off once its longer
+system prompt is included, and checks the round trip: segment-ID answers
+resolve back to absolute times that cover the source segments.
+
+Usage:
+    python benchmark_prompt_encoding.py [transcript.json ...] [--repeat N]
+
+--repeat tiles each transcript N times (shifted in time) to approximate
+long videos from the short samples in test_output/.
+"""
+
+import argparse
+import copy
+import json
+import math
+from pathlib import Path
+
+from utils.helpers import format_timestamp, parse_timestamp
+from utils.transcript_encoding import CompactTranscript, segment_bounds, segment_text
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+DEFAULT_TRANSCRIPTS = [
+    Path("test_output/transcript_romanized.json"),
+    Path("test_output_audio/transcript_romanized.json"),
+]
+
+PROMPTS_DIR = Path(__file__).resolve().parent / "prompts"
+# Longest transcript (in segments) searched for the break-even point
+BREAK_EVEN_LIMIT = 20000
+
+LEGACY_ANSWER = {"start_time": "00:12:04", "end_time": "00:12:36", "duration_seconds": 32}
+COMPACT_ANSWER = {"start_id": 214, "end_id": 221, "duration_seconds": 32}
+
+
+def count_tokens(text: str) -> int:
+    """tiktoken when installed, else the ClipSelector heuristic"""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) // 2
+
+
+def legacy_format(segments):
+    """Same output as ClipSelector._format_transcript (timestamps mode)"""
+    lines = []
+    for seg in segments:
+        start, end = segment_bounds(seg)
+        lines.append(f"[{format_timestamp(start)} - {format_timestamp(end)}] {segment_text(seg)}")
+    return "\n".join(lines)
+
+
+def signed_change(tokens, baseline):
+    """Percent change against the timestamp format, e.g. -32% or +5%"""
+    return f"{100 * (tokens / baseline - 1):+.0f}%"
+
+
+def system_prompt_overhead():
+    """Extra tokens the compact system prompt costs per request"""
+    try:
+        legacy = (PROMPTS_DIR / "clip_selector_system.txt").read_text(encoding='utf-8')
+        compact = (PROMPTS_DIR / "clip_selector_system_compact.txt").read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return 0
+    return count_tokens(compact) - count_tokens(legacy)
+
+
+def break_even(segments, overhead):
+    """
+    Smallest segment count at which compact (transcript + system prompt
+    overhead) is cheaper than timestamps, or None within BREAK_EVEN_LIMIT.
+
+    Short inputs are tiled; savings grow with length, so a binary search
+    over prefixes finds the crossover.
+    """
+    def saves(n):
+        prefix = pool[:n]
+        compact_tokens = count_tokens(CompactTranscript(prefix).render(prefix)) + overhead
+        return compact_tokens < count_tokens(legacy_format(prefix))
+
+    repeat = math.ceil(BREAK_EVEN_LIMIT / len(segments))
+    pool = tile(segments, repeat)[:BREAK_EVEN_LIMIT]
+    if not saves(len(pool)):
+        return None
+
+    lo, hi = 1, len(pool)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if saves(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def tile(segments, repeat):
+    """Repeat segments back to back, shifting every timestamp"""
+    if repeat <= 1:
+        return segments
+
+    span = math.ceil(segment_bounds(segments[-1])[1]) + 1
+    tiled = []
+    for n in range(repeat):
+        for seg in segments:
+            copied = copy.deepcopy(seg)
+            start, end = segment_bounds(seg)
+            copied['start'] = start + n * span
+            copied['end'] = end + n * span
+            for word in copied.get('words', []):
+                if 'start' in word:
+                    word['start'] += n * span
+                    word['end'] += n * span
+            tiled.append(copied)
+    return tiled
+
+
+def check_round_trip(compact, segments):
+    """Resolve every short ID range and verify it covers its source segments"""
+    checked = 0
+    for clip_start in range(len(compact.segments)):
+        for clip_end in range(clip_start, min(clip_start + 4, len(compact.segments))):
+            resolved = compact.resolve({"start_id": clip_start, "end_id": clip_end})
+            start = parse_timestamp(resolved['start_time'])
+            end = parse_timestamp(resolved['end_time'])
+
+            first = compact.segments[clip_start]
+            last = compact.segments[clip_end]
+            sources = [
+                segment_bounds(s) for s in segments
+                if segment_bounds(s)[0] >= first['start'] and segment_bounds(s)[1] <= last['end']
+            ]
+            assert sources, f"IDs {clip_start}-{clip_end} cover no source segment"
+            assert start <= sources[0][0] < start + 1, (clip_start, start, sources[0])
+            assert end >= sources[-1][1] > end - 1, (clip_end, end, sources[-1])
+            checked += 1
+    return checked
+
+
+def benchmark(path: Path, repeat: int):
+    with open(path, 'r', encoding='utf-8') as f:
+        transcript = json.load(f)
+    segments = tile(transcript.get('segments', []), repeat)
+
+    compact = CompactTranscript(segments)
+    legacy_tokens = count_tokens(legacy_format(segments))
+    compact_tokens = count_tokens(compact.render(segments))
+
+    # Focus on the first quarter, summarize the rest
+    end_time = segment_bounds(segments[-1])[1]
+    focus = [(0.0, end_time / 4)]
+    summary_tokens = count_tokens(compact.render(segments, focus))
+
+    checked = check_round_trip(compact, segments)
+    overhead = system_prompt_overhead()
+    threshold = break_even(segments, overhead)
+
+    print(f"\n{path} (x{repeat}): {len(segments)} segments -> {len(compact.segments)} lines, "
+          f"{format_timestamp(end_time)} of speech")
+    print(f"  timestamps prompt:          {legacy_tokens:>7} tokens")
+    print(f"  compact prompt:             {compact_tokens:>7} tokens "
+          f"({signed_change(compact_tokens, legacy_tokens)})")
+    print(f"  compact + far summaries:    {summary_tokens:>7} tokens "
+          f"({signed_change(summary_tokens, legacy_tokens)})")
+    print(f"  compact system prompt:      {overhead:>+7} tokens per request")
+    if threshold is None:
+        print(f"  compact does not pay off below {BREAK_EVEN_LIMIT} segments of this content")
+    else:
+        verdict = "use compact" if len(segments) >= threshold else "use timestamps"
+        print(f"  compact only pays off above ~{threshold} segments of this content ({verdict})")
+    print(f"  round trip: {checked} ID ranges resolved to covering absolute times")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("transcripts", nargs="*", type=Path, default=DEFAULT_TRANSCRIPTS)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    print("Token counter:", "tiktoken cl100k_base" if _encoding else "heuristic (pip install tiktoken for exact counts)")
+    legacy_answer = count_tokens(json.dumps(LEGACY_ANSWER))
+    compact_answer = count_tokens(json.dumps(COMPACT_ANSWER))
+    print(f"Answer per clip: {legacy_answer} tokens with timestamps, {compact_answer} with segment IDs")
+
+    for path in args.transcripts:
+        benchmark(path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
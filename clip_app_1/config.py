@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import List
+import secrets
 
 
 class Settings(BaseSettings):
@@ -17,6 +19,96 @@ class Settings(BaseSettings):
     max_clip_duration: int = 60
     target_clips: int = 5
 
+    # Face Tracking Settings
+    face_tracking_workers: int = 0  # Process pool size, 0 = one per CPU core
+    # yolo, or tiered (cheap face detector first; needs the YuNet model in
+    # models/face_detection_yunet_2023mar.onnx, otherwise falls back to Haar)
+    face_detector_strategy: str = "yolo"
+    enable_face_tracking_cache: bool = True
+    face_tracking_cache_max_mb: int = 500
+    face_tracking_adaptive: bool = False  # Adaptive sampling stride (FaceTrackerOptimized)
+
+    # RunPod job client (queued /run jobs with backoff polling). Webhooks
+    # need both a public base URL and a secret; without a secret they are
+    # neither registered nor accepted.
+    runpod_webhook_base_url: str = ""
+    runpod_webhook_secret: str = ""
+    runpod_poll_initial_interval: float = 1.0
+    runpod_poll_max_interval: float = 15.0
+    runpod_job_timeout: float = 600.0  # Seconds before the job is cancelled
+
+    # Transcription Audio Handoff
+    audio_handoff: str = "tmpfiles"  # tmpfiles, signed_url, object_store
+    public_base_url: str = ""  # Where RunPod can reach this app, e.g. https://clips.example.com
+    media_signing_secret: str = ""  # Random per process if empty
+    media_url_ttl: int = 3600  # Seconds a signed media URL stays valid
+
+    # Long-form Transcription (chunked, concurrent RunPod jobs)
+    transcription_chunk_threshold_seconds: int = 1200  # Split audio longer than this
+    transcription_chunk_seconds: int = 600
+    transcription_chunk_overlap_seconds: float = 2.0
+    transcription_max_concurrency: int = 4
+
+    # Speech Audio Preparation (VAD silence trimming + Opus)
+    enable_silence_trimming: bool = True
+    min_silence_seconds: float = 1.0  # Only silences longer than this are dropped
+
+    # Transcript Cache
+    enable_transcript_cache: bool = True
+    transcript_cache_max_mb: int = 500
+
+    # Clip Selection (map-reduce for long transcripts)
+    clip_selection_map_reduce_tokens: int = 24000  # Above this, split into windows
+    clip_selection_window_tokens: int = 12000
+    clip_selection_window_overlap_seconds: float = 90.0
+    clip_selection_max_concurrency: int = 6
+    clip_selection_reduce_strategy: str = "llm"  # llm or local
+    # Speculative selection: >1 fires variant requests concurrently instead
+    # of sequential retries; a hedge delay staggers them (0 = all at once)
+    clip_selection_speculative_requests: int = 1
+    clip_selection_speculative_models: List[str] = []  # Extra models to rotate through
+    clip_selection_hedge_delay_seconds: float = 0.0
+    # Prompt transcript format: timestamps or compact (segment IDs, relative offsets)
+    clip_selection_prompt_encoding: str = "timestamps"
+    clip_selection_far_context_summaries: bool = False
+
+    # Local candidate pre-ranking (only top windows are sent to the LLM);
+    # applies only above clip_selection_map_reduce_tokens, shorter transcripts go whole
+    enable_candidate_preranking: bool = True
+    prerank_top_k: int = 15
+
+    # Stream clip selection (SSE) and start tracking each clip as it arrives
+    enable_llm_streaming: bool = True
+
+    # Transliteration batching (segments per request capped by a token budget)
+    transliteration_batch_tokens: int = 1500
+    transliteration_max_concurrency: int = 4
+    # Transliterate only the segments inside generated clips, as each is subtitled
+    lazy_transliteration: bool = True
+    # Persistent word dictionary (cache_dir/transliteration.db); fully covered
+    # segments are transliterated locally. ITRANS seeds are used only if trusted.
+    enable_transliteration_dictionary: bool = True
+    transliteration_dict_trust_itrans: bool = False
+    # LLM spellings become trusted only after this many agreeing sightings
+    # that make up at least this share of all spellings seen for the word
+    transliteration_dict_min_agreement: int = 2
+    transliteration_dict_agreement_ratio: float = 0.75
+
+    # LLM Response Cache (clip selection + transliteration)
+    enable_llm_cache: bool = True
+    llm_cache_mode: str = "read_write"  # read_write, bypass, replay, record
+    llm_cache_ttl_hours: float = 24 * 7
+    llm_cache_max_mb: int = 200
+
+    # Outbound API Gateway (pooled clients, rate limits, circuit breakers)
+    enable_http2: bool = True
+    openrouter_requests_per_second: float = 2.0
+    openrouter_max_concurrency: int = 8
+    runpod_requests_per_second: float = 5.0
+    runpod_max_concurrency: int = 16
+    circuit_breaker_failures: int = 5
+    circuit_breaker_reset_seconds: float = 30.0
+
     # Subtitle Settings
     enable_subtitles: bool = True
     subtitle_style: str = "simple_caption"  # simple_caption, glow_caption, karaoke_style
@@ -27,6 +119,8 @@ class Settings(BaseSettings):
     uploads_dir: Path = base_dir / "uploads"
     outputs_dir: Path = base_dir / "outputs"
     static_dir: Path = base_dir / "static"
+    cache_dir: Path = base_dir / "cache"
+    object_store_dir: Path = base_dir / "object_store"
 
     class Config:
         env_file = ".env"
@@ -34,10 +128,13 @@ class Settings(BaseSettings):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        if not self.media_signing_secret:
+            self.media_signing_secret = secrets.token_hex(32)
         # Create necessary directories
         self.uploads_dir.mkdir(exist_ok=True)
         self.outputs_dir.mkdir(exist_ok=True)
         self.static_dir.mkdir(exist_ok=True)
+        self.cache_dir.mkdir(exist_ok=True)
 
 
 settings = Settings()
@@ -1,20 +1,34 @@
-from fastapi import FastAPI, File, UploadFile, WebSocket, WebSocketDisconnect, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, WebSocket, WebSocketDisconnect, HTTPException, Form, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse
+import mimetypes
 from pathlib import Path
 import shutil
 import asyncio
-from typing import List, Dict
+from datetime import datetime
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Dict, Optional, Union
 import json
 
 from config import settings
 from modules.video_processor import VideoProcessor
 from modules.transcriber import Transcriber
+from modules.runpod_client import RunPodClient, deliver_webhook, verify_webhook_token
+from modules.audio_handoff import create_audio_handoff, verify_media_signature
+from modules.candidate_ranker import CandidateRanker
 from modules.clip_selector import ClipSelector
-from modules.face_tracker import FaceTracker
+from modules.face_tracker import init_tracking_worker, track_clip_in_worker
+from modules.tracking_cache import file_fingerprint
+from modules.transcript import Transcript
 from modules.transliterator import UniversalTransliterator
 from modules.subtitle_renderer import SubtitleRenderer
+from utils.disk_cache import DiskCache
+from utils.llm_cache import LLMResponseCache
+from utils.transliteration_dict import TransliterationDictionary
 from utils.helpers import create_job_folder, get_video_info, setup_logger
+from utils.http_gateway import DEFAULT_POLICIES, ProviderPolicy, configure_gateway, get_gateway
 
 app = FastAPI(title="Automated Shorts Generator")
 
@@ -27,6 +41,105 @@ logger = setup_logger("Main")
 # WebSocket connections
 active_connections: List[WebSocket] = []
 
+# Devanagari -> Hinglish word dictionary (opened on first use)
+transliteration_dictionary: Optional[TransliterationDictionary] = None
+
+
+def get_transliteration_dictionary() -> Optional[TransliterationDictionary]:
+    """Return the shared transliteration dictionary, or None when disabled"""
+    global transliteration_dictionary
+    if transliteration_dictionary is None and settings.enable_transliteration_dictionary:
+        sources = ("llm", "itrans") if settings.transliteration_dict_trust_itrans else ("llm",)
+        transliteration_dictionary = TransliterationDictionary(
+            settings.cache_dir / "transliteration.db",
+            trusted_sources=sources,
+            min_agreement=settings.transliteration_dict_min_agreement,
+            agreement_ratio=settings.transliteration_dict_agreement_ratio
+        )
+    return transliteration_dictionary
+
+
+def create_runpod_client(job_logger) -> RunPodClient:
+    """RunPod job client configured from settings (webhook + polling)"""
+    return RunPodClient(
+        api_key=settings.runpod_api_key,
+        endpoint=settings.runpod_endpoint,
+        logger=job_logger,
+        webhook_base_url=settings.runpod_webhook_base_url or None,
+        webhook_secret=settings.runpod_webhook_secret,
+        poll_initial_interval=settings.runpod_poll_initial_interval,
+        poll_max_interval=settings.runpod_poll_max_interval,
+        job_timeout=settings.runpod_job_timeout
+    )
+
+
+# Face tracking process pool (created on first use, one warm model per worker)
+tracking_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_tracking_pool() -> ProcessPoolExecutor:
+    """Return the shared face tracking pool, creating it on first use"""
+    global tracking_pool
+    if tracking_pool is None:
+        workers = settings.face_tracking_workers or os.cpu_count() or 1
+        logger.info(f"Starting face tracking pool with {workers} workers")
+        tracking_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            # spawn: forking a process that already holds torch/MPS state is unsafe
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_tracking_worker
+        )
+    return tracking_pool
+
+
+@app.on_event("startup")
+async def configure_outbound_gateway():
+    """Apply rate limits and circuit breaker settings to the shared HTTP gateway"""
+    breaker = {
+        'failure_threshold': settings.circuit_breaker_failures,
+        'reset_timeout': settings.circuit_breaker_reset_seconds
+    }
+    policies = dict(DEFAULT_POLICIES)
+    policies['openrouter'] = ProviderPolicy(
+        ('openrouter.ai',),
+        requests_per_second=settings.openrouter_requests_per_second,
+        burst=max(1, int(settings.openrouter_requests_per_second * 2)),
+        max_concurrency=settings.openrouter_max_concurrency,
+        **breaker
+    )
+    policies['runpod'] = ProviderPolicy(
+        ('api.runpod.ai',),
+        requests_per_second=settings.runpod_requests_per_second,
+        burst=max(1, int(settings.runpod_requests_per_second * 2)),
+        max_concurrency=settings.runpod_max_concurrency,
+        **breaker
+    )
+    configure_gateway(policies, http2=settings.enable_http2)
+
+
+@app.on_event("shutdown")
+async def close_outbound_gateway():
+    """Close pooled keep-alive connections"""
+    await get_gateway().aclose()
+
+
+@app.on_event("shutdown")
+async def shutdown_tracking_pool():
+    """Stop face tracking workers with the server"""
+    global tracking_pool
+    if tracking_pool is not None:
+        tracking_pool.shutdown(cancel_futures=True)
+        tracking_pool = None
+
+
+@app.on_event("shutdown")
+async def close_transliteration_dictionary():
+    """Close the dictionary's SQLite connection"""
+    global transliteration_dictionary
+    if transliteration_dictionary is not None:
+        transliteration_dictionary.close()
+        transliteration_dictionary = None
+
 
 @app.get("/", response_class=HTMLResponse)
 async def home():
@@ -74,7 +187,9 @@ async def process_video(
     video: UploadFile = File(...),
     enable_subtitles: str = Form("true"),
     subtitle_style: str = Form("simple_caption"),
-    target_clips: int = Form(5)
+    target_clips: int = Form(5),
+    fresh_suggestions: str = Form("false"),
+    language: str = Form("auto")
 ):
     """
     Main endpoint to process video and generate shorts
@@ -101,9 +216,14 @@ async def process_video(
     job_logger.info(f"Target clips: {target_clips}") # Corrected targetClips to target_clips
     job_logger.info(f"Language: {language}")
 
+    enable_subs = enable_subtitles.lower() == "true"
+    sub_style = subtitle_style
+    # "auto" (or nothing) lets WhisperX detect the language
+    whisper_language = None if language in ("", "auto") else language
+
     try:
         # Step 1: Upload Video
-        await notify_progress(job_id, "upload", "Uploading video...", 5)
+        await send_progress("upload", "active", "Uploading video...", 5)
 
         # Save uploaded video
         video_path = job_folder / "original_video.mp4"
@@ -117,15 +237,43 @@ async def process_video(
         video_info = get_video_info(video_path)
         job_logger.info(f"Video info: {video_info}")
 
-        await notify_progress(job_id, "upload", "Video uploaded successfully", 10)
+        await send_progress("upload", "complete", "Video uploaded successfully", 10)
 
         # Initialize modules
         processor = VideoProcessor(job_folder) # Renamed to processor to match original
         transcriber = Transcriber(
             settings.runpod_api_key,
             settings.runpod_endpoint,
-            job_folder
+            job_folder,
+            audio_handoff=create_audio_handoff(
+                settings.audio_handoff,
+                public_base_url=settings.public_base_url,
+                outputs_dir=settings.outputs_dir,
+                signing_secret=settings.media_signing_secret,
+                url_ttl=settings.media_url_ttl,
+                object_store_dir=settings.object_store_dir
+            ),
+            transcript_cache=DiskCache(
+                settings.cache_dir / "transcripts",
+                max_bytes=settings.transcript_cache_max_mb * 1024 * 1024
+            ) if settings.enable_transcript_cache else None,
+            chunk_threshold_seconds=settings.transcription_chunk_threshold_seconds,
+            chunk_seconds=settings.transcription_chunk_seconds,
+            chunk_overlap_seconds=settings.transcription_chunk_overlap_seconds,
+            max_concurrent_chunks=settings.transcription_max_concurrency,
+            runpod_client=create_runpod_client(job_logger)
         )
+        llm_cache = None
+        if settings.enable_llm_cache:
+            # fresh_suggestions skips cached answers for this job (and refreshes them)
+            llm_cache = LLMResponseCache(
+                DiskCache(
+                    settings.cache_dir / "llm",
+                    max_bytes=settings.llm_cache_max_mb * 1024 * 1024,
+                    ttl_seconds=settings.llm_cache_ttl_hours * 3600
+                ),
+                mode="bypass" if fresh_suggestions.lower() == "true" else settings.llm_cache_mode
+            )
         selector = ClipSelector( # Renamed to selector to match original
             settings.openrouter_api_key,
             settings.llm_model,
@@ -134,23 +282,39 @@ async def process_video(
             max_duration=settings.max_clip_duration, # Added back from original
             target_clips=target_clips
         )
-        tracker = FaceTracker(job_folder) # Renamed to tracker to match original
         subtitle_renderer = SubtitleRenderer(job_folder)
         transliterator = UniversalTransliterator(
             job_folder,
             api_key=settings.openrouter_api_key,
-            model=settings.llm_model
+            model=settings.llm_model,
+            llm_cache=llm_cache,
+            batch_max_tokens=settings.transliteration_batch_tokens,
+            max_concurrent_batches=settings.transliteration_max_concurrency,
+            dictionary=get_transliteration_dictionary()
         )
 
         # Step 2: Extract Audio
-        await notify_progress(job_id, "extract_audio", "Extracting audio...", 15)
-        audio_path = processor.extract_audio(video_path)
-        await notify_progress(job_id, "extract_audio", "Audio extracted", 25)
+        await send_progress("extract", "active", "Extracting audio...", 15)
+        offset_map = None
+        if settings.enable_silence_trimming:
+            audio_path, offset_map = processor.extract_speech_audio(
+                video_path,
+                min_silence_seconds=settings.min_silence_seconds
+            )
+        else:
+            audio_path = processor.extract_audio(video_path)
+        await send_progress("extract", "complete", "Audio extracted", 25)
 
         # Step 3: Transcribe with WhisperX
 
-        # Transcriber will automatically upload audio to file.io for public access
-        transcript = await transcriber.transcribe(audio_path)
+        # Transcriber hands the audio to RunPod via the configured handoff;
+        # timestamps come back on the original (untrimmed) timeline
+        await send_progress("transcribe", "active", "Transcribing audio...", 30)
+        transcript = await transcriber.transcribe(
+            audio_path,
+            language=whisper_language,
+            offset_map=offset_map
+        )
 
         await send_progress("transcribe", "complete", "Transcription complete", 45)
 
@@ -163,71 +327,71 @@ async def process_video(
             job_folder=job_folder,
             min_duration=settings.min_clip_duration,
             max_duration=settings.max_clip_duration,
-            target_clips=target_clips
+            target_clips=target_clips,
+            map_reduce_threshold_tokens=settings.clip_selection_map_reduce_tokens,
+            window_tokens=settings.clip_selection_window_tokens,
+            window_overlap_seconds=settings.clip_selection_window_overlap_seconds,
+            max_concurrent_windows=settings.clip_selection_max_concurrency,
+            reduce_strategy=settings.clip_selection_reduce_strategy,
+            speculative_requests=settings.clip_selection_speculative_requests,
+            speculative_models=settings.clip_selection_speculative_models,
+            hedge_delay_seconds=settings.clip_selection_hedge_delay_seconds,
+            prompt_encoding=settings.clip_selection_prompt_encoding,
+            far_context_summaries=settings.clip_selection_far_context_summaries,
+            candidate_ranker=CandidateRanker(
+                job_folder,
+                min_duration=settings.min_clip_duration,
+                max_duration=settings.max_clip_duration,
+                top_k=settings.prerank_top_k,
+                # Source timeline; the speech audio may be silence-trimmed
+                audio_path=video_path
+            ) if settings.enable_candidate_preranking else None,
+            llm_cache=llm_cache
         )
-        clip_suggestions = await selector.select_clips(transcript)
-
-        if not clip_suggestions:
-            raise HTTPException(status_code=500, detail="LLM did not suggest any clips")
+        if settings.enable_llm_streaming:
+            # Step 4-6 overlap: each clip is tracked and encoded as soon as
+            # the model finishes writing it
+            async def announce_clips(clips: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+                count = 0
+                async for clip in clips:
+                    count += 1
+                    await send_progress(
+                        "track",
+                        "active",
+                        f"Clip {count} selected, tracking faces...",
+                        55
+                    )
+                    yield clip
+                await send_progress("analyze", "complete", f"Found {count} viral clips", 60)
 
-        await send_progress("analyze", "complete", f"Found {len(clip_suggestions)} viral clips", 60)
+            clip_suggestions = announce_clips(selector.stream_clips(transcript))
+        else:
+            clip_suggestions = await selector.select_clips(transcript)
 
-        # Step 5 & 6: Track Faces and Generate Clips
-        tracker = FaceTracker(job_folder)
-        generated_clips = []
+            if not clip_suggestions:
+                raise HTTPException(status_code=500, detail="LLM did not suggest any clips")
 
-        for i, clip in enumerate(clip_suggestions):
-            progress = 60 + int((i / len(clip_suggestions)) * 35)
+            await send_progress("analyze", "complete", f"Found {len(clip_suggestions)} viral clips", 60)
 
-            # Track faces
+            # Step 5 & 6: Track Faces and Generate Clips
             await send_progress(
                 "track",
                 "active",
-                f"Tracking faces in clip {i+1}/{len(clip_suggestions)}...",
-                progress
-            )
-
-            tracking_data = tracker.track_faces_in_clip(
-                video_path,
-                clip['start_time'],
-                clip['end_time']
+                f"Tracking faces in {len(clip_suggestions)} clips...",
+                60
             )
 
-            # Generate clip
-            await send_progress(
-                "generate",
-                "active",
-                f"Generating clip {i+1}/{len(clip_suggestions)}...",
-                progress + 2
-            )
-
-            face_center_x = tracking_data.get('face_center_x')
-            face_center_y = tracking_data.get('face_center_y')
-            output_name = f"clip_{i+1:02d}.mp4"
-
-            clip_path = processor.create_vertical_clip(
-                video_path=video_path,
-                start_time=clip['start_time'],
-                duration=clip.get('duration_seconds', 30),
-                face_x=face_center_x,
-                face_y=face_center_y,
-                source_width=video_info['width'],
-                source_height=video_info['height'],
-                output_name=output_name
-            )
+        generated_clips = await track_and_generate_clips(
+            job_folder,
+            video_path,
+            video_info,
+            clip_suggestions,
+            processor,
+            expected_total=target_clips
+        )
 
-            # Add clip info
-            generated_clips.append({
-                "title": clip.get('title', f'Clip {i+1}'),
-                "url": f"/outputs/{job_folder.name}/{output_name}",
-                "virality_score": clip.get('virality_score', 'N/A'),
-                "reason": clip.get('reason', ''),
-                "hook_type": clip.get('hook_type', ''),
-                "start_time": clip['start_time'],
-                "end_time": clip['end_time'],
-                "duration": clip.get('duration_seconds', 30),
-                "first_3_seconds": clip.get('first_3_seconds', '')
-            })
+        if not generated_clips:
+            raise HTTPException(status_code=500, detail="LLM did not suggest any clips")
 
         await send_progress("generate", "complete", "All clips generated!", 95)
 
@@ -239,11 +403,20 @@ async def process_video(
 
             try:
                 # Initialize subtitle modules
-                transliterator = HindiTransliterator(job_folder)
                 subtitle_renderer = SubtitleRenderer(job_folder)
 
-                # Transliterate transcript to Roman script
-                romanized_transcript = transliterator.transliterate_transcript(transcript)
+                # Transliterate transcript to Roman script (lazily: per clip
+                # below, so only the selected ranges are ever transliterated)
+                romanized_transcript = transcript
+                if not settings.lazy_transliteration:
+                    romanized_transcript = await transliterator.transliterate_transcript(transcript)
+
+                # Columnar word index saved by the transcriber (built here on a miss)
+                words_store_path = job_folder / "transcript_words.npz"
+                if words_store_path.exists():
+                    word_store = Transcript.load(words_store_path)
+                else:
+                    word_store = Transcript.from_transcript(transcript)
 
                 # Process each clip
                 for i, clip_info in enumerate(generated_clips):
@@ -261,22 +434,23 @@ async def process_video(
                     clip_end = parse_timestamp(clip_info['end_time'])
                     clip_duration = clip_end - clip_start
 
-                    # Extract words in this clip's timeframe
+                    if settings.lazy_transliteration:
+                        # Segments shared with earlier clips come from the memo
+                        romanized_transcript = await transliterator.transliterate_transcript(
+                            transcript,
+                            time_ranges=[(clip_start, clip_end)]
+                        )
+
+                    # Words in this clip's timeframe, clip-relative (binary search)
+                    segments = romanized_transcript.get('segments', [])
                     clip_words = []
-                    for segment in romanized_transcript.get('segments', []):
-                        if 'words' in segment:
-                            for word in segment['words']:
-                                word_start = word.get('start', 0)
-                                word_end = word.get('end', 0)
-
-                                # Check if word overlaps with clip timeframe
-                                if word_end > clip_start and word_start < clip_end:
-                                    # Adjust timestamps relative to clip start
-                                    clip_words.append({
-                                        'text_roman': word.get('text_roman', word.get('text', '')),
-                                        'start': max(0, word_start - clip_start),
-                                        'end': min(clip_duration, word_end - clip_start)
-                                    })
+                    for word in word_store.slice(clip_start, clip_end):
+                        source = segments[word['segment_id']]['words'][word['word_index']]
+                        clip_words.append({
+                            'text_roman': source.get('text_roman', source.get('text', '')),
+                            'start': word['start'],
+                            'end': word['end']
+                        })
 
                     if not clip_words:
                         job_logger.warning(f"No words found for clip {i+1}, skipping subtitles")
@@ -365,6 +539,121 @@ async def process_video(
         )
 
 
+async def track_and_generate_clips(
+    job_folder: Path,
+    video_path: Path,
+    video_info: Dict,
+    clip_suggestions: Union[List[Dict], AsyncIterator[Dict]],
+    processor: VideoProcessor,
+    expected_total: Optional[int] = None
+) -> List[Dict]:
+    """
+    Track faces for all clips concurrently and encode each clip as soon as
+    its crop is known.
+
+    clip_suggestions may be an async iterator (streamed LLM selection);
+    each clip then starts tracking the moment it arrives.
+
+    Tracking runs in the process pool; encodes are FFmpeg subprocesses
+    started from worker threads, so the event loop stays free and a job
+    takes roughly as long as its slowest clip.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_tracking_pool()
+    tracking_cache_dir = (
+        settings.cache_dir / "face_tracking"
+        if settings.enable_face_tracking_cache else None
+    )
+    # Hash the source once here instead of once per pool worker
+    source_fingerprint = (
+        await asyncio.to_thread(file_fingerprint, video_path)
+        if tracking_cache_dir else None
+    )
+    if isinstance(clip_suggestions, list):
+        total = len(clip_suggestions)
+    else:
+        total = expected_total or 1
+    done = 0
+
+    async def track_then_encode(i: int, clip: Dict) -> Dict:
+        nonlocal done
+
+        tracking_data = await loop.run_in_executor(
+            pool,
+            track_clip_in_worker,
+            job_folder,
+            video_path,
+            clip['start_time'],
+            clip['end_time'],
+            settings.face_detector_strategy,
+            tracking_cache_dir,
+            settings.face_tracking_adaptive,
+            settings.face_tracking_cache_max_mb * 1024 * 1024,
+            source_fingerprint
+        )
+
+        await send_progress(
+            "generate",
+            "active",
+            f"Faces tracked for clip {i+1}/{total}, encoding...",
+            60 + int((done / total) * 35)
+        )
+
+        output_name = f"clip_{i+1:02d}.mp4"
+        await asyncio.to_thread(
+            processor.create_vertical_clip,
+            video_path=video_path,
+            start_time=clip['start_time'],
+            duration=clip.get('duration_seconds', 30),
+            face_x=tracking_data.get('face_center_x'),
+            face_y=tracking_data.get('face_center_y'),
+            source_width=video_info['width'],
+            source_height=video_info['height'],
+            output_name=output_name,
+            crop_trajectory=tracking_data.get('crop_trajectory')
+        )
+
+        done += 1
+        await send_progress(
+            "generate",
+            "active",
+            f"Generated {done}/{total} clips",
+            60 + int((done / total) * 35)
+        )
+
+        return {
+            "title": clip.get('title', f'Clip {i+1}'),
+            "url": f"/outputs/{job_folder.name}/{output_name}",
+            "virality_score": clip.get('virality_score', 'N/A'),
+            "reason": clip.get('reason', ''),
+            "hook_type": clip.get('hook_type', ''),
+            "start_time": clip['start_time'],
+            "end_time": clip['end_time'],
+            "duration": clip.get('duration_seconds', 30),
+            "first_3_seconds": clip.get('first_3_seconds', '')
+        }
+
+    tasks: List[asyncio.Task] = []
+    try:
+        if isinstance(clip_suggestions, list):
+            tasks = [
+                asyncio.create_task(track_then_encode(i, clip))
+                for i, clip in enumerate(clip_suggestions)
+            ]
+        else:
+            async for clip in clip_suggestions:
+                tasks.append(asyncio.create_task(track_then_encode(len(tasks), clip)))
+                total = max(total, len(tasks))
+        # gather keeps the original clip order in the results
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        # One failed clip (or a cancelled job) stops its siblings too
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
 @app.get("/outputs/{job_id}/{filename}")
 async def get_clip(job_id: str, filename: str):
     """Serve generated clip files"""
@@ -376,6 +665,100 @@ async def get_clip(job_id: str, filename: str):
     return FileResponse(clip_path)
 
 
+def range_file_response(path: Path, range_header: Optional[str]) -> StreamingResponse:
+    """
+    Stream a file with HTTP Range support (206 partial content).
+
+    WhisperX workers may fetch audio in ranges; serving straight from disk
+    in chunks avoids loading whole files into memory.
+    """
+    file_size = path.stat().st_size
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    start, end = 0, file_size - 1
+    status_code = 200
+
+    if range_header and range_header.startswith("bytes="):
+        try:
+            range_start, range_end = range_header[6:].split(",")[0].strip().split("-")
+            if range_start:
+                start = int(range_start)
+                end = int(range_end) if range_end else file_size - 1
+            else:
+                # Suffix range: last N bytes
+                start = max(0, file_size - int(range_end))
+        except ValueError:
+            raise HTTPException(status_code=416, detail="Invalid Range header")
+
+        end = min(end, file_size - 1)
+        if start > end:
+            raise HTTPException(
+                status_code=416,
+                detail="Range not satisfiable",
+                headers={"Content-Range": f"bytes */{file_size}"}
+            )
+        status_code = 206
+
+    def iter_file(chunk_size: int = 1024 * 1024):
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+    }
+    if status_code == 206:
+        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+
+    return StreamingResponse(
+        iter_file(),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+@app.get("/media/{media_path:path}")
+async def get_signed_media(media_path: str, expires: int, signature: str, request: Request):
+    """Serve job files to RunPod workers via signed, expiring URLs"""
+    if not verify_media_signature(media_path, expires, signature, settings.media_signing_secret):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+
+    file_path = (settings.outputs_dir / media_path).resolve()
+    if settings.outputs_dir.resolve() not in file_path.parents or not file_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return range_file_response(file_path, request.headers.get("range"))
+
+
+@app.post("/runpod/webhook")
+async def runpod_webhook(request: Request, token: Optional[str] = None):
+    """Push completion from RunPod; wakes the job waiting in RunPodClient.run"""
+    if not verify_webhook_token(token, settings.runpod_webhook_secret):
+        raise HTTPException(status_code=403, detail="Invalid webhook token")
+
+    payload = await request.json()
+    delivered = deliver_webhook(payload)
+    logger.info(f"RunPod webhook for job {payload.get('id')} ({payload.get('status')}), delivered={delivered}")
+    return {"received": True, "delivered": delivered}
+
+
+@app.get("/objects/{key}")
+async def get_object(key: str, request: Request):
+    """Serve content-addressed files from the local object store"""
+    object_path = (settings.object_store_dir / key).resolve()
+    if object_path.parent != settings.object_store_dir.resolve() or not object_path.is_file():
+        raise HTTPException(status_code=404, detail="Object not found")
+
+    return range_file_response(object_path, request.headers.get("range"))
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -386,6 +769,15 @@ async def health_check():
     }
 
 
+@app.get("/metrics/transliteration")
+async def transliteration_metrics():
+    """Dictionary size and hit rates since startup"""
+    dictionary = get_transliteration_dictionary()
+    if dictionary is None:
+        return {"enabled": False}
+    return {"enabled": True, **(await asyncio.to_thread(dictionary.stats))}
+
+
 @app.get("/test/step1")
 async def test_step1_upload():
     """Test Step 1: Verify upload functionality"""
@@ -0,0 +1,199 @@
+import hashlib
+import hmac
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from utils.http_gateway import get_gateway
+
+
+async def upload_audio_to_tmpfiles(audio_path: Path, logger) -> str:
+    """
+    Upload audio file to tmpfiles.org and return public URL
+
+    tmpfiles.org provides free temporary file hosting (1 hour expiry)
+    """
+    logger.info("Uploading audio to tmpfiles.org for public access...")
+
+    # Read into memory so the gateway can resend the body on retry
+    files = {'file': (audio_path.name, audio_path.read_bytes(), 'audio/wav')}
+
+    # Upload to tmpfiles.org
+    response = await get_gateway().post(
+        'https://tmpfiles.org/api/v1/upload',
+        files=files,
+        timeout=300.0
+    )
+
+    logger.info(f"tmpfiles.org response status: {response.status_code}")
+    logger.info(f"tmpfiles.org response body: {response.text[:500]}")
+
+    response.raise_for_status()
+
+    try:
+        result = response.json()
+    except Exception as e:
+        logger.error(f"Failed to parse JSON: {e}")
+        logger.error(f"Response text: {response.text}")
+        raise Exception(f"tmpfiles.org returned invalid JSON: {response.text[:200]}")
+
+    if result.get('status') != 'success':
+        raise Exception(f"tmpfiles.org upload failed: {result}")
+
+    # tmpfiles.org returns URL like "https://tmpfiles.org/1234/file.wav"
+    # We need to convert it to direct download URL: "https://tmpfiles.org/dl/1234/file.wav"
+    url = result['data']['url']
+
+    # Convert to direct download URL
+    if 'tmpfiles.org/' in url:
+        # Change https://tmpfiles.org/ABC/file.wav to https://tmpfiles.org/dl/ABC/file.wav
+        url = url.replace('tmpfiles.org/', 'tmpfiles.org/dl/')
+
+    logger.info(f"Audio uploaded successfully to: {url}")
+    return url
+
+
+def sign_media_path(path: str, expires: int, secret: str) -> str:
+    """HMAC-SHA256 signature for a media path and expiry timestamp"""
+    message = f"{path}:{expires}".encode('utf-8')
+    return hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def verify_media_signature(path: str, expires: int, signature: str, secret: str) -> bool:
+    """Check a signed media URL: signature must match and not be expired"""
+    if expires < time.time():
+        return False
+    expected = sign_media_path(path, expires, secret)
+    return hmac.compare_digest(expected, signature)
+
+
+class AudioHandoff(ABC):
+    """
+    Makes a local audio file reachable by the WhisperX worker.
+
+    Each handoff returns the fields to merge into the RunPod input payload.
+    The worker only takes a fetchable URL ({'audio_file': url}).
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def prepare(self, audio_path: Path, logger) -> Dict:
+        """Make audio_path reachable and return the RunPod input fields"""
+
+
+class TmpfilesHandoff(AudioHandoff):
+    """Upload to tmpfiles.org (third-party, adds an upload round trip)"""
+
+    name = "tmpfiles"
+
+    async def prepare(self, audio_path: Path, logger) -> Dict:
+        url = await upload_audio_to_tmpfiles(audio_path, logger)
+        return {'audio_file': url}
+
+
+class SignedUrlHandoff(AudioHandoff):
+    """
+    Serve the audio straight from the job folder via our own FastAPI app.
+
+    The URL points at the /media route with an expiry and an HMAC
+    signature, so nothing is uploaded and only the worker that received
+    the link can fetch the file until it expires.
+    """
+
+    name = "signed_url"
+
+    def __init__(self, public_base_url: str, outputs_dir: Path, secret: str, ttl: int = 3600):
+        self.public_base_url = public_base_url.rstrip('/')
+        self.outputs_dir = outputs_dir
+        self.secret = secret
+        self.ttl = ttl
+
+    def url_for(self, audio_path: Path) -> str:
+        """Signed, expiring URL for a file inside outputs_dir"""
+        rel_path = audio_path.resolve().relative_to(self.outputs_dir.resolve()).as_posix()
+        expires = int(time.time()) + self.ttl
+        signature = sign_media_path(rel_path, expires, self.secret)
+        return (
+            f"{self.public_base_url}/media/{quote(rel_path)}"
+            f"?expires={expires}&signature={signature}"
+        )
+
+    async def prepare(self, audio_path: Path, logger) -> Dict:
+        url = self.url_for(audio_path)
+        logger.info(f"Serving audio locally via signed URL (expires in {self.ttl}s)")
+        return {'audio_file': url}
+
+
+class LocalObjectStoreHandoff(AudioHandoff):
+    """
+    Local stand-in for an object store (S3/R2 style).
+
+    Files are stored content-addressed under store_dir and exposed through
+    the /objects route. They are hard-linked from the job folder when
+    possible, so "uploading" copies no bytes.
+    """
+
+    name = "object_store"
+
+    def __init__(self, store_dir: Path, public_base_url: str):
+        self.store_dir = store_dir
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.public_base_url = public_base_url.rstrip('/')
+
+    def put(self, audio_path: Path) -> str:
+        """Store the file and return its object key"""
+        digest = hashlib.sha256()
+        with open(audio_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+
+        key = f"{digest.hexdigest()}{audio_path.suffix}"
+        object_path = self.store_dir / key
+
+        if not object_path.exists():
+            try:
+                os.link(audio_path, object_path)
+            except OSError:
+                # Different filesystem (or no hard link support)
+                shutil.copyfile(audio_path, object_path)
+
+        return key
+
+    async def prepare(self, audio_path: Path, logger) -> Dict:
+        key = self.put(audio_path)
+        logger.info(f"Audio stored in local object store as {key}")
+        return {'audio_file': f"{self.public_base_url}/objects/{key}"}
+
+
+def create_audio_handoff(
+    mode: str,
+    public_base_url: str = "",
+    outputs_dir: Optional[Path] = None,
+    signing_secret: str = "",
+    url_ttl: int = 3600,
+    object_store_dir: Optional[Path] = None
+) -> AudioHandoff:
+    """
+    Build the audio handoff for a mode name.
+
+    Modes: tmpfiles, signed_url, object_store.
+    """
+    if mode == "tmpfiles":
+        return TmpfilesHandoff()
+
+    if mode == "signed_url":
+        if not public_base_url or outputs_dir is None:
+            raise ValueError("signed_url handoff requires public_base_url and outputs_dir")
+        return SignedUrlHandoff(public_base_url, outputs_dir, signing_secret, url_ttl)
+
+    if mode == "object_store":
+        if not public_base_url or object_store_dir is None:
+            raise ValueError("object_store handoff requires public_base_url and object_store_dir")
+        return LocalObjectStoreHandoff(object_store_dir, public_base_url)
+
+    raise ValueError(f"Unknown audio handoff mode: {mode}")
@@ -0,0 +1,189 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.audio import frame_energies
+from utils.helpers import setup_logger
+
+
+# Words that tend to open strong hooks (English, Hinglish and Hindi)
+HOOK_KEYWORDS = {
+    'secret', 'truth', 'never', 'nobody', 'mistake', 'why', 'how', 'money',
+    'honestly', 'actually', 'shocking', 'biggest', 'worst', 'best', 'story',
+    'problem', 'changed', 'realized', 'crazy', 'wrong', 'stop',
+    'sach', 'kabhi', 'kyun', 'kyon', 'galti', 'paisa', 'raaz', 'dhoka',
+    'सच', 'कभी', 'क्यों', 'गलती', 'पैसा', 'राज़', 'धोखा', 'सबसे',
+}
+
+
+class CandidateRanker:
+    """
+    Fast local scorer for clip candidate windows.
+
+    Word timestamps are binned into one-second arrays (words, pause time,
+    hook keywords, question marks, audio energy). With cumulative sums every
+    window of min_duration..max_duration starting at a segment boundary is
+    scored in O(1), so hours of transcript rank in milliseconds. Only the
+    top-K non-overlapping windows are sent to the LLM.
+    """
+
+    duration_step = 5
+    hook_seconds = 3
+    pause_threshold = 0.5
+
+    # Feature weights (features are z-scored across windows)
+    weights = {
+        'speech_rate': 1.0,
+        'pause_density': -1.0,
+        'hook_hits': 1.5,
+        'questions': 0.75,
+        'energy': 0.75,
+    }
+
+    def __init__(
+        self,
+        job_folder: Path,
+        min_duration: int = 15,
+        max_duration: int = 60,
+        top_k: int = 15,
+        audio_path: Optional[Path] = None
+    ):
+        self.job_folder = job_folder
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.top_k = top_k
+        self.audio_path = audio_path
+        self.logger = setup_logger("CandidateRanker", job_folder / "processing.log")
+
+    @staticmethod
+    def _word_arrays(transcript: Dict):
+        """Flatten words into (starts, ends, texts)"""
+        starts, ends, texts = [], [], []
+        for segment in transcript.get('segments', []):
+            for word in segment.get('words', []):
+                if 'start' not in word or 'end' not in word:
+                    continue  # Unaligned tokens (numbers, symbols)
+                starts.append(word['start'])
+                ends.append(word['end'])
+                texts.append(word.get('word', word.get('text', '')))
+        return np.array(starts, dtype=np.float64), np.array(ends, dtype=np.float64), texts
+
+    def _energy_per_second(self, seconds: int) -> np.ndarray:
+        """Mean audio energy (dBFS) per second, zeros when no audio is given"""
+        if self.audio_path is None:
+            return np.zeros(seconds)
+
+        frame_ms = 50
+        energies = frame_energies(self.audio_path, frame_ms)
+        per_second = 1000 // frame_ms
+        usable = min(len(energies) // per_second, seconds)
+
+        result = np.full(seconds, energies.min() if len(energies) else 0.0)
+        result[:usable] = energies[:usable * per_second].reshape(-1, per_second).mean(axis=1)
+        return result
+
+    def rank(self, transcript: Dict) -> List[Dict]:
+        """
+        Score candidate windows and return the top-K non-overlapping ones.
+
+        Returns:
+            List of {'start', 'end', 'score', 'features'} sorted by start
+        """
+        starts, ends, texts = self._word_arrays(transcript)
+        segments = transcript.get('segments', [])
+        if len(starts) == 0 or not segments:
+            return []
+
+        seconds = int(np.ceil(ends.max())) + 1
+        bins = np.minimum(starts.astype(np.int64), seconds - 1)
+
+        # Per-second feature arrays
+        words_ps = np.bincount(bins, minlength=seconds).astype(np.float64)
+
+        gaps = starts[1:] - ends[:-1]
+        long_gaps = np.where(gaps > self.pause_threshold, gaps, 0.0)
+        pauses_ps = np.bincount(bins[1:], weights=long_gaps, minlength=seconds)
+
+        lowered = [re.sub(r'[^\w]', '', t.lower()) for t in texts]
+        is_hook = np.array([w in HOOK_KEYWORDS for w in lowered], dtype=np.float64)
+        hooks_ps = np.bincount(bins, weights=is_hook, minlength=seconds)
+
+        is_question = np.array([t.strip().endswith('?') for t in texts], dtype=np.float64)
+        questions_ps = np.bincount(bins, weights=is_question, minlength=seconds)
+
+        energy_ps = self._energy_per_second(seconds)
+
+        def cumsum(values: np.ndarray) -> np.ndarray:
+            return np.concatenate([[0.0], np.cumsum(values)])
+
+        c_words, c_pauses, c_hooks = cumsum(words_ps), cumsum(pauses_ps), cumsum(hooks_ps)
+        c_questions, c_energy = cumsum(questions_ps), cumsum(energy_ps)
+
+        # Candidate windows: every segment start x every allowed duration
+        seg_starts = np.unique(np.array([int(s['start']) for s in segments]))
+        durations = np.arange(self.min_duration, self.max_duration + 1, self.duration_step)
+        win_start = np.repeat(seg_starts, len(durations))
+        win_dur = np.tile(durations, len(seg_starts))
+        win_end = win_start + win_dur
+
+        valid = win_end <= seconds
+        win_start, win_dur, win_end = win_start[valid], win_dur[valid], win_end[valid]
+        if len(win_start) == 0:
+            return []
+
+        hook_end = np.minimum(win_start + self.hook_seconds, win_end)
+        features = {
+            'speech_rate': (c_words[win_end] - c_words[win_start]) / win_dur,
+            'pause_density': (c_pauses[win_end] - c_pauses[win_start]) / win_dur,
+            'hook_hits': c_hooks[hook_end] - c_hooks[win_start],
+            'questions': (c_questions[win_end] - c_questions[win_start]) / win_dur * 60,
+            'energy': (c_energy[win_end] - c_energy[win_start]) / win_dur,
+        }
+
+        scores = np.zeros(len(win_start))
+        for name, values in features.items():
+            std = values.std()
+            if std > 0:
+                scores += self.weights[name] * (values - values.mean()) / std
+
+        candidates = self._select_non_overlapping(scores, win_start, win_end, features)
+        self.logger.info(
+            f"Scored {len(scores)} windows over {seconds}s of transcript, "
+            f"kept {len(candidates)} candidates"
+        )
+
+        output_path = self.job_folder / "clip_candidates.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(candidates, f, indent=2)
+
+        return candidates
+
+    def _select_non_overlapping(
+        self,
+        scores: np.ndarray,
+        win_start: np.ndarray,
+        win_end: np.ndarray,
+        features: Dict[str, np.ndarray]
+    ) -> List[Dict]:
+        """Greedy pick by score, skipping windows overlapping a pick"""
+        taken = np.zeros(int(win_end.max()) + 1, dtype=bool)
+        picked = []
+
+        for index in np.argsort(-scores):
+            start, end = int(win_start[index]), int(win_end[index])
+            if taken[start:end].any():
+                continue
+            taken[start:end] = True
+            picked.append({
+                'start': start,
+                'end': end,
+                'score': round(float(scores[index]), 3),
+                'features': {name: round(float(values[index]), 3) for name, values in features.items()}
+            })
+            if len(picked) >= self.top_k:
+                break
+
+        return sorted(picked, key=lambda c: c['start'])
@@ -1,15 +1,23 @@
+import asyncio
 import json
 from pathlib import Path
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional
 
 import httpx
 
+from modules.candidate_ranker import CandidateRanker
 from utils.helpers import setup_logger, parse_timestamp, format_timestamp
+from utils.http_gateway import get_gateway
+from utils.json_stream import IncrementalArrayParser
+from utils.llm_cache import LLMResponseCache
+from utils.transcript_encoding import CompactTranscript
 
 
 class ClipSelector:
     """Uses an LLM to select viral-worthy clips from a transcript."""
 
+    api_url = "https://openrouter.ai/api/v1/chat/completions"
+
     def __init__(
         self,
         api_key: str,
@@ -18,6 +26,18 @@ class ClipSelector:
         min_duration: int = 15,
         max_duration: int = 60,
         target_clips: int = 5,
+        map_reduce_threshold_tokens: int = 24000,
+        window_tokens: int = 12000,
+        window_overlap_seconds: float = 90.0,
+        max_concurrent_windows: int = 6,
+        reduce_strategy: str = "llm",
+        candidate_ranker: Optional[CandidateRanker] = None,
+        llm_cache: Optional[LLMResponseCache] = None,
+        speculative_requests: int = 1,
+        speculative_models: Optional[List[str]] = None,
+        hedge_delay_seconds: float = 0.0,
+        prompt_encoding: str = "timestamps",
+        far_context_summaries: bool = False,
     ):
         self.api_key = api_key
         self.model = model
@@ -25,6 +45,28 @@ class ClipSelector:
         self.min_duration = min_duration
         self.max_duration = max_duration
         self.target_clips = target_clips
+        # Transcripts above this size are split into windows (map-reduce)
+        self.map_reduce_threshold_tokens = map_reduce_threshold_tokens
+        self.window_tokens = window_tokens
+        self.window_overlap_seconds = window_overlap_seconds
+        self.max_concurrent_windows = max_concurrent_windows
+        self.reduce_strategy = reduce_strategy  # "llm" or "local"
+        # Optional local pre-ranking: only the top windows reach the LLM
+        self.candidate_ranker = candidate_ranker
+        self.llm_cache = llm_cache
+        # >1: fire several variant requests and merge clips across them
+        # instead of retrying sequentially. With a hedge delay the next
+        # request only starts if the previous ones haven't delivered by then.
+        self.speculative_requests = max(1, speculative_requests)
+        self.speculative_models = speculative_models or []
+        self.hedge_delay_seconds = hedge_delay_seconds
+        # "timestamps": [HH:MM:SS - HH:MM:SS] lines, answers carry times
+        # "compact": numbered lines with relative offsets, answers carry segment IDs
+        self.prompt_encoding = prompt_encoding
+        # Compact only: keep non-candidate segments as stripped summaries
+        # instead of dropping them during pre-ranking
+        self.far_context_summaries = far_context_summaries
+        self._compact: Optional[CompactTranscript] = None
         self.logger = setup_logger("ClipSelector", job_folder / "processing.log")
 
     async def select_clips(self, transcript: Dict) -> List[Dict]:
@@ -41,9 +83,27 @@ class ClipSelector:
         lang_name = "English" if lang_code == 'en' else "Hindi"
         self.logger.info(f"Detected language for prompt: {lang_name} ({lang_code})")
 
+        self._prepare_encoding(transcript)
+        if self.candidate_ranker is not None:
+            transcript = await self._prerank_transcript(transcript)
+
+        transcript_tokens = self._estimate_tokens(self._format_transcript(transcript))
+        if transcript_tokens > self.map_reduce_threshold_tokens:
+            self.logger.info(
+                f"Transcript is ~{transcript_tokens} tokens, using map-reduce selection"
+            )
+            best_clips = await self._select_clips_map_reduce(transcript, lang_name)
+            self._save_suggestions(best_clips)
+            return best_clips
+
         base_prompt = self._build_viral_prompt(transcript, lang_name)
         prompt = base_prompt
 
+        if self.speculative_requests > 1:
+            best_clips = await self._select_clips_speculative(base_prompt)
+            self._save_suggestions(best_clips)
+            return best_clips
+
         best_clips: List[Dict] = []
         max_attempts = 3
 
@@ -72,27 +132,476 @@ class ClipSelector:
                 break
 
             # Build feedback prompt for next attempt
-            prompt = (
-                base_prompt
-                + f"""
+            prompt = self._build_feedback_prompt(base_prompt, len(clips))
+
+        self._save_suggestions(best_clips)
+        return best_clips
+
+    async def stream_clips(self, transcript: Dict) -> AsyncIterator[Dict]:
+        """
+        Streaming variant of select_clips.
+
+        The completion is requested with SSE and each clip is validated and
+        yielded as soon as the model has finished writing its JSON object,
+        so downstream tracking/encoding of the first clip overlaps with
+        generation of the rest. With speculative_requests > 1 the variant
+        requests run instead of the single SSE stream and clips are yielded
+        as each response lands. If the result falls short of target_clips,
+        the usual feedback retries top it up with non-overlapping clips.
+        """
+        self.logger.info("Analyzing transcript for viral clips (streaming)")
+
+        lang_code = transcript.get('language', 'hi')
+        lang_name = "English" if lang_code == 'en' else "Hindi"
+
+        self._prepare_encoding(transcript)
+        if self.candidate_ranker is not None:
+            transcript = await self._prerank_transcript(transcript)
+
+        transcript_tokens = self._estimate_tokens(self._format_transcript(transcript))
+        if transcript_tokens > self.map_reduce_threshold_tokens:
+            # The reduce step needs every window's candidates before it can pick
+            self.logger.info(
+                f"Transcript is ~{transcript_tokens} tokens, using map-reduce selection"
+            )
+            clips = await self._select_clips_map_reduce(transcript, lang_name)
+            self._save_suggestions(clips)
+            for clip in clips:
+                yield clip
+            return
+
+        base_prompt = self._build_viral_prompt(transcript, lang_name)
+        accepted: List[Dict] = []
+
+        if self.speculative_requests > 1:
+            stream = self._iter_clips_speculative(base_prompt, accepted)
+        else:
+            stream = self._stream_llm(base_prompt)
+        try:
+            async for raw_clip in stream:
+                if self.speculative_requests > 1:
+                    clip = raw_clip  # Already accepted as its response landed
+                else:
+                    clip = self._accept_clip(raw_clip, accepted)
+                if clip is not None:
+                    self.logger.info(
+                        f"Streamed clip {len(accepted)}: {clip.get('title', '(untitled)')} "
+                        f"[{clip['start_time']} - {clip['end_time']}]"
+                    )
+                    yield clip
+        except Exception as e:
+            self.logger.error(f"Streaming selection failed: {e}")
+        finally:
+            await stream.aclose()
+
+        for attempt in range(2, 4):
+            if len(accepted) >= self.target_clips:
+                break
+
+            self.logger.info(
+                f"Stream returned {len(accepted)}/{self.target_clips} clips, "
+                f"top-up attempt {attempt}/3"
+            )
+            try:
+                raw_clips = await self._call_llm(self._build_feedback_prompt(base_prompt, len(accepted)))
+            except Exception as e:
+                self.logger.error(f"Attempt {attempt} failed: {e}")
+                continue
+
+            for raw_clip in sorted(self._normalize_and_validate_clips(raw_clips), key=self._score, reverse=True):
+                clip = self._accept_clip(raw_clip, accepted)
+                if clip is not None:
+                    yield clip
+
+        self._save_suggestions(accepted)
+
+    def _accept_clip(self, raw_clip: Dict, accepted: List[Dict]) -> Optional[Dict]:
+        """
+        Validate one clip against the duration bounds and the clips already
+        accepted (same 1s overlap buffer as _dedupe_and_limit_clips).
+        Appends and returns it, or None when it is dropped.
+        """
+        if len(accepted) >= self.target_clips or not isinstance(raw_clip, dict):
+            return None
+
+        normalized = self._normalize_and_validate_clips([raw_clip])
+        if not normalized:
+            return None
+        clip = normalized[0]
+
+        overlap_buffer = 1.0
+        start = parse_timestamp(clip["start_time"])
+        end = parse_timestamp(clip["end_time"])
+        for other in accepted:
+            if start < parse_timestamp(other["end_time"]) - overlap_buffer and \
+                    end > parse_timestamp(other["start_time"]) + overlap_buffer:
+                self.logger.info(
+                    "Dropping overlapping clip "
+                    f"{clip.get('title', '(untitled)')} "
+                    f"[{clip['start_time']} - {clip['end_time']}]"
+                )
+                return None
+
+        accepted.append(clip)
+        return clip
+
+    def _speculative_variants(self) -> List[Dict]:
+        """
+        Model, temperature and prompt for each speculative request.
+
+        The first is the normal call. Later ones rotate through the extra
+        models, sample hotter, and every other one asks for spare clips so
+        some survive validation and overlap removal.
+        """
+        models = [self.model] + [m for m in self.speculative_models if m != self.model]
+        variants = []
+        for i in range(self.speculative_requests):
+            variants.append({
+                "model": models[i % len(models)],
+                "temperature": round(min(0.25 + 0.2 * i, 0.9), 2),
+                "oversample": i % 2 == 1,
+            })
+        return variants
+
+    async def _select_clips_speculative(self, base_prompt: str) -> List[Dict]:
+        """Speculative selection, merged clips best score first"""
+        accepted: List[Dict] = []
+        async for _ in self._iter_clips_speculative(base_prompt, accepted):
+            pass
+        accepted.sort(key=self._score, reverse=True)
+        return accepted
+
+    async def _iter_clips_speculative(self, base_prompt: str, accepted: List[Dict]) -> AsyncIterator[Dict]:
+        """
+        Run variant requests concurrently (or hedged) and merge their clips.
+
+        Clips are accepted greedily into `accepted` as responses land, best
+        score first within each response, skipping overlaps with clips
+        already taken, and yielded as they are accepted. Outstanding
+        requests are cancelled once target_clips is reached.
+        """
+        variants = self._speculative_variants()
+        oversample_prompt = base_prompt + f"""
+
+Return {self.target_clips + 2} clips if the content allows it, so the best
+non-overlapping ones can be chosen.
+"""
+        pending: Dict[asyncio.Task, int] = {}
+        loop = asyncio.get_running_loop()
+        next_variant = 0
+        next_launch = loop.time()
+
+        try:
+            while next_variant < len(variants) or pending:
+                if not pending:
+                    # Nothing in flight (earlier requests failed): don't wait
+                    # out the hedge delay, and asyncio.wait() rejects an empty set
+                    next_launch = min(next_launch, loop.time())
+
+                # Launch everything that is due (all at once without a hedge delay)
+                while next_variant < len(variants) and loop.time() >= next_launch:
+                    variant = variants[next_variant]
+                    prompt = oversample_prompt if variant["oversample"] else base_prompt
+                    task = asyncio.create_task(
+                        self._call_llm(prompt, model=variant["model"], temperature=variant["temperature"])
+                    )
+                    pending[task] = next_variant
+                    self.logger.info(
+                        f"Speculative request {next_variant + 1}/{len(variants)}: "
+                        f"{variant['model']} t={variant['temperature']}"
+                        f"{' (oversample)' if variant['oversample'] else ''}"
+                    )
+                    next_variant += 1
+                    next_launch = loop.time() + self.hedge_delay_seconds
+
+                timeout = None
+                if next_variant < len(variants):
+                    timeout = max(0.0, next_launch - loop.time())
+
+                done, _ = await asyncio.wait(
+                    pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    index = pending.pop(task)
+                    try:
+                        raw_clips = task.result()
+                    except Exception as e:
+                        self.logger.error(f"Speculative request {index + 1} failed: {e}")
+                        continue
+
+                    taken = 0
+                    ranked = sorted(self._normalize_and_validate_clips(raw_clips), key=self._score, reverse=True)
+                    for raw_clip in ranked:
+                        clip = self._accept_clip(raw_clip, accepted)
+                        if clip is not None:
+                            taken += 1
+                            yield clip
+                    self.logger.info(
+                        f"Speculative request {index + 1} added {taken} clips "
+                        f"({len(accepted)}/{self.target_clips})"
+                    )
+
+                if len(accepted) >= self.target_clips:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.logger.info(f"Cancelled {len(pending)} outstanding speculative requests")
+
+    def _build_feedback_prompt(self, base_prompt: str, valid_count: int) -> str:
+        """Retry prompt telling the model how far short it fell"""
+        return (
+            base_prompt
+            + f"""
 
 PREVIOUS ATTEMPT FEEDBACK:
-- You only returned {len(clips)} valid, non-overlapping clips.
+- You only returned {valid_count} valid, non-overlapping clips.
 - You MUST now return at least {self.target_clips} non-overlapping clips.
 - If necessary, choose slightly less perfect but still engaging segments
   to reach {self.target_clips} clips.
 - All clips must still be between {self.min_duration} and {self.max_duration}
   seconds and respect the JSON format exactly.
 """
-            )
+        )
 
-        # Save clip suggestions for inspection
+    def _save_suggestions(self, clips: List[Dict]) -> None:
+        """Save clip suggestions for inspection"""
         suggestions_path = self.job_folder / "clip_suggestions.json"
         with open(suggestions_path, "w", encoding="utf-8") as f:
-            json.dump(best_clips, f, ensure_ascii=False, indent=2)
+            json.dump(clips, f, ensure_ascii=False, indent=2)
 
-        self.logger.info(f"Selected {len(best_clips)} clips")
-        return best_clips
+        self.logger.info(f"Selected {len(clips)} clips")
+
+    def _prepare_encoding(self, transcript: Dict) -> None:
+        """Number the full transcript once so segment IDs are global"""
+        if self.prompt_encoding == "compact":
+            self._compact = CompactTranscript(transcript.get("segments", []))
+        else:
+            self._compact = None
+
+    async def _prerank_transcript(self, transcript: Dict) -> Dict:
+        """
+        Keep only segments inside the locally top-ranked candidate windows.
+
+        Transcripts that already fit in one prompt are left whole, so short
+        videos keep their full context.
+        """
+        tokens = self._estimate_tokens(self._format_transcript(transcript))
+        if tokens <= self.map_reduce_threshold_tokens:
+            self.logger.info(
+                f"Transcript is ~{tokens} tokens, fits one prompt; skipping pre-ranking"
+            )
+            return transcript
+
+        # Audio energy needs an ffmpeg decode; keep it off the event loop
+        windows = await asyncio.to_thread(self.candidate_ranker.rank, transcript)
+        if not windows:
+            return transcript
+
+        if self._compact is not None and self.far_context_summaries:
+            self.logger.info(
+                f"Pre-ranking: {len(windows)} focus windows, other segments as summaries"
+            )
+            return {**transcript, "focus_ranges": [(w["start"], w["end"]) for w in windows]}
+
+        segments = transcript.get("segments", [])
+        kept = [
+            seg for seg in segments
+            if any(seg["start"] < w["end"] and seg["end"] > w["start"] for w in windows)
+        ]
+
+        before = self._estimate_tokens(self._format_transcript(transcript))
+        reduced = {**transcript, "segments": kept}
+        after = self._estimate_tokens(self._format_transcript(reduced))
+        self.logger.info(
+            f"Pre-ranking kept {len(kept)}/{len(segments)} segments in "
+            f"{len(windows)} windows (~{before} -> ~{after} tokens)"
+        )
+        return reduced
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """
+        Cheap token estimate: ~4 chars per token for ASCII, ~2 for other
+        scripts (Devanagari tokenizes much less efficiently).
+        """
+        ascii_chars = sum(1 for c in text if ord(c) < 128)
+        return ascii_chars // 4 + (len(text) - ascii_chars) // 2
+
+    def _split_windows(self, segments: List[Dict]) -> List[List[Dict]]:
+        """
+        Split segments into windows of about window_tokens each.
+
+        Consecutive windows overlap by window_overlap_seconds so a clip
+        that straddles a boundary is fully visible in at least one window.
+        """
+        windows: List[List[Dict]] = []
+        start = 0
+
+        while start < len(segments):
+            tokens = 0
+            end = start
+            while end < len(segments):
+                tokens += self._estimate_tokens(segments[end].get("text", "")) + 8
+                if tokens > self.window_tokens and end > start:
+                    break
+                end += 1
+
+            windows.append(segments[start:end])
+            if end >= len(segments):
+                break
+
+            # Next window starts overlap_seconds before this one ends, but
+            # always advances by at least half a window
+            overlap_from = segments[end - 1]["end"] - self.window_overlap_seconds
+            min_next = start + max(1, (end - start) // 2)
+            next_start = end
+            while next_start > min_next and segments[next_start - 1]["start"] >= overlap_from:
+                next_start -= 1
+            start = next_start
+
+        return windows
+
+    def _build_map_prompt(
+        self,
+        window: List[Dict],
+        language: str,
+        index: int,
+        count: int,
+        focus_ranges: Optional[List] = None
+    ) -> str:
+        """Prompt for one window: candidates with a score for the reduce step"""
+        prompt = self._build_viral_prompt({"segments": window, "focus_ranges": focus_ranges}, language)
+        return prompt + f"""
+This is part {index + 1} of {count} of a longer video. Return up to {self.target_clips}
+candidate clips from THIS part only. For each clip also include "virality_score"
+(integer 1-100) and a short "title"; these are required for ranking across parts.
+"""
+
+    async def _select_clips_map_reduce(self, transcript: Dict, language: str) -> List[Dict]:
+        """
+        Query overlapping transcript windows concurrently, then pick the
+        final clips from the pooled candidates.
+
+        Latency is roughly one window call plus a small reduce call,
+        independent of transcript length.
+        """
+        windows = self._split_windows(transcript.get("segments", []))
+        semaphore = asyncio.Semaphore(self.max_concurrent_windows)
+        self.logger.info(f"Map step: {len(windows)} windows")
+
+        async def map_window(index: int, window: List[Dict]) -> List[Dict]:
+            async with semaphore:
+                prompt = self._build_map_prompt(
+                    window, language, index, len(windows), transcript.get("focus_ranges")
+                )
+                try:
+                    clips = await self._call_llm(prompt)
+                except Exception as e:
+                    self.logger.error(f"Window {index + 1} failed: {e}")
+                    return []
+                clips = self._normalize_and_validate_clips(clips)
+                self.logger.info(f"Window {index + 1}/{len(windows)}: {len(clips)} candidates")
+                return clips
+
+        results = await asyncio.gather(
+            *(map_window(i, window) for i, window in enumerate(windows))
+        )
+        candidates = self._merge_candidates([clip for clips in results for clip in clips])
+        self.logger.info(f"Reduce step: {len(candidates)} unique candidates")
+
+        if len(candidates) <= self.target_clips:
+            return self._dedupe_and_limit_clips(candidates)
+
+        if self.reduce_strategy == "llm":
+            try:
+                # Candidates are listed by timestamp, so the reduce call always
+                # uses the timestamp system prompt (not the segment-ID one)
+                reduced = await self._call_llm(
+                    self._build_reduce_prompt(candidates, transcript),
+                    system_message=self._get_system_message(compact=False)
+                )
+                clips = self._dedupe_and_limit_clips(reduced)
+                if len(clips) >= min(self.target_clips, len(candidates)):
+                    return clips
+                self.logger.info(f"Reduce pass returned {len(clips)} clips, ranking locally")
+            except Exception as e:
+                self.logger.error(f"Reduce pass failed, ranking locally: {e}")
+
+        return self._rank_candidates(candidates)
+
+    def _merge_candidates(self, candidates: List[Dict]) -> List[Dict]:
+        """
+        Collapse duplicates from overlapping windows: clips overlapping by
+        more than half their length keep only the higher-scored one.
+        """
+        merged: List[Dict] = []
+        for clip in sorted(candidates, key=self._score, reverse=True):
+            s = parse_timestamp(clip["start_time"])
+            e = parse_timestamp(clip["end_time"])
+            duplicate = False
+            for kept in merged:
+                ks = parse_timestamp(kept["start_time"])
+                ke = parse_timestamp(kept["end_time"])
+                overlap = min(e, ke) - max(s, ks)
+                if overlap > 0.5 * min(e - s, ke - ks):
+                    duplicate = True
+                    break
+            if not duplicate:
+                merged.append(clip)
+        return merged
+
+    def _rank_candidates(self, candidates: List[Dict]) -> List[Dict]:
+        """Local reduce: highest score first, skipping clips that overlap a pick"""
+        picked: List[Dict] = []
+        for clip in sorted(candidates, key=self._score, reverse=True):
+            s = parse_timestamp(clip["start_time"])
+            e = parse_timestamp(clip["end_time"])
+            if all(
+                e <= parse_timestamp(p["start_time"]) or s >= parse_timestamp(p["end_time"])
+                for p in picked
+            ):
+                picked.append(clip)
+            if len(picked) >= self.target_clips:
+                break
+        return picked
+
+    def _build_reduce_prompt(self, candidates: List[Dict], transcript: Dict) -> str:
+        """Small prompt listing candidates with a text excerpt each"""
+        segments = transcript.get("segments", [])
+        lines = []
+        for i, clip in enumerate(candidates):
+            s = parse_timestamp(clip["start_time"])
+            e = parse_timestamp(clip["end_time"])
+            excerpt = " ".join(
+                seg["text"].strip() for seg in segments
+                if seg["start"] < e and seg["end"] > s
+            )[:400]
+            title = clip.get("title")
+            lines.append(
+                f"[{i}] {clip['start_time']} - {clip['end_time']} "
+                f"(score {self._score(clip):.0f})"
+                + (f" {json.dumps(title, ensure_ascii=False)}" if title else "")
+                + f": {excerpt}"
+            )
+
+        candidate_text = "\n".join(lines)
+        return f"""Below are {len(candidates)} candidate clips found in different parts of one long video.
+Pick the {self.target_clips} strongest, non-overlapping clips for Instagram Reels and YouTube Shorts.
+Answer with "start_time" and "end_time" copied exactly from the chosen candidates
+(HH:MM:SS), plus their "virality_score" and "title".
+
+CANDIDATES:
+{candidate_text}
+"""
+
+    @staticmethod
+    def _score(clip: Dict) -> float:
+        try:
+            return float(clip.get("virality_score", 0) or 0)
+        except Exception:
+            return 0.0
 
     def _build_viral_prompt(self, transcript: Dict, language: str = "Hindi") -> str:
         """
@@ -116,6 +625,9 @@ TRANSCRIPT:
     def _format_transcript(self, transcript: Dict) -> str:
         """Format transcript segments with timestamps for LLM analysis."""
         segments = transcript.get("segments", [])
+        if self._compact is not None:
+            return self._compact.render(segments, transcript.get("focus_ranges"))
+
 
         formatted = []
         for seg in segments:
@@ -134,15 +646,22 @@ TRANSCRIPT:
         secs = int(seconds % 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
-    def _get_system_message(self) -> str:
+    def _get_system_message(self, compact: Optional[bool] = None) -> str:
         """
         Load the system prompt for clip selection from an external template.
 
         This keeps the long instructions out of the code and makes it easier
-        to iterate on the messaging without touching Python logic.
+        to iterate on the messaging without touching Python logic. compact
+        defaults to the active prompt encoding.
         """
+        if compact is None:
+            compact = self._compact is not None
         base_dir = Path(__file__).resolve().parent.parent
-        template_path = base_dir / "prompts" / "clip_selector_system.txt"
+        template_name = (
+            "clip_selector_system_compact.txt" if compact
+            else "clip_selector_system.txt"
+        )
+        template_path = base_dir / "prompts" / template_name
 
         try:
             template = template_path.read_text(encoding="utf-8")
@@ -159,94 +678,196 @@ TRANSCRIPT:
 
         return template.format(min_d=self.min_duration, max_d=self.max_duration)
 
-    async def _call_llm(self, prompt: str) -> List[Dict]:
-        """Call OpenRouter API with viral clip selection prompt."""
-        url = "https://openrouter.ai/api/v1/chat/completions"
-
-        headers = {
+    def _headers(self) -> Dict:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "HTTP-Referer": "http://localhost:8000",
             "X-Title": "Automated Shorts Generator",
         }
 
-        system_message = self._get_system_message()
-
-        payload = {
-            "model": self.model,
+    def _build_payload(
+        self,
+        system_message: str,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.25
+    ) -> Dict:
+        return {
+            "model": model or self.model,
             "messages": [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": prompt},
             ],
             # More deterministic behavior so constraints are followed
-            "temperature": 0.25,
+            "temperature": temperature,
             "top_p": 0.8,
             "max_tokens": 20000,
             "response_format": {"type": "json_object"},
         }
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
+    def _cache_key(self, system_message: str, prompt: str, payload: Dict) -> str:
+        # Streamed and non-streamed calls share entries
+        sampling = {k: v for k, v in payload.items() if k not in ("model", "messages", "stream")}
+        return self.llm_cache.make_key(payload["model"], system_message, prompt, sampling)
 
-                result = response.json()
+    async def _call_llm(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.25,
+        system_message: Optional[str] = None
+    ) -> List[Dict]:
+        """Call OpenRouter API with viral clip selection prompt."""
+        url = self.api_url
+        headers = self._headers()
+        system_message = system_message or self._get_system_message()
+        payload = self._build_payload(system_message, prompt, model, temperature)
 
-                self.logger.info(
-                    f"OpenRouter response keys: {list(result.keys())}"
-                )
-                self.logger.info(
-                    f"Full response: {json.dumps(result, indent=2)[:1000]}"
-                )
+        cache_key = None
+        raw_text = None
+        if self.llm_cache is not None:
+            cache_key = self._cache_key(system_message, prompt, payload)
+            raw_text = self.llm_cache.get(cache_key)
+            if raw_text is not None:
+                self.logger.info(f"LLM cache hit ({cache_key[:12]}), skipping OpenRouter call")
 
-                message = result["choices"][0]["message"]
-                content = message.get("content") or ""
-                reasoning = message.get("reasoning") or ""
+        cached = raw_text is not None
 
-                self.logger.info(
-                    f"LLM content length: {len(content) if content else 0}"
-                )
-                self.logger.info(
-                    f"LLM content preview: {content[:500] if content else 'EMPTY'}"
-                )
-                if reasoning:
-                    self.logger.info(
-                        f"LLM reasoning length: {len(reasoning)}"
-                    )
-                    self.logger.info(
-                        f"LLM reasoning preview: {reasoning[:500]}"
-                    )
+        try:
+            if not cached:
+                raw_text = await self._request_completion(url, headers, payload)
 
-                raw_text = content if content.strip() else reasoning
+            response_text = raw_text
 
-                # Strip possible markdown fences
-                if "```json" in raw_text:
-                    raw_text = raw_text.split("```json")[1].split("```")[0]
-                elif "```" in raw_text:
-                    raw_text = raw_text.split("```")[1].split("```")[0]
+            # Strip possible markdown fences
+            if "```json" in raw_text:
+                raw_text = raw_text.split("```json")[1].split("```")[0]
+            elif "```" in raw_text:
+                raw_text = raw_text.split("```")[1].split("```")[0]
 
-                clips_data = json.loads(raw_text.strip())
-                raw_clips = clips_data.get("clips", [])
+            clips_data = json.loads(raw_text.strip())
+            raw_clips = clips_data.get("clips", [])
 
-                self.logger.info(f"LLM suggested {len(raw_clips)} clips")
+            self.logger.info(f"LLM suggested {len(raw_clips)} clips")
 
-                return raw_clips
+            # Only cache responses that parsed
+            if cache_key is not None and not cached:
+                self.llm_cache.set(cache_key, response_text)
 
-            except httpx.HTTPError as e:
-                self.logger.error(f"HTTP error calling LLM: {e}")
-                if getattr(e, "response", None) is not None:
-                    self.logger.error(
-                        f"Response status: {e.response.status_code}"
-                    )
-                    self.logger.error(f"Response body: {e.response.text}")
-                raise Exception(f"LLM API call failed: {e}")
-            except json.JSONDecodeError as e:
-                self.logger.error(f"Failed to parse LLM response as JSON: {e}")
-                self.logger.error(f"Raw response: {raw_text}")
-                raise Exception(f"LLM returned invalid JSON: {e}")
-            except Exception as e:
-                self.logger.error(f"Error calling LLM: {e}")
-                raise
+            return raw_clips
+
+        except httpx.HTTPError as e:
+            self.logger.error(f"HTTP error calling LLM: {e}")
+            if getattr(e, "response", None) is not None:
+                self.logger.error(
+                    f"Response status: {e.response.status_code}"
+                )
+                self.logger.error(f"Response body: {e.response.text}")
+            raise Exception(f"LLM API call failed: {e}")
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Failed to parse LLM response as JSON: {e}")
+            self.logger.error(f"Raw response: {raw_text}")
+            raise Exception(f"LLM returned invalid JSON: {e}")
+        except Exception as e:
+            self.logger.error(f"Error calling LLM: {e}")
+            raise
+
+    async def _stream_llm(self, prompt: str) -> AsyncIterator[Dict]:
+        """Stream a completion over SSE, yielding raw clip objects as they complete"""
+        system_message = self._get_system_message()
+        payload = self._build_payload(system_message, prompt)
+        parser = IncrementalArrayParser("clips")
+
+        cache_key = None
+        if self.llm_cache is not None:
+            cache_key = self._cache_key(system_message, prompt, payload)
+            cached = self.llm_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info(f"LLM cache hit ({cache_key[:12]}), skipping OpenRouter call")
+                for raw_clip in parser.feed(cached):
+                    yield raw_clip
+                return
+
+        reasoning_parts: List[str] = []
+        async with get_gateway().stream(
+            "POST",
+            self.api_url,
+            headers=self._headers(),
+            json={**payload, "stream": True},
+            timeout=60.0
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                self.logger.error(f"Response body: {response.text}")
+                response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                # Blank lines separate events; ':' lines are keep-alive comments
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                event = json.loads(data)
+                if "error" in event:
+                    raise Exception(f"LLM stream error: {event['error']}")
+                choices = event.get("choices") or []
+                if not choices:
+                    continue
+
+                delta = choices[0].get("delta") or {}
+                if delta.get("reasoning"):
+                    reasoning_parts.append(delta["reasoning"])
+                if delta.get("content"):
+                    for raw_clip in parser.feed(delta["content"]):
+                        yield raw_clip
+
+        # Same fallback as _request_completion: answer only in the reasoning
+        if not parser.buffer.strip() and reasoning_parts:
+            for raw_clip in parser.feed("".join(reasoning_parts)):
+                yield raw_clip
+
+        self.logger.info(
+            f"LLM stream finished: {len(parser.items)} clips in {len(parser.buffer)} chars"
+        )
+        if cache_key is not None and parser.items:
+            self.llm_cache.set(cache_key, parser.buffer)
+
+    async def _request_completion(self, url: str, headers: Dict, payload: Dict) -> str:
+        """POST a chat completion and return the message text"""
+        response = await get_gateway().post(url, headers=headers, json=payload, timeout=60.0)
+        response.raise_for_status()
+
+        result = response.json()
+
+        self.logger.info(
+            f"OpenRouter response keys: {list(result.keys())}"
+        )
+        self.logger.info(
+            f"Full response: {json.dumps(result, indent=2)[:1000]}"
+        )
+
+        message = result["choices"][0]["message"]
+        content = message.get("content") or ""
+        reasoning = message.get("reasoning") or ""
+
+        self.logger.info(
+            f"LLM content length: {len(content) if content else 0}"
+        )
+        self.logger.info(
+            f"LLM content preview: {content[:500] if content else 'EMPTY'}"
+        )
+        if reasoning:
+            self.logger.info(
+                f"LLM reasoning length: {len(reasoning)}"
+            )
+            self.logger.info(
+                f"LLM reasoning preview: {reasoning[:500]}"
+            )
+
+        return content if content.strip() else reasoning
 
     def _normalize_and_validate_clips(self, clips: List[Dict]) -> List[Dict]:
         """
@@ -260,6 +881,13 @@ TRANSCRIPT:
         dropped: List[Dict] = []
 
         for clip in clips:
+            if self._compact is not None:
+                try:
+                    clip = self._compact.resolve(clip)
+                except ValueError as e:
+                    dropped.append({"clip": clip, "reason": str(e)})
+                    continue
+
             start_str = clip.get("start_time")
             end_str = clip.get("end_time")
 
@@ -346,13 +974,7 @@ TRANSCRIPT:
             return []
 
         # Sort by virality_score (highest first) and cap at target_clips
-        def score(c: Dict) -> float:
-            try:
-                return float(c.get("virality_score", 0) or 0)
-            except Exception:
-                return 0.0
-
-        non_overlapping.sort(key=score, reverse=True)
+        non_overlapping.sort(key=self._score, reverse=True)
 
         if len(non_overlapping) > self.target_clips:
             non_overlapping = non_overlapping[: self.target_clips]
@@ -1,26 +1,84 @@
+import time
+
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from ultralytics import YOLO
+from modules.tracking_cache import FaceTrackCache
 from utils.helpers import setup_logger, parse_timestamp
 
 
 class FaceTracker:
     """Face detection and tracking using YOLOv8"""
 
-    def __init__(self, job_folder: Path):
+    model_name: str = 'yolov8n-pose.pt'
+
+    # Tiered detection: the cheap face detector runs on a frame downscaled
+    # to this width, and multiple faces further apart than this fraction of
+    # the frame width count as conflicting (escalate to YOLO pose)
+    cheap_detector_width: int = 320
+    face_conflict_distance: float = 0.15
+
+    # Mean absolute pixel difference (0-255) between sampled thumbnails
+    # that counts as a hard cut
+    shot_change_threshold: float = 30.0
+
+    # Crop trajectory smoothing: median window (samples) and the dead zone
+    # (fraction of frame width) a face must leave before the crop follows
+    trajectory_median_window: int = 5
+    trajectory_dead_zone: float = 0.03
+
+    def __init__(
+        self,
+        job_folder: Path,
+        model: Optional[YOLO] = None,
+        detector_strategy: str = "yolo",
+        yunet_model_path: Optional[Path] = None,
+        cache_dir: Optional[Path] = None,
+        cache_max_bytes: int = 500 * 1024 * 1024
+    ):
+        """
+        Args:
+            job_folder: Job output folder (for logging)
+            model: Optional already-loaded YOLO model to reuse
+            detector_strategy: "yolo" (pose on every sample) or "tiered"
+                (cheap face detector first, YOLO pose only when it finds
+                zero or conflicting faces)
+            yunet_model_path: YuNet ONNX model for the cheap tier. Defaults
+                to models/face_detection_yunet_2023mar.onnx; the bundled
+                OpenCV Haar cascade is used when it is missing.
+            cache_dir: Optional folder for persistent tracking results
+                (reused across jobs on the same source video)
+            cache_max_bytes: Size bound for the tracking cache (LRU by video)
+        """
         self.job_folder = job_folder
         self.logger = setup_logger(
             "FaceTracker",
             job_folder / "processing.log"
         )
 
+        if detector_strategy not in ("yolo", "tiered"):
+            raise ValueError(f"Unknown detector strategy: {detector_strategy}")
+        self.detector_strategy = detector_strategy
+        self.tier_stats: Dict[str, Dict] = {}
+        self.cheap_detector = None
+        self.cheap_detector_name = None
+        if detector_strategy == "tiered":
+            self._load_cheap_detector(yunet_model_path)
+
+        self.cache = FaceTrackCache(cache_dir, cache_max_bytes) if cache_dir else None
+
+        if model is not None:
+            # Reuse an already-loaded (warm) model, e.g. inside a pool worker
+            self.model = model
+            return
+
         # Initialize YOLO Pose model for accurate face tracking via keypoints
         # Using YOLOv8n-pose (nano) for speed on M4 Pro
         # Will download on first run
         self.logger.info("Loading YOLOv8 Pose model for face detection via keypoints")
-        self.model = YOLO('yolov8n-pose.pt')  # Pose model provides nose/eyes keypoints
+        self.model = YOLO(self.model_name)  # Pose model provides nose/eyes keypoints
 
     def track_faces_in_clip(
         self,
@@ -42,6 +100,7 @@ class FaceTracker:
             Dict with face positions and optimal crop coordinates
         """
         self.logger.info(f"Tracking faces from {start_time} to {end_time}")
+        self._reset_tier_stats()
 
         # Open video
         cap = cv2.VideoCapture(str(video_path))
@@ -57,98 +116,35 @@ class FaceTracker:
         start_frame = int(start_seconds * fps)
         end_frame = int(end_seconds * fps)
 
-        # Set to start frame
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-
-        face_positions = []
-        frame_count = start_frame
+        # Reuse cached ranges and only track what is still missing
+        if self.cache is not None:
+            fingerprint = self.cache.source_fingerprint(video_path)
+            cache_params = self._cache_params(sample_rate)
+            face_positions, shot_changes, gaps = self.cache.lookup(
+                fingerprint, cache_params, start_frame, end_frame
+            )
+            self.logger.info(
+                f"Tracking cache: {len(face_positions)} cached positions, "
+                f"{len(gaps)} frame range(s) to track"
+            )
+        else:
+            face_positions, shot_changes, gaps = [], [], [(start_frame, end_frame)]
 
-        while frame_count < end_frame:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        for gap_start, gap_end in gaps:
+            positions, cuts = self._scan_frames(cap, gap_start, gap_end, sample_rate)
+            face_positions.extend(positions)
+            shot_changes.extend(cuts)
 
-            # Sample frames for efficiency
-            if (frame_count - start_frame) % sample_rate == 0:
-                # Detect persons and keypoints using YOLO Pose
-                results = self.model(
-                    frame,
-                    device='mps',  # Use Apple Silicon GPU
-                    verbose=False
+            if self.cache is not None:
+                self.cache.store(
+                    fingerprint, cache_params, gap_start, gap_end, positions, cuts
                 )
 
-                # Extract pose keypoints (nose, eyes) for accurate face centering
-                for result in results:
-                    # Check if keypoints are available
-                    if result.keypoints is None or len(result.keypoints) == 0:
-                        continue
-
-                    boxes = result.boxes
-                    keypoints = result.keypoints
-
-                    for i, (box, kpts) in enumerate(zip(boxes, keypoints)):
-                        confidence = box.conf[0].cpu().numpy()
-
-                        if confidence > 0.5:  # Confidence threshold
-                            # Get bounding box for reference
-                            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-
-                            # Extract keypoints (COCO format: 17 keypoints)
-                            # 0 = nose, 1 = left_eye, 2 = right_eye, 3 = left_ear, 4 = right_ear
-                            kpts_xy = kpts.xy[0].cpu().numpy()  # Shape: [17, 2]
-
-                            # Get face keypoints (nose + eyes)
-                            nose = kpts_xy[0]       # [x, y]
-                            left_eye = kpts_xy[1]
-                            right_eye = kpts_xy[2]
-
-                            # Calculate face center from nose and eyes
-                            # Use average of available keypoints (some might be occluded)
-                            face_points = []
-
-                            # Keypoint is valid if both x and y are > 0
-                            if nose[0] > 0 and nose[1] > 0:
-                                face_points.append(nose)
-                            if left_eye[0] > 0 and left_eye[1] > 0:
-                                face_points.append(left_eye)
-                            if right_eye[0] > 0 and right_eye[1] > 0:
-                                face_points.append(right_eye)
-
-                            # If we have face keypoints, use them; otherwise fall back to person box
-                            if len(face_points) >= 1:
-                                # Calculate average position of detected face keypoints
-                                face_x = np.mean([pt[0] for pt in face_points])
-                                face_y = np.mean([pt[1] for pt in face_points])
-
-                                face_positions.append({
-                                    'frame': frame_count,
-                                    'center_x': int(face_x),
-                                    'center_y': int(face_y),
-                                    'box': [int(x1), int(y1), int(x2), int(y2)],
-                                    'keypoints_used': len(face_points),
-                                    'confidence': float(confidence),
-                                    'method': 'pose_keypoints'
-                                })
-                            else:
-                                # Fallback: use person box with heuristic
-                                box_width = x2 - x1
-                                box_height = y2 - y1
-                                center_x = int((x1 + x2) / 2)
-                                center_y = int(y1 + box_height * 0.15)
-
-                                face_positions.append({
-                                    'frame': frame_count,
-                                    'center_x': center_x,
-                                    'center_y': center_y,
-                                    'box': [int(x1), int(y1), int(x2), int(y2)],
-                                    'keypoints_used': 0,
-                                    'confidence': float(confidence),
-                                    'method': 'bbox_heuristic'
-                                })
-
-            frame_count += 1
+        face_positions.sort(key=lambda p: p['frame'])
+        shot_changes = sorted(shot_changes)
 
         cap.release()
+        self._log_tier_stats()
 
         if not face_positions:
             self.logger.warning("No faces detected in clip")
@@ -158,15 +154,415 @@ class FaceTracker:
         # Calculate stable face center over time
         stats = self._calculate_face_center(face_positions, frame_width, frame_height)
 
+        # Per-shot smoothed trajectory for dynamic reframing
+        crop_trajectory = self._build_crop_trajectory(
+            face_positions,
+            shot_changes,
+            start_frame,
+            fps,
+            frame_width,
+            (stats['face_center_x'], stats['face_center_y'])
+        )
+
         self.logger.info(f"Detected {len(face_positions)} face positions")
+        self.logger.info(
+            f"Shot changes: {len(shot_changes)}, "
+            f"crop keyframes: {len(crop_trajectory)}"
+        )
         return {
             'face_positions': face_positions,
             'face_center_x': stats['face_center_x'],
             'face_center_y': stats['face_center_y'],
+            'shot_changes': shot_changes,
+            'crop_trajectory': crop_trajectory,
+            'detector_stats': self.tier_stats,
             'source_width': frame_width,
             'source_height': frame_height
         }
 
+    def _cache_params(self, sample_rate: int) -> Dict:
+        """Tracking configuration that identifies a cached result"""
+        return {
+            'tracker': type(self).__name__,
+            'model': self.model_name,
+            'detector_strategy': self.detector_strategy,
+            'cheap_detector': self.cheap_detector_name,
+            'sample_rate': sample_rate
+        }
+
+    def _scan_frames(
+        self,
+        cap: cv2.VideoCapture,
+        start_frame: int,
+        end_frame: int,
+        sample_rate: int
+    ) -> Tuple[List[Dict], List[int]]:
+        """
+        Walk the clip frame by frame and run detection on every Nth frame.
+
+        Returns:
+            (face positions with absolute frame numbers,
+             absolute frame numbers where a shot change was detected)
+        """
+        # Set to start frame
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+        face_positions = []
+        shot_changes = []
+        prev_thumb = None
+        frame_count = start_frame
+
+        while frame_count < end_frame:
+            # Sample frames for efficiency
+            if (frame_count - start_frame) % sample_rate == 0:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                thumb = self._frame_thumbnail(frame)
+                if prev_thumb is not None and self._is_shot_change(prev_thumb, thumb):
+                    shot_changes.append(frame_count)
+                prev_thumb = thumb
+
+                face_positions.extend(self._detect_faces(frame, frame_count))
+            elif not cap.grab():
+                # Skipped frames only need to be grabbed, not decoded
+                break
+
+            frame_count += 1
+
+        return face_positions, shot_changes
+
+    @staticmethod
+    def _frame_thumbnail(frame: np.ndarray) -> np.ndarray:
+        """Small grayscale thumbnail used for cheap shot-change checks"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, (64, 36), interpolation=cv2.INTER_AREA)
+
+    def _is_shot_change(self, prev_thumb: np.ndarray, thumb: np.ndarray) -> bool:
+        """Detect a hard cut between two sampled frames"""
+        diff = cv2.absdiff(prev_thumb, thumb)
+        return float(np.mean(diff)) > self.shot_change_threshold
+
+    def _detect_faces(self, frame: np.ndarray, frame_count: int) -> List[Dict]:
+        """
+        Detect faces in a single frame with the configured strategy.
+
+        In tiered mode the cheap detector's answer is used when it finds a
+        single face (or several that agree on one position); zero or
+        conflicting faces escalate to YOLO pose.
+
+        Returns:
+            List of face position dicts
+        """
+        if self.detector_strategy == "tiered":
+            started = time.perf_counter()
+            cheap_positions = self._detect_faces_cheap(frame, frame_count)
+            accepted = self._resolve_cheap_detections(cheap_positions, frame.shape[1])
+            self._record_tier("cheap", started, hit=bool(accepted))
+            if accepted:
+                return accepted
+
+        started = time.perf_counter()
+        positions = self._detect_faces_yolo(frame, frame_count)
+        self._record_tier("yolo", started, hit=bool(positions))
+        return positions
+
+    def _load_cheap_detector(self, yunet_model_path: Optional[Path]) -> None:
+        """Load YuNet if its model file is available, else the Haar cascade"""
+        if yunet_model_path is None:
+            base_dir = Path(__file__).resolve().parent.parent
+            yunet_model_path = base_dir / "models" / "face_detection_yunet_2023mar.onnx"
+
+        if yunet_model_path.exists() and hasattr(cv2, "FaceDetectorYN"):
+            self.cheap_detector = cv2.FaceDetectorYN.create(
+                str(yunet_model_path), "", (320, 320), 0.8
+            )
+            self.cheap_detector_name = "yunet"
+        else:
+            self.logger.warning(
+                f"YuNet model not found at {yunet_model_path}; the cheap tier falls "
+                "back to the Haar cascade, which has no calibrated confidence"
+            )
+            cascade_path = Path(cv2.data.haarcascades) / "haarcascade_frontalface_default.xml"
+            self.cheap_detector = cv2.CascadeClassifier(str(cascade_path))
+            self.cheap_detector_name = "haar"
+
+        self.logger.info(f"Tiered face detection: cheap tier = {self.cheap_detector_name}")
+
+    def _detect_faces_cheap(self, frame: np.ndarray, frame_count: int) -> List[Dict]:
+        """
+        Run the cheap face detector on a downscaled copy of the frame.
+
+        Returns:
+            List of face position dicts in source-frame coordinates
+        """
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.cheap_detector_width / max(width, 1))
+        small = cv2.resize(
+            frame,
+            (int(width * scale), int(height * scale)),
+            interpolation=cv2.INTER_AREA
+        ) if scale < 1.0 else frame
+
+        # (x, y, w, h, score) in downscaled coordinates
+        boxes = []
+        if self.cheap_detector_name == "yunet":
+            self.cheap_detector.setInputSize((small.shape[1], small.shape[0]))
+            _, faces = self.cheap_detector.detect(small)
+            if faces is not None:
+                boxes = [(f[0], f[1], f[2], f[3], float(f[-1])) for f in faces]
+        else:
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+            faces = self.cheap_detector.detectMultiScale(
+                gray, scaleFactor=1.1, minNeighbors=5, minSize=(20, 20)
+            )
+            # Haar cascades have no calibrated score
+            boxes = [(x, y, w, h, 0.6) for (x, y, w, h) in faces]
+
+        face_positions = []
+        for x, y, w, h, score in boxes:
+            x1, y1 = x / scale, y / scale
+            x2, y2 = (x + w) / scale, (y + h) / scale
+            face_positions.append({
+                'frame': frame_count,
+                'center_x': int((x1 + x2) / 2),
+                'center_y': int((y1 + y2) / 2),
+                'box': [int(x1), int(y1), int(x2), int(y2)],
+                'keypoints_used': 0,
+                'confidence': score,
+                'method': self.cheap_detector_name
+            })
+
+        return face_positions
+
+    def _resolve_cheap_detections(
+        self,
+        face_positions: List[Dict],
+        frame_width: int
+    ) -> List[Dict]:
+        """
+        Accept the cheap tier's result only when it is unambiguous.
+
+        Returns:
+            The single face to keep, or an empty list to escalate
+        """
+        if not face_positions:
+            return []
+
+        xs = [pos['center_x'] for pos in face_positions]
+        if max(xs) - min(xs) > self.face_conflict_distance * frame_width:
+            # Several people in frame: let YOLO pose sort out who is who
+            return []
+
+        # Duplicate boxes around the same face: keep the largest
+        def area(pos: Dict) -> int:
+            x1, y1, x2, y2 = pos['box']
+            return (x2 - x1) * (y2 - y1)
+
+        return [max(face_positions, key=area)]
+
+    def _reset_tier_stats(self) -> None:
+        """Start fresh per-tier counters for a clip"""
+        self.tier_stats = {
+            tier: {'calls': 0, 'hits': 0, 'seconds': 0.0}
+            for tier in (("cheap", "yolo") if self.detector_strategy == "tiered" else ("yolo",))
+        }
+
+    def _record_tier(self, tier: str, started: float, hit: bool) -> None:
+        """Add one detector call to the per-tier counters"""
+        stats = self.tier_stats.setdefault(tier, {'calls': 0, 'hits': 0, 'seconds': 0.0})
+        stats['calls'] += 1
+        stats['hits'] += int(hit)
+        stats['seconds'] += time.perf_counter() - started
+
+    def _log_tier_stats(self) -> None:
+        """Log per-tier hit rates and timings for tuning"""
+        self.logger.info(f"Face detector tiers ({self.detector_strategy}):")
+        for tier, stats in self.tier_stats.items():
+            calls = stats['calls']
+            if not calls:
+                self.logger.info(f"  - {tier}: no calls")
+                continue
+            hit_rate = stats['hits'] / calls * 100
+            avg_ms = stats['seconds'] / calls * 1000
+            self.logger.info(
+                f"  - {tier}: {calls} calls, {hit_rate:.1f}% hit rate, "
+                f"{avg_ms:.1f} ms/call, {stats['seconds']:.2f}s total"
+            )
+
+    def _detect_faces_yolo(self, frame: np.ndarray, frame_count: int) -> List[Dict]:
+        """
+        Detect faces in a single frame using YOLO pose keypoints.
+
+        Returns:
+            List of face position dicts for every confident person
+        """
+        face_positions = []
+
+        # Detect persons and keypoints using YOLO Pose
+        results = self.model(
+            frame,
+            device='mps',  # Use Apple Silicon GPU
+            verbose=False
+        )
+
+        # Extract pose keypoints (nose, eyes) for accurate face centering
+        for result in results:
+            # Check if keypoints are available
+            if result.keypoints is None or len(result.keypoints) == 0:
+                continue
+
+            boxes = result.boxes
+            keypoints = result.keypoints
+
+            for box, kpts in zip(boxes, keypoints):
+                confidence = box.conf[0].cpu().numpy()
+
+                if confidence > 0.5:  # Confidence threshold
+                    # Get bounding box for reference
+                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+
+                    # Extract keypoints (COCO format: 17 keypoints)
+                    # 0 = nose, 1 = left_eye, 2 = right_eye, 3 = left_ear, 4 = right_ear
+                    kpts_xy = kpts.xy[0].cpu().numpy()  # Shape: [17, 2]
+
+                    # Get face keypoints (nose + eyes)
+                    nose = kpts_xy[0]       # [x, y]
+                    left_eye = kpts_xy[1]
+                    right_eye = kpts_xy[2]
+
+                    # Calculate face center from nose and eyes
+                    # Use average of available keypoints (some might be occluded)
+                    face_points = []
+
+                    # Keypoint is valid if both x and y are > 0
+                    if nose[0] > 0 and nose[1] > 0:
+                        face_points.append(nose)
+                    if left_eye[0] > 0 and left_eye[1] > 0:
+                        face_points.append(left_eye)
+                    if right_eye[0] > 0 and right_eye[1] > 0:
+                        face_points.append(right_eye)
+
+                    # If we have face keypoints, use them; otherwise fall back to person box
+                    if len(face_points) >= 1:
+                        # Calculate average position of detected face keypoints
+                        face_x = np.mean([pt[0] for pt in face_points])
+                        face_y = np.mean([pt[1] for pt in face_points])
+
+                        face_positions.append({
+                            'frame': frame_count,
+                            'center_x': int(face_x),
+                            'center_y': int(face_y),
+                            'box': [int(x1), int(y1), int(x2), int(y2)],
+                            'keypoints_used': len(face_points),
+                            'confidence': float(confidence),
+                            'method': 'pose_keypoints'
+                        })
+                    else:
+                        # Fallback: use person box with heuristic
+                        box_height = y2 - y1
+                        center_x = int((x1 + x2) / 2)
+                        center_y = int(y1 + box_height * 0.15)
+
+                        face_positions.append({
+                            'frame': frame_count,
+                            'center_x': center_x,
+                            'center_y': center_y,
+                            'box': [int(x1), int(y1), int(x2), int(y2)],
+                            'keypoints_used': 0,
+                            'confidence': float(confidence),
+                            'method': 'bbox_heuristic'
+                        })
+
+        return face_positions
+
+    def _build_crop_trajectory(
+        self,
+        face_positions: List[Dict],
+        shot_changes: List[int],
+        start_frame: int,
+        fps: float,
+        frame_width: int,
+        clip_center: Tuple[int, int]
+    ) -> List[Dict]:
+        """
+        Build a smoothed, per-shot face trajectory for dynamic reframing.
+
+        Each shot is smoothed independently (median filter over the most
+        confident face per sampled frame) so the crop snaps at hard cuts
+        instead of panning across them. Within a shot, a new keyframe is
+        only emitted once the face leaves a dead zone around the current
+        crop center, which keeps static framings at a single position.
+        Shots without a detected face (including the first) hold the
+        clip-wide median.
+
+        Returns:
+            List of {'time', 'x', 'y', 'cut'} keyframes; time is seconds
+            relative to the clip start, cut marks the first keyframe of a
+            shot (snap) as opposed to a move within the shot (pan)
+        """
+        if not face_positions or fps <= 0:
+            return []
+
+        # Most confident face per sampled frame
+        primary: Dict[int, Dict] = {}
+        for pos in face_positions:
+            current = primary.get(pos['frame'])
+            if current is None or pos['confidence'] > current['confidence']:
+                primary[pos['frame']] = pos
+
+        frames = sorted(primary)
+        cuts = sorted(shot_changes)
+        last_frame = max([frames[-1]] + cuts)
+        boundaries = [start_frame] + cuts + [last_frame + 1]
+        dead_zone = self.trajectory_dead_zone * max(frame_width, 1)
+        half_window = self.trajectory_median_window // 2
+
+        trajectory: List[Dict] = []
+        for shot_start, shot_end in zip(boundaries[:-1], boundaries[1:]):
+            shot_frames = [f for f in frames if shot_start <= f < shot_end]
+
+            if not shot_frames:
+                # Faceless shot: hold the clip-wide median
+                xs = np.array([clip_center[0]], dtype=float)
+                ys = np.array([clip_center[1]], dtype=float)
+                shot_frames = [shot_start]
+            else:
+                xs = np.array([primary[f]['center_x'] for f in shot_frames], dtype=float)
+                ys = np.array([primary[f]['center_y'] for f in shot_frames], dtype=float)
+
+            # Median filter to drop single-frame detector jitter / outliers
+            smooth_x = np.array([
+                np.median(xs[max(0, i - half_window):i + half_window + 1])
+                for i in range(len(xs))
+            ])
+            smooth_y = np.array([
+                np.median(ys[max(0, i - half_window):i + half_window + 1])
+                for i in range(len(ys))
+            ])
+
+            # The shot's first keyframe lands exactly on the cut
+            held_x, held_y = smooth_x[0], smooth_y[0]
+            trajectory.append({
+                'time': round((shot_start - start_frame) / fps, 3),
+                'x': int(held_x),
+                'y': int(held_y),
+                'cut': True
+            })
+
+            for f, x, y in zip(shot_frames[1:], smooth_x[1:], smooth_y[1:]):
+                if abs(x - held_x) > dead_zone:
+                    held_x, held_y = x, y
+                    trajectory.append({
+                        'time': round((f - start_frame) / fps, 3),
+                        'x': int(held_x),
+                        'y': int(held_y),
+                        'cut': False
+                    })
+
+        return trajectory
+
     def _calculate_face_center(
         self,
         face_positions: List[Dict],
@@ -241,6 +637,8 @@ class FaceTracker:
             'face_positions': [],
             'face_center_x': center_x,
             'face_center_y': center_y,
+            'shot_changes': [],
+            'crop_trajectory': [],
             'source_width': frame_width,
             'source_height': frame_height
         }
@@ -294,8 +692,57 @@ class FaceTrackerOptimized(FaceTracker):
     """
     Optimized version that tracks fewer frames
     for faster processing on longer clips
+
+    In adaptive mode (opt-in) the sampling stride starts tight and doubles
+    once the running median of center_x has settled, then drops back to the
+    tight stride on a variance spike or a shot change. Podcast-style
+    framings converge within a few seconds, so most of the clip is skipped.
     """
 
+    def __init__(
+        self,
+        job_folder: Path,
+        model: Optional[YOLO] = None,
+        detector_strategy: str = "yolo",
+        cache_dir: Optional[Path] = None,
+        cache_max_bytes: int = 500 * 1024 * 1024,
+        adaptive: bool = False,
+        min_stride: int = 5,
+        max_stride: int = 90,
+        stability_tolerance: float = 0.02,
+        stability_window: int = 6,
+        shot_change_threshold: float = 30.0
+    ):
+        """
+        Args:
+            job_folder: Job output folder (for logging)
+            model: Optional already-loaded YOLO model to reuse
+            detector_strategy: "yolo" or "tiered" (see FaceTracker)
+            cache_dir: Optional persistent tracking cache folder
+            cache_max_bytes: Size bound for the tracking cache
+            adaptive: Use adaptive stride instead of the fixed sample_rate
+                passed to track_faces_in_clip
+            min_stride: Tightest stride in frames (used after changes)
+            max_stride: Widest stride in frames once the face is stable
+            stability_tolerance: Allowed spread of center_x as a fraction
+                of frame width before the estimate counts as unstable
+            stability_window: Number of recent samples used for the
+                running median / spread
+            shot_change_threshold: Mean absolute pixel difference (0-255)
+                between sampled thumbnails that counts as a shot change
+        """
+        super().__init__(
+            job_folder, model, detector_strategy,
+            cache_dir=cache_dir, cache_max_bytes=cache_max_bytes
+        )
+        self.adaptive = adaptive
+        self.min_stride = max(1, min_stride)
+        self.max_stride = max(self.min_stride, max_stride)
+        self.stability_tolerance = stability_tolerance
+        self.stability_window = max(2, stability_window)
+        self.shot_change_threshold = shot_change_threshold
+        self.sampling_stats: Dict = {}
+
     def track_faces_in_clip(
         self,
         video_path: Path,
@@ -306,10 +753,206 @@ class FaceTrackerOptimized(FaceTracker):
         """
         Faster tracking by sampling fewer frames
         Good for clips where face doesn't move much
+
+        In adaptive mode the stride moves between min_stride and
+        max_stride instead, and sample_rate is only the baseline that
+        calls saved are reported against.
         """
-        return super().track_faces_in_clip(
+        self.sampling_stats = {}
+
+        result = super().track_faces_in_clip(
             video_path,
             start_time,
             end_time,
             sample_rate
         )
+
+        if self.sampling_stats:
+            result['sampling_stats'] = self.sampling_stats
+        return result
+
+    def _cache_params(self, sample_rate: int) -> Dict:
+        """Adaptive results depend on the stride settings, not sample_rate"""
+        params = super()._cache_params(sample_rate)
+        if self.adaptive:
+            params.update({
+                'sample_rate': None,
+                'min_stride': self.min_stride,
+                'max_stride': self.max_stride,
+                'stability_tolerance': self.stability_tolerance,
+                'stability_window': self.stability_window,
+                'shot_change_threshold': self.shot_change_threshold
+            })
+        return params
+
+    def _scan_frames(
+        self,
+        cap: cv2.VideoCapture,
+        start_frame: int,
+        end_frame: int,
+        sample_rate: int
+    ) -> Tuple[List[Dict], List[int]]:
+        """Adaptive-stride variant of the frame scan"""
+        if not self.adaptive:
+            return super()._scan_frames(cap, start_frame, end_frame, sample_rate)
+
+        shot_change_frames = []
+
+        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 1
+        tolerance_px = self.stability_tolerance * frame_width
+
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+        face_positions = []
+        recent_x: List[int] = []
+        stride = self.min_stride
+        next_sample = start_frame
+        prev_thumb = None
+
+        detector_calls = 0
+        shot_changes = 0
+        widenings = 0
+        frame_count = start_frame
+
+        while frame_count < end_frame:
+            if frame_count != next_sample:
+                # Skipped frames only need to be grabbed, not decoded
+                if not cap.grab():
+                    break
+                frame_count += 1
+                continue
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            thumb = self._frame_thumbnail(frame)
+            if prev_thumb is not None and self._is_shot_change(prev_thumb, thumb):
+                # New shot: forget the old estimate and sample tightly again
+                shot_changes += 1
+                shot_change_frames.append(frame_count)
+                recent_x = []
+                stride = self.min_stride
+            prev_thumb = thumb
+
+            detections = self._detect_faces(frame, frame_count)
+            detector_calls += 1
+            face_positions.extend(detections)
+
+            if detections:
+                # Track the most confident face for the stability estimate
+                primary = max(detections, key=lambda p: p['confidence'])
+                x = primary['center_x']
+
+                if len(recent_x) >= 2:
+                    running_median = float(np.median(recent_x))
+                    if abs(x - running_median) > 3 * tolerance_px:
+                        # Variance spike: speaker moved or switched
+                        recent_x = []
+                        stride = self.min_stride
+
+                recent_x.append(x)
+                recent_x = recent_x[-self.stability_window:]
+
+                if len(recent_x) >= self.stability_window:
+                    running_median = float(np.median(recent_x))
+                    spread = float(np.median(np.abs(np.array(recent_x) - running_median)))
+                    if spread <= tolerance_px and stride < self.max_stride:
+                        stride = min(stride * 2, self.max_stride)
+                        widenings += 1
+            else:
+                # No face: don't trust the estimate enough to widen further
+                stride = max(self.min_stride, stride // 2)
+
+            next_sample = frame_count + stride
+            frame_count += 1
+
+        # Compare against the fixed stride this call would otherwise have used
+        baseline_calls = int(np.ceil(max(0, frame_count - start_frame) / max(1, sample_rate)))
+        calls_saved = max(0, baseline_calls - detector_calls)
+
+        self.sampling_stats = {
+            'mode': 'adaptive',
+            'detector_calls': detector_calls,
+            'baseline_calls': baseline_calls,
+            'calls_saved': calls_saved,
+            'shot_changes': shot_changes,
+            'stride_widenings': widenings,
+            'final_stride': stride
+        }
+
+        self.logger.info("Adaptive sampling stats:")
+        self.logger.info(
+            f"  - Detector calls: {detector_calls} "
+            f"(fixed stride {sample_rate} would use {baseline_calls})"
+        )
+        self.logger.info(f"  - Detector calls saved: {calls_saved}")
+        self.logger.info(f"  - Shot changes: {shot_changes}, final stride: {stride} frames")
+
+        return face_positions, shot_change_frames
+
+
+# ---------------------------------------------------------------------------
+# Process-pool workers
+#
+# Each worker process loads the YOLO model once (pool initializer) and keeps
+# it warm for every clip it is handed, across jobs.
+# ---------------------------------------------------------------------------
+
+_worker_model: Optional[YOLO] = None
+_worker_trackers: Dict[str, FaceTracker] = {}
+
+
+def init_tracking_worker() -> None:
+    """Pool initializer: load the pose model once per worker process"""
+    global _worker_model
+    _worker_model = YOLO(FaceTracker.model_name)
+
+
+def track_clip_in_worker(
+    job_folder: Path,
+    video_path: Path,
+    start_time: str,
+    end_time: str,
+    detector_strategy: str = "yolo",
+    cache_dir: Optional[Path] = None,
+    adaptive: bool = False,
+    cache_max_bytes: int = 500 * 1024 * 1024,
+    source_fingerprint: Optional[str] = None
+) -> Dict:
+    """
+    Run track_faces_in_clip inside a pool worker.
+
+    adaptive=True uses FaceTrackerOptimized's adaptive stride instead of
+    FaceTracker's fixed 5-frame sampling. source_fingerprint, when the
+    caller already hashed the video, saves each worker from re-hashing it.
+    """
+    global _worker_trackers
+
+    key = f"{job_folder}:{detector_strategy}:{cache_dir}:{adaptive}"
+    tracker = _worker_trackers.get(key)
+    if tracker is None:
+        if adaptive:
+            tracker = FaceTrackerOptimized(
+                job_folder,
+                model=_worker_model,
+                detector_strategy=detector_strategy,
+                cache_dir=cache_dir,
+                cache_max_bytes=cache_max_bytes,
+                adaptive=True
+            )
+        else:
+            tracker = FaceTracker(
+                job_folder,
+                model=_worker_model,
+                detector_strategy=detector_strategy,
+                cache_dir=cache_dir,
+                cache_max_bytes=cache_max_bytes
+            )
+        # Only keep the current job's tracker around
+        _worker_trackers = {key: tracker}
+
+    if source_fingerprint and tracker.cache is not None:
+        tracker.cache.remember_fingerprint(video_path, source_fingerprint)
+
+    return tracker.track_faces_in_clip(video_path, start_time, end_time)
@@ -0,0 +1,17 @@
+"""
+Async RunPod serverless job client (submit, backoff polling, webhooks).
+
+Shared with the root app (modules/runpod_client.py at the repository
+root) so TTS and transcription in both apps use the same client.
+"""
+from utils.shared import load_shared_module
+
+_runpod_module = load_shared_module("modules/runpod_client.py")
+
+RUNPOD_API_BASE = _runpod_module.RUNPOD_API_BASE
+
+RunPodClient = _runpod_module.RunPodClient
+RunPodJobError = _runpod_module.RunPodJobError
+
+deliver_webhook = _runpod_module.deliver_webhook
+verify_webhook_token = _runpod_module.verify_webhook_token
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def file_fingerprint(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of the whole file, read in chunks so memory stays flat"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FaceTrackCache:
+    """
+    Persistent on-disk cache of face tracking results.
+
+    Results are stored per source video (content fingerprint) and tracking
+    configuration (sample rate, model identity, detector strategy), one file
+    per tracked frame range:
+
+        <cache_dir>/<fingerprint>/<params_hash>/<start_frame>_<end_frame>.json
+
+    One file per range means concurrent pool workers never rewrite each
+    other's entries. A lookup stitches together every stored range that
+    overlaps the request and reports the frame ranges still missing, so a
+    partially covered clip only tracks its gaps.
+
+    The cache is bounded by max_bytes: whole source videos are evicted in
+    least recently used order (a per-video marker is touched on every
+    lookup and store). Eviction scans the folder at most once per
+    evict_interval_seconds rather than on every write.
+    """
+
+    _marker_name = ".last_used"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = 500 * 1024 * 1024,
+        evict_interval_seconds: float = 60.0
+    ):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.evict_interval_seconds = evict_interval_seconds
+        self._last_evict: Optional[float] = None
+        self._fingerprints: Dict[Tuple[str, int, int], str] = {}
+
+    def source_fingerprint(self, video_path: Path) -> str:
+        """
+        Content fingerprint of a source video (SHA-256 of the whole file).
+
+        Memoized per path, size and mtime so each process hashes a given
+        upload once.
+        """
+        stat = video_path.stat()
+        memo_key = (str(video_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._fingerprints:
+            self._fingerprints[memo_key] = file_fingerprint(video_path)
+        return self._fingerprints[memo_key]
+
+    def remember_fingerprint(self, video_path: Path, fingerprint: str) -> None:
+        """Seed the memo with a fingerprint computed elsewhere (e.g. once per job)"""
+        stat = video_path.stat()
+        self._fingerprints[(str(video_path), stat.st_size, stat.st_mtime_ns)] = fingerprint
+
+    @staticmethod
+    def params_key(params: Dict) -> str:
+        """Stable short hash of the tracking configuration"""
+        encoded = json.dumps(params, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    def lookup(
+        self,
+        fingerprint: str,
+        params: Dict,
+        start_frame: int,
+        end_frame: int
+    ) -> Tuple[List[Dict], List[int], List[Tuple[int, int]]]:
+        """
+        Collect cached results for [start_frame, end_frame).
+
+        Returns:
+            (face positions, shot change frames, missing frame ranges)
+        """
+        entry_dir = self.cache_dir / fingerprint / self.params_key(params)
+        if not entry_dir.exists():
+            return [], [], [(start_frame, end_frame)]
+        self._touch(fingerprint)
+
+        face_positions: List[Dict] = []
+        shot_changes = set()
+        seen_frames = set()
+        covered: List[Tuple[int, int]] = []
+
+        for range_start, range_end, entry_path in self._list_ranges(entry_dir):
+            if range_end <= start_frame or range_start >= end_frame:
+                continue
+
+            try:
+                with open(entry_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                # Half-written or corrupt entry: treat as missing
+                continue
+
+            covered.append((range_start, range_end))
+
+            entry_frames = set()
+            for pos in entry['face_positions']:
+                frame = pos['frame']
+                if start_frame <= frame < end_frame and frame not in seen_frames:
+                    face_positions.append(pos)
+                    entry_frames.add(frame)
+            seen_frames |= entry_frames
+
+            shot_changes.update(
+                f for f in entry['shot_changes'] if start_frame <= f < end_frame
+            )
+
+        face_positions.sort(key=lambda p: p['frame'])
+        gaps = self._missing_ranges(covered, start_frame, end_frame)
+        return face_positions, sorted(shot_changes), gaps
+
+    def store(
+        self,
+        fingerprint: str,
+        params: Dict,
+        start_frame: int,
+        end_frame: int,
+        face_positions: List[Dict],
+        shot_changes: List[int]
+    ) -> Path:
+        """Persist the tracking result for one frame range"""
+        entry_dir = self.cache_dir / fingerprint / self.params_key(params)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+
+        entry_path = entry_dir / f"{start_frame}_{end_frame}.json"
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'params': params,
+                'start_frame': start_frame,
+                'end_frame': end_frame,
+                'face_positions': face_positions,
+                'shot_changes': shot_changes
+            }, f, separators=(',', ':'))
+
+        # Atomic so readers never see a partial entry
+        os.replace(tmp_path, entry_path)
+        self._touch(fingerprint)
+        self._maybe_evict()
+        return entry_path
+
+    def _touch(self, fingerprint: str) -> None:
+        """Mark a source video as recently used"""
+        try:
+            (self.cache_dir / fingerprint / self._marker_name).touch()
+        except OSError:
+            pass
+
+    def _maybe_evict(self) -> None:
+        """Run eviction if the last scan is older than evict_interval_seconds"""
+        now = time.monotonic()
+        if self._last_evict is not None and now - self._last_evict < self.evict_interval_seconds:
+            return
+        self._last_evict = now
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used source videos until under max_bytes"""
+        videos = []
+        total = 0
+        for video_dir in self.cache_dir.iterdir():
+            if not video_dir.is_dir():
+                continue
+            size = 0
+            for entry_path in video_dir.rglob("*.json"):
+                try:
+                    size += entry_path.stat().st_size
+                except FileNotFoundError:
+                    continue
+            marker = video_dir / self._marker_name
+            try:
+                last_used = marker.stat().st_mtime
+            except FileNotFoundError:
+                last_used = 0.0
+            videos.append((last_used, size, video_dir))
+            total += size
+
+        for _, size, video_dir in sorted(videos):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(video_dir, ignore_errors=True)
+            total -= size
+
+    @staticmethod
+    def _list_ranges(entry_dir: Path) -> List[Tuple[int, int, Path]]:
+        """Parse stored frame ranges from entry filenames"""
+        ranges = []
+        for entry_path in entry_dir.glob("*.json"):
+            try:
+                range_start, range_end = map(int, entry_path.stem.split('_'))
+            except ValueError:
+                continue
+            ranges.append((range_start, range_end, entry_path))
+        return sorted(ranges)
+
+    @staticmethod
+    def _missing_ranges(
+        covered: List[Tuple[int, int]],
+        start_frame: int,
+        end_frame: int
+    ) -> List[Tuple[int, int]]:
+        """Parts of [start_frame, end_frame) not covered by any range"""
+        gaps = []
+        cursor = start_frame
+
+        for range_start, range_end in sorted(covered):
+            if range_start > cursor:
+                gaps.append((cursor, min(range_start, end_frame)))
+            cursor = max(cursor, range_end)
+            if cursor >= end_frame:
+                break
+
+        if cursor < end_frame:
+            gaps.append((cursor, end_frame))
+
+        return gaps
@@ -1,172 +1,384 @@
+import asyncio
+import subprocess
+
 import httpx
 import json
 from pathlib import Path
 from typing import Dict, List, Optional
+from modules.audio_handoff import AudioHandoff, TmpfilesHandoff, upload_audio_to_tmpfiles
+from modules.runpod_client import RunPodClient
+from modules.transcript import Transcript
+from utils.audio import (
+    SPEECH_OPUS_ARGS,
+    find_split_points,
+    frame_energies,
+    pcm_fingerprint,
+    probe_duration,
+    remap_timestamp
+)
+from utils.disk_cache import DiskCache
 from utils.helpers import setup_logger
-
-
-async def upload_audio_to_tmpfiles(audio_path: Path, logger) -> str:
-    """
-    Upload audio file to tmpfiles.org and return public URL
-
-    tmpfiles.org provides free temporary file hosting (1 hour expiry)
-    """
-    logger.info("Uploading audio to tmpfiles.org for public access...")
-
-    async with httpx.AsyncClient(timeout=300.0, follow_redirects=True) as client:
-        with open(audio_path, 'rb') as f:
-            files = {'file': (audio_path.name, f, 'audio/wav')}
-
-            # Upload to tmpfiles.org
-            response = await client.post(
-                'https://tmpfiles.org/api/v1/upload',
-                files=files
-            )
-
-            logger.info(f"tmpfiles.org response status: {response.status_code}")
-            logger.info(f"tmpfiles.org response body: {response.text[:500]}")
-
-            response.raise_for_status()
-
-            try:
-                result = response.json()
-            except Exception as e:
-                logger.error(f"Failed to parse JSON: {e}")
-                logger.error(f"Response text: {response.text}")
-                raise Exception(f"tmpfiles.org returned invalid JSON: {response.text[:200]}")
-
-            if result.get('status') != 'success':
-                raise Exception(f"tmpfiles.org upload failed: {result}")
-
-            # tmpfiles.org returns URL like "https://tmpfiles.org/1234/file.wav"
-            # We need to convert it to direct download URL: "https://tmpfiles.org/dl/1234/file.wav"
-            url = result['data']['url']
-
-            # Convert to direct download URL
-            if 'tmpfiles.org/' in url:
-                # Change https://tmpfiles.org/ABC/file.wav to https://tmpfiles.org/dl/ABC/file.wav
-                url = url.replace('tmpfiles.org/', 'tmpfiles.org/dl/')
-
-            logger.info(f"Audio uploaded successfully to: {url}")
-            return url
+from utils.http_gateway import get_gateway
 
 
 class Transcriber:
     """Handles audio transcription using WhisperX on RunPod"""
 
-    def __init__(self, api_key: str, endpoint: str, job_folder: Path):
+    def __init__(
+        self,
+        api_key: str,
+        endpoint: str,
+        job_folder: Path,
+        audio_handoff: Optional[AudioHandoff] = None,
+        transcript_cache: Optional[DiskCache] = None,
+        chunk_threshold_seconds: float = 1200.0,
+        chunk_seconds: float = 600.0,
+        chunk_overlap_seconds: float = 2.0,
+        max_concurrent_chunks: int = 4,
+        runpod_client: Optional[RunPodClient] = None
+    ):
         self.api_key = api_key
         self.endpoint = endpoint
         self.job_folder = job_folder
+        # How the audio reaches the worker (defaults to tmpfiles.org upload)
+        self.audio_handoff = audio_handoff or TmpfilesHandoff()
+        # Parsed transcripts keyed by decoded audio + decode options
+        self.transcript_cache = transcript_cache
+        self.align_output = True
+        self.diarization = True  # Enable diarization
+        # Long audio is split at silences and transcribed chunk-parallel
+        self.chunk_threshold_seconds = chunk_threshold_seconds
+        self.chunk_seconds = chunk_seconds
+        self.chunk_overlap_seconds = chunk_overlap_seconds
+        self.max_concurrent_chunks = max(1, max_concurrent_chunks)
         self.logger = setup_logger(
             "Transcriber",
             job_folder / "processing.log"
         )
-
-    async def transcribe(self, audio_path: Path, audio_url: str = None, initial_prompt: Optional[str] = None, language: str = None) -> Dict:
+        # Queued RunPod jobs with backoff polling (shared with the root app)
+        self.runpod = runpod_client or RunPodClient(api_key, endpoint, self.logger)
+
+    async def transcribe(
+        self,
+        audio_path: Path,
+        audio_url: str = None,
+        initial_prompt: Optional[str] = None,
+        language: str = None,
+        offset_map: Optional[List[Dict]] = None
+    ) -> Dict:
         """
         Send audio to WhisperX and get transcript with timestamps
 
         Args:
             audio_path: Path to local audio file
             audio_url: Public URL where RunPod can download the audio file
-                      If not provided, will upload to file.io automatically
+                      If not provided, the configured audio handoff is used
             initial_prompt: Optional prompt to guide the Whisper model
             language: Language of the audio (e.g., 'en', 'hi'). If None, auto-detect.
+            offset_map: Offset map from VideoProcessor.extract_speech_audio when
+                        the audio is silence-trimmed; timestamps are remapped
+                        to the original timeline
         """
-        self.logger.info(f"Sending audio to WhisperX: {audio_path.name}")
+        # ffmpeg decodes and cache file I/O run in threads so other jobs'
+        # requests keep being served while long audio is fingerprinted
+        cache_key = None
+        if self.transcript_cache is not None:
+            cache_key = await self._transcript_cache_key(audio_path, initial_prompt, language)
+            transcript_data = await asyncio.to_thread(self.transcript_cache.get, cache_key)
+            if transcript_data is not None:
+                self.logger.info(f"Transcript cache hit for {audio_path.name}, skipping WhisperX")
+                if offset_map:
+                    transcript_data = self._remap_to_original_time(transcript_data, offset_map)
+                self._save_transcript_outputs(transcript_data)
+                return transcript_data
 
-        async with httpx.AsyncClient(timeout=600.0) as client:
-            try:
-                # Send transcription request using /runsync
-                self.logger.info("Starting transcription job...")
+        duration = None if audio_url else await asyncio.to_thread(probe_duration, audio_path)
+        if duration is not None and duration > self.chunk_threshold_seconds:
+            transcript_data = await self._transcribe_chunked(
+                audio_path, duration, initial_prompt, language
+            )
+        else:
+            transcript_data = await self._request_transcription(
+                audio_path, audio_url, initial_prompt, language
+            )
 
-                # Make endpoint use /runsync for synchronous processing
-                endpoint = self.endpoint
-                if not endpoint.endswith('/runsync'):
-                    if endpoint.endswith('/run'):
-                        endpoint = endpoint[:-4] + '/runsync'
-                    else:
-                        endpoint = endpoint.rstrip('/') + '/runsync'
+        # Cached in audio time; the offset map belongs to this job's source
+        if cache_key is not None:
+            await asyncio.to_thread(self.transcript_cache.set, cache_key, transcript_data)
 
-                headers = {
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json'
-                }
+        if offset_map:
+            transcript_data = self._remap_to_original_time(transcript_data, offset_map)
 
-                # Upload audio to tmpfiles.org if no URL provided
-                if not audio_url:
-                    audio_url = await upload_audio_to_tmpfiles(audio_path, self.logger)
+        self._save_transcript_outputs(transcript_data)
+        return transcript_data
 
-                self.logger.info(f"Using audio URL: {audio_url}")
+    def _remap_to_original_time(self, transcript_data: Dict, offset_map: List[Dict]) -> Dict:
+        """Shift segment and word timestamps from trimmed audio to source time"""
+        segments = []
+        for segment in transcript_data.get('segments', []):
+            segment = dict(segment)
+            for key in ('start', 'end'):
+                if key in segment:
+                    segment[key] = remap_timestamp(segment[key], offset_map)
 
-                # Build payload according to kodxana/whisperx-worker spec
-                input_payload = {
-                    'audio_file': audio_url,
-                    'batch_size': 64,
-                    'align_output': True,
-                    'diarization': True # Enable diarization
-                }
-                
-                # Only add language if specified (otherwise auto-detect)
-                if language:
-                    input_payload['language'] = language
-                    self.logger.info(f"Language forced to: {language}")
-                else:
-                    self.logger.info("Language set to auto-detect")
-
-                payload = {
-                    'input': input_payload
-                }
-                if initial_prompt:
-                    payload['input']['initial_prompt'] = initial_prompt
-
-                self.logger.info(f"Sending request to: {endpoint}")
-
-                response = await client.post(
-                    endpoint,
-                    headers=headers,
-                    json=payload
-                )
+            if 'words' in segment:
+                words = []
+                for word in segment['words']:
+                    word = dict(word)
+                    for key in ('start', 'end'):
+                        if key in word:
+                            word[key] = remap_timestamp(word[key], offset_map)
+                    words.append(word)
+                segment['words'] = words
+
+            segments.append(segment)
+
+        self.logger.info(f"Remapped timestamps through {len(offset_map)} speech regions")
+        return {**transcript_data, 'segments': segments}
+
+    async def _transcript_cache_key(
+        self,
+        audio_path: Path,
+        initial_prompt: Optional[str],
+        language: Optional[str]
+    ) -> str:
+        """Cache key: decoded audio content plus every option that changes the output"""
+        return DiskCache.make_key({
+            'pcm_sha256': await asyncio.to_thread(pcm_fingerprint, audio_path),
+            'language': language,
+            'initial_prompt': initial_prompt,
+            'align_output': self.align_output,
+            'diarization': self.diarization
+        })
+
+    async def _transcribe_chunked(
+        self,
+        audio_path: Path,
+        duration: float,
+        initial_prompt: Optional[str],
+        language: Optional[str]
+    ) -> Dict:
+        """
+        Transcribe long audio as concurrent chunks split at silences.
 
-                # Log response for debugging
-                self.logger.info(f"Response status: {response.status_code}")
+        Each chunk is padded by half the overlap on both sides so words at
+        the boundary are heard in full by at least one worker; the merge
+        step keeps every word only from the chunk that owns its midpoint.
+        """
+        frame_ms = 50
+        energies = await asyncio.to_thread(frame_energies, audio_path, frame_ms)
+        boundaries = find_split_points(energies, frame_ms, self.chunk_seconds)
+        edges = [0.0] + boundaries + [duration]
+
+        chunks = []
+        half_overlap = self.chunk_overlap_seconds / 2
+        chunks_dir = self.job_folder / "transcribe_chunks"
+        chunks_dir.mkdir(exist_ok=True)
+
+        for i, (own_start, own_end) in enumerate(zip(edges[:-1], edges[1:])):
+            start = max(0.0, own_start - half_overlap)
+            end = min(duration, own_end + half_overlap)
+            chunks.append({
+                'index': i,
+                'start': start,
+                'end': end,
+                'own_start': own_start,
+                'own_end': own_end,
+                'path': chunks_dir / f"chunk_{i:03d}.ogg"
+            })
+
+        self.logger.info(
+            f"Audio is {duration:.0f}s, transcribing {len(chunks)} chunks "
+            f"(max {self.max_concurrent_chunks} concurrent)"
+        )
 
-                response.raise_for_status()
-                result = response.json()
+        await asyncio.gather(*(
+            asyncio.to_thread(self._export_chunk, audio_path, chunk)
+            for chunk in chunks
+        ))
 
-                self.logger.info("Transcription received from WhisperX")
-                self.logger.info(f"Response keys: {list(result.keys())}")
+        semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
 
-                # Parse WhisperX response
-                transcript_data = self._parse_whisperx_response(result)
+        async def transcribe_chunk(chunk: Dict) -> Dict:
+            async with semaphore:
+                self.logger.info(
+                    f"Chunk {chunk['index'] + 1}/{len(chunks)}: "
+                    f"{chunk['start']:.1f}s - {chunk['end']:.1f}s"
+                )
+                return await self._request_transcription(
+                    chunk['path'], None, initial_prompt, language
+                )
 
-                # Save transcript as JSON
-                transcript_path = self.job_folder / "transcript.json"
-                with open(transcript_path, 'w', encoding='utf-8') as f:
-                    json.dump(transcript_data, f, ensure_ascii=False, indent=2)
+        results = await asyncio.gather(*(transcribe_chunk(c) for c in chunks))
+        return self._merge_chunk_transcripts(chunks, results)
+
+    def _export_chunk(self, audio_path: Path, chunk: Dict) -> Path:
+        """Cut one chunk out of the source audio (same Opus settings as the source)"""
+        cmd = [
+            'ffmpeg',
+            '-v', 'error',
+            '-ss', f"{chunk['start']:.3f}",
+            '-t', f"{chunk['end'] - chunk['start']:.3f}",
+            '-i', str(audio_path),
+            '-vn',
+            *SPEECH_OPUS_ARGS,
+            '-y',
+            str(chunk['path'])
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        if result.returncode != 0:
+            raise Exception(f"Chunk export failed: {result.stderr[:200]}")
+        return chunk['path']
+
+    def _merge_chunk_transcripts(self, chunks: List[Dict], results: List[Dict]) -> Dict:
+        """
+        Stitch chunk transcripts back onto the original timeline.
 
-                # Save as SRT
-                srt_path = self.job_folder / "transcript.srt"
-                self._save_as_srt(transcript_data['segments'], srt_path)
+        Timestamps are shifted by each chunk's start offset. In the overlap
+        regions a word is kept only by the chunk whose owned range contains
+        its midpoint, which removes duplicates; segments without word
+        timings use the segment midpoint instead.
+        """
+        merged_segments = []
+
+        for chunk, result in zip(chunks, results):
+            offset = chunk['start']
+            is_last = chunk is chunks[-1]
+
+            def owned(start: float, end: float) -> bool:
+                mid = (start + end) / 2
+                return chunk['own_start'] <= mid and (mid < chunk['own_end'] or is_last)
+
+            for segment in result.get('segments', []):
+                seg_start = segment.get('start', 0.0) + offset
+                seg_end = segment.get('end', 0.0) + offset
+                words = segment.get('words')
+
+                if not words:
+                    if owned(seg_start, seg_end):
+                        merged_segments.append({**segment, 'start': seg_start, 'end': seg_end})
+                    continue
+
+                shifted = []
+                for word in words:
+                    word = dict(word)
+                    if 'start' in word:
+                        word['start'] += offset
+                    if 'end' in word:
+                        word['end'] += offset
+                    shifted.append(word)
+
+                kept = [
+                    w for w in shifted
+                    if owned(w.get('start', seg_start), w.get('end', seg_end))
+                ]
+                if not kept:
+                    continue
+
+                new_segment = {**segment, 'start': seg_start, 'end': seg_end, 'words': kept}
+                if len(kept) < len(shifted):
+                    # Segment straddled a boundary: rebuild it from owned words
+                    timed = [w for w in kept if 'start' in w and 'end' in w]
+                    if timed:
+                        new_segment['start'] = timed[0]['start']
+                        new_segment['end'] = timed[-1]['end']
+                    new_segment['text'] = ' '.join(
+                        w.get('word', w.get('text', '')).strip() for w in kept
+                    )
+                merged_segments.append(new_segment)
+
+        merged_segments.sort(key=lambda seg: seg['start'])
+        for i, segment in enumerate(merged_segments):
+            segment['id'] = i
+
+        self.logger.info(
+            f"Merged {len(results)} chunk transcripts into {len(merged_segments)} segments"
+        )
 
-                # Save word-level timestamps for subtitle generation
-                self.save_word_timestamps(transcript_data)
+        return {
+            'text': ' '.join(seg.get('text', '').strip() for seg in merged_segments),
+            'segments': merged_segments,
+            'language': results[0].get('language', 'hi') if results else 'hi'
+        }
 
-                self.logger.info(f"Transcript saved to {transcript_path}")
-                return transcript_data
+    async def _request_transcription(
+        self,
+        audio_path: Path,
+        audio_url: Optional[str],
+        initial_prompt: Optional[str],
+        language: Optional[str]
+    ) -> Dict:
+        """Run one WhisperX job on RunPod and return the parsed transcript"""
+        self.logger.info(f"Sending audio to WhisperX: {audio_path.name}")
 
-            except httpx.HTTPError as e:
-                self.logger.error(f"HTTP error during transcription: {e}")
-                if hasattr(e, 'response') and e.response:
-                    self.logger.error(f"Response status: {e.response.status_code}")
-                    self.logger.error(f"Response body: {e.response.text}")
-                raise Exception(f"Transcription failed: {e}")
-            except Exception as e:
-                self.logger.error(f"Transcription error: {e}")
-                import traceback
-                self.logger.error(traceback.format_exc())
-                raise
+        try:
+            self.logger.info("Starting transcription job...")
+
+            # Hand the audio to the worker if no URL provided
+            if audio_url:
+                audio_input = {'audio_file': audio_url}
+                self.logger.info(f"Using audio URL: {audio_url}")
+            else:
+                audio_input = await self.audio_handoff.prepare(audio_path, self.logger)
+                self.logger.info(f"Audio handoff: {self.audio_handoff.name}")
+
+            # Build payload according to kodxana/whisperx-worker spec
+            input_payload = {
+                **audio_input,
+                'batch_size': 64,
+                'align_output': self.align_output,
+                'diarization': self.diarization
+            }
+            
+            # Only add language if specified (otherwise auto-detect)
+            if language:
+                input_payload['language'] = language
+                self.logger.info(f"Language forced to: {language}")
+            else:
+                self.logger.info("Language set to auto-detect")
+
+            if initial_prompt:
+                input_payload['initial_prompt'] = initial_prompt
+
+            # Queued job + backoff polling instead of holding /runsync open;
+            # cancelling this task cancels the remote job too
+            self.logger.info(f"Sending request to: {self.runpod.endpoint_url}")
+            result = await self.runpod.run(input_payload)
+
+            self.logger.info("Transcription received from WhisperX")
+            self.logger.info(f"Response keys: {list(result.keys())}")
+
+            # Parse WhisperX response
+            return self._parse_whisperx_response(result)
+
+        except httpx.HTTPError as e:
+            self.logger.error(f"HTTP error during transcription: {e}")
+            if hasattr(e, 'response') and e.response:
+                self.logger.error(f"Response status: {e.response.status_code}")
+                self.logger.error(f"Response body: {e.response.text}")
+            raise Exception(f"Transcription failed: {e}")
+        except Exception as e:
+            self.logger.error(f"Transcription error: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            raise
+
+    def _save_transcript_outputs(self, transcript_data: Dict) -> Path:
+        """Write transcript JSON, SRT and word timestamps to the job folder"""
+        # Save transcript as JSON
+        transcript_path = self.job_folder / "transcript.json"
+        with open(transcript_path, 'w', encoding='utf-8') as f:
+            json.dump(transcript_data, f, ensure_ascii=False, indent=2)
+
+        # Save as SRT
+        srt_path = self.job_folder / "transcript.srt"
+        self._save_as_srt(transcript_data['segments'], srt_path)
+
+        # Save word-level timestamps for subtitle generation
+        self.save_word_timestamps(transcript_data)
+
+        self.logger.info(f"Transcript saved to {transcript_path}")
+        return transcript_path
 
     def _parse_whisperx_response(self, response: Dict) -> Dict:
         """
@@ -273,10 +485,12 @@ class Transcriber:
                     })
                     word_count += 1
 
-        # Save word-level timestamps
+        # Save word-level timestamps (compact JSON for inspection; later
+        # stages load the columnar .npz store instead of re-parsing it)
         words_path = self.job_folder / "transcript_words.json"
         with open(words_path, 'w', encoding='utf-8') as f:
-            json.dump(word_data, f, ensure_ascii=False, indent=2)
+            json.dump(word_data, f, ensure_ascii=False, separators=(',', ':'))
+        Transcript.from_transcript(transcript_data).save(self.job_folder / "transcript_words.npz")
 
         self.logger.info(f"Saved {word_count} word-level timestamps to {words_path}")
 
@@ -301,36 +515,35 @@ class TranscriberFileUpload(Transcriber):
             'Authorization': f'Bearer {self.api_key}'
         }
 
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            # Upload file
-            with open(audio_path, 'rb') as f:
-                files = {'file': (audio_path.name, f, 'audio/wav')}
-                data = {
-                    'language': 'hi',
-                    'task': 'transcribe'
-                }
-
-                response = await client.post(
-                    self.endpoint,
-                    headers=headers,
-                    files=files,
-                    data=data
-                )
+        # Upload file (read into memory so the gateway can resend on retry)
+        files = {'file': (audio_path.name, audio_path.read_bytes(), 'audio/wav')}
+        data = {
+            'language': 'hi',
+            'task': 'transcribe'
+        }
+
+        response = await get_gateway().post(
+            self.endpoint,
+            headers=headers,
+            files=files,
+            data=data,
+            timeout=300.0
+        )
 
-            response.raise_for_status()
-            result = response.json()
+        response.raise_for_status()
+        result = response.json()
 
-            transcript_data = self._parse_whisperx_response(result)
+        transcript_data = self._parse_whisperx_response(result)
 
-            # Save outputs
-            transcript_path = self.job_folder / "transcript.json"
-            with open(transcript_path, 'w', encoding='utf-8') as f:
-                json.dump(transcript_data, f, ensure_ascii=False, indent=2)
+        # Save outputs
+        transcript_path = self.job_folder / "transcript.json"
+        with open(transcript_path, 'w', encoding='utf-8') as f:
+            json.dump(transcript_data, f, ensure_ascii=False, indent=2)
 
-            srt_path = self.job_folder / "transcript.srt"
-            self._save_as_srt(transcript_data['segments'], srt_path)
+        srt_path = self.job_folder / "transcript.srt"
+        self._save_as_srt(transcript_data['segments'], srt_path)
 
-            # Save word-level timestamps for subtitle generation
-            self.save_word_timestamps(transcript_data)
+        # Save word-level timestamps for subtitle generation
+        self.save_word_timestamps(transcript_data)
 
-            return transcript_data
+        return transcript_data
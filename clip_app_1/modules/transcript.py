@@ -0,0 +1,140 @@
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+
+class Transcript:
+    """
+    Word-level transcript stored as columnar NumPy arrays.
+
+    Columns (one entry per timed word, sorted by start time):
+        starts, ends   float64 seconds
+        segment_ids    int32 index into transcript['segments']
+        word_indices   int32 position in that segment's 'words'
+        text_offsets   int64 byte offsets into text_blob (len + 1 entries)
+
+    slice(t0, t1) finds a clip's words with two binary searches instead
+    of scanning every segment, and save/load use a flat .npz file so later
+    stages don't re-parse the word JSON.
+    """
+
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        segment_ids: np.ndarray,
+        word_indices: np.ndarray,
+        text_offsets: np.ndarray,
+        text_blob: bytes,
+        language: str = ""
+    ):
+        self.starts = starts
+        self.ends = ends
+        self.segment_ids = segment_ids
+        self.word_indices = word_indices
+        self.text_offsets = text_offsets
+        self.text_blob = text_blob
+        self.language = language
+
+        # Running max of end times: sorted even when word ends are not,
+        # so the first word ending after t0 is a binary search away
+        self._max_ends = np.maximum.accumulate(ends) if len(ends) else ends
+
+    @classmethod
+    def from_transcript(cls, transcript: Dict) -> "Transcript":
+        """Build from a WhisperX-style transcript (words without timing are skipped)"""
+        starts, ends, segment_ids, word_indices, texts = [], [], [], [], []
+        for segment_id, segment in enumerate(transcript.get('segments', [])):
+            for word_index, word in enumerate(segment.get('words', [])):
+                if 'start' not in word or 'end' not in word:
+                    continue  # Unaligned tokens (numbers, symbols)
+                starts.append(word['start'])
+                ends.append(word['end'])
+                segment_ids.append(segment_id)
+                word_indices.append(word_index)
+                texts.append(word.get('word', word.get('text', '')).encode('utf-8'))
+
+        order = np.argsort(np.array(starts, dtype=np.float64), kind='stable')
+        texts = [texts[i] for i in order]
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+
+        return cls(
+            starts=np.array(starts, dtype=np.float64)[order],
+            ends=np.array(ends, dtype=np.float64)[order],
+            segment_ids=np.array(segment_ids, dtype=np.int32)[order],
+            word_indices=np.array(word_indices, dtype=np.int32)[order],
+            text_offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            text_blob=b"".join(texts),
+            language=transcript.get('language', '')
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, index: int) -> str:
+        return self.text_blob[self.text_offsets[index]:self.text_offsets[index + 1]].decode('utf-8')
+
+    def _range(self, t0: float, t1: float) -> np.ndarray:
+        """Indices of words overlapping [t0, t1)"""
+        lo = int(np.searchsorted(self._max_ends, t0, side='right'))
+        hi = int(np.searchsorted(self.starts, t1, side='left'))
+        if hi <= lo:
+            return np.zeros(0, dtype=np.int64)
+        indices = np.arange(lo, hi)
+        return indices[self.ends[lo:hi] > t0]
+
+    def slice(self, t0: float, t1: float, relative: bool = True) -> List[Dict]:
+        """
+        Words overlapping [t0, t1).
+
+        With relative=True (clips), times are shifted to start at t0 and
+        clamped to [0, t1 - t0].
+        """
+        words = []
+        for i in self._range(t0, t1):
+            start, end = float(self.starts[i]), float(self.ends[i])
+            if relative:
+                start = max(0.0, start - t0)
+                end = min(t1 - t0, end - t0)
+            words.append({
+                'text': self.text(i),
+                'start': start,
+                'end': end,
+                'segment_id': int(self.segment_ids[i]),
+                'word_index': int(self.word_indices[i])
+            })
+        return words
+
+    def to_words(self) -> List[Dict]:
+        """All words as {'text', 'start', 'end'} dicts, in time order"""
+        return [
+            {'text': self.text(i), 'start': float(self.starts[i]), 'end': float(self.ends[i])}
+            for i in range(len(self))
+        ]
+
+    def save(self, path: Path) -> Path:
+        np.savez(
+            path,
+            starts=self.starts,
+            ends=self.ends,
+            segment_ids=self.segment_ids,
+            word_indices=self.word_indices,
+            text_offsets=self.text_offsets,
+            text_blob=np.frombuffer(self.text_blob, dtype=np.uint8),
+            language=np.array(self.language)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "Transcript":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                starts=data['starts'],
+                ends=data['ends'],
+                segment_ids=data['segment_ids'],
+                word_indices=data['word_indices'],
+                text_offsets=data['text_offsets'],
+                text_blob=data['text_blob'].tobytes(),
+                language=str(data['language'])
+            )
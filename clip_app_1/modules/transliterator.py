@@ -1,7 +1,34 @@
+import asyncio
+import importlib.util
 import json
+import re
+import string
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from utils.helpers import setup_logger
+from utils.http_gateway import get_gateway
+from utils.llm_cache import LLMCacheMiss, LLMResponseCache
+from utils.transcript_encoding import segment_bounds
+from utils.transliteration_dict import TransliterationDictionary, split_word
+
+
+# Devanagari letters and signs (dandas excluded; models often keep them)
+DEVANAGARI = re.compile(r"[\u0900-\u0963\u0966-\u097F]")
+# Word ends in a bare consonant (inherent vowel not spoken at word end)
+FINAL_CONSONANT = re.compile(r"[\u0915-\u0939\u0958-\u095F]$")
+
+
+def itrans_to_hinglish(itrans: str, devanagari: str) -> str:
+    """
+    Turn strict ITRANS ("dostoM", "Aja") into casual Hinglish spelling
+    ("doston", "aaj") for dictionary seeding.
+    """
+    text = itrans.replace("RRi", "ri").replace("M", "n").replace(".n", "n")
+    text = text.replace("A", "aa").replace("I", "ee").replace("U", "oo")
+    text = re.sub(r"[.^~]", "", text).lower()
+    if FINAL_CONSONANT.search(devanagari) and len(text) > 2 and text.endswith("a"):
+        text = text[:-1]  # Schwa deletion
+    return text
 
 
 class UniversalTransliterator:
@@ -12,27 +39,56 @@ class UniversalTransliterator:
     This converts Hindi text like "मैं जा रहा हूं" to "main jaa rahaa hoon"
     (not translation, but phonetic representation in Latin script).
 
-    Note: This uses ITRANS romanization scheme which is widely used for
-    Indic scripts.
+    Segments are sent in batches: many numbered lines per request, capped
+    by a token budget, with batches dispatched concurrently. Each returned
+    line is validated on its own and only failed lines are retried.
     """
 
-
-
-
-    def __init__(self, job_folder: Path, api_key: str = None, model: str = None):
+    system_message = (
+        "You are a helpful assistant that converts Hindi Devanagari text to Hinglish (Roman script). "
+        "Keep the words exactly the same, just write them in English letters. Do not translate. "
+        "Example: 'नमस्ते दोस्तों' -> 'Namaste doston'. Output ONLY the converted text."
+    )
+
+    batch_system_message = (
+        "You are a helpful assistant that converts Hindi Devanagari text to Hinglish (Roman script). "
+        "Keep the words exactly the same, just write them in English letters. Do not translate. "
+        "Example: 'नमस्ते दोस्तों' -> 'Namaste doston'.\n"
+        "You receive numbered lines. Convert every line separately and respond with ONLY a JSON object "
+        '{"lines": ["...", "..."]} holding one converted string per input line, in the same order.'
+    )
+
+    def __init__(
+        self,
+        job_folder: Path,
+        api_key: str = None,
+        model: str = None,
+        llm_cache: Optional[LLMResponseCache] = None,
+        batch_max_tokens: int = 1500,
+        max_concurrent_batches: int = 4,
+        line_retries: int = 1,
+        dictionary: Optional[TransliterationDictionary] = None
+    ):
         self.job_folder = job_folder
         self.logger = setup_logger("Transliterator", job_folder / "processing.log")
         self.api_key = api_key
         self.model = model
-
-    async def _call_llm(self, prompt: str) -> str:
+        self.llm_cache = llm_cache
+        self.batch_max_tokens = batch_max_tokens
+        self.max_concurrent_batches = max_concurrent_batches
+        self.line_retries = line_retries
+        # Local-first: segments fully covered by the dictionary skip the LLM
+        self.dictionary = dictionary
+        self._itrans_backend = None
+        # (segment start, text) -> Hinglish, reused across calls
+        self._memo: Dict[Tuple[float, str], str] = {}
+
+    async def _call_llm(self, prompt: str, system_message: Optional[str] = None) -> str:
         """Call LLM for transliteration"""
         if not self.api_key:
             self.logger.warning("No API key provided for Hinglish generation, falling back to original text")
             return None
 
-        import httpx
-        
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -44,30 +100,241 @@ class UniversalTransliterator:
             "messages": [
                 {
                     "role": "system", 
-                    "content": "You are a helpful assistant that converts Hindi Devanagari text to Hinglish (Roman script). Keep the words exactly the same, just write them in English letters. Do not translate. Example: 'नमस्ते दोस्तों' -> 'Namaste doston'. Output ONLY the converted text."
+                    "content": system_message or self.system_message
                 },
                 {"role": "user", "content": prompt}
             ]
         }
 
-        async with httpx.AsyncClient() as client:
+        cache_key = None
+        if self.llm_cache is not None:
+            cache_key = self.llm_cache.make_key(
+                self.model,
+                payload["messages"][0]["content"],
+                prompt,
+                {}
+            )
             try:
-                response = await client.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    json=payload,
-                    headers=headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data['choices'][0]['message']['content'].strip()
-            except Exception as e:
-                self.logger.error(f"LLM call failed: {e}")
+                cached = self.llm_cache.get(cache_key)
+            except LLMCacheMiss as e:
+                # Replay mode: treat as a failed call so these lines keep
+                # their original text instead of aborting the whole batch set
+                self.logger.warning(f"{e}, keeping original text for this batch")
                 return None
+            if cached is not None:
+                return cached
+
+        try:
+            response = await get_gateway().post(
+                "https://openrouter.ai/api/v1/chat/completions",
+                json=payload,
+                headers=headers,
+                timeout=60.0
+            )
+            response.raise_for_status()
+            data = response.json()
+            content = data['choices'][0]['message']['content'].strip()
+            if cache_key is not None:
+                self.llm_cache.set(cache_key, content)
+            return content
+        except Exception as e:
+            self.logger.error(f"LLM call failed: {e}")
+            return None
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """~4 chars per token for ASCII, ~2 for Devanagari"""
+        ascii_chars = sum(1 for c in text if ord(c) < 128)
+        return ascii_chars // 4 + (len(text) - ascii_chars) // 2
+
+    def _make_batches(self, items: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """Pack (segment index, text) pairs into batches under batch_max_tokens"""
+        batches: List[List[Tuple[int, str]]] = []
+        current: List[Tuple[int, str]] = []
+        tokens = 0
+
+        for index, text in items:
+            # Output is about as long again as the input, plus numbering/JSON
+            cost = self._estimate_tokens(text) * 2 + 8
+            if current and tokens + cost > self.batch_max_tokens:
+                batches.append(current)
+                current, tokens = [], 0
+            current.append((index, text))
+            tokens += cost
+
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _parse_batch_response(content: str, expected: int) -> List[Optional[str]]:
+        """
+        One output string per input line (None where missing).
+
+        Accepts the requested JSON object, a bare JSON array, or numbered
+        lines ("3. text") when the model ignores the format.
+        """
+        text = content.strip()
+        if "```" in text:
+            text = text.split("```")[1]
+            if text.startswith("json"):
+                text = text[4:]
+
+        lines: List[Optional[str]] = [None] * expected
+        try:
+            data = json.loads(text)
+            if isinstance(data, dict):
+                data = data.get("lines", [])
+            if isinstance(data, list):
+                for i, line in enumerate(data[:expected]):
+                    if isinstance(line, str):
+                        lines[i] = line.strip()
+                return lines
+        except json.JSONDecodeError:
+            pass
+
+        for raw_line in text.splitlines():
+            match = re.match(r"\s*(\d+)[.):]\s*(.*)", raw_line)
+            if match and 1 <= int(match.group(1)) <= expected:
+                lines[int(match.group(1)) - 1] = match.group(2).strip()
+        return lines
+
+    @staticmethod
+    def _is_valid_line(source: str, roman: Optional[str]) -> bool:
+        """Non-empty, fully romanized, and roughly word-aligned with the source"""
+        if not roman:
+            return False
+        if DEVANAGARI.search(roman):
+            return False
+        source_words = len(source.split())
+        roman_words = len(roman.split())
+        return source_words // 2 <= roman_words <= max(source_words * 2, source_words + 2)
+
+    async def _transliterate_batch(self, batch: List[Tuple[int, str]]) -> Dict[int, str]:
+        """Transliterate one batch; returns segment index -> Hinglish for valid lines"""
+        prompt = "\n".join(f"{n}. {text}" for n, (_, text) in enumerate(batch, 1))
+        content = await self._call_llm(prompt, self.batch_system_message)
+        if not content:
+            return {}
+
+        results = {}
+        for (index, text), roman in zip(batch, self._parse_batch_response(content, len(batch))):
+            if self._is_valid_line(text, roman):
+                results[index] = roman
+        return results
+
+    async def _transliterate_segments(self, items: List[Tuple[int, str]]) -> Dict[int, str]:
+        """Batch, dispatch concurrently, then retry only the lines that failed"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+        results: Dict[int, str] = {}
+        pending = items
+
+        async def run(batch: List[Tuple[int, str]]) -> Dict[int, str]:
+            async with semaphore:
+                return await self._transliterate_batch(batch)
+
+        for attempt in range(self.line_retries + 1):
+            if not pending:
+                break
+
+            batches = self._make_batches(pending)
+            self.logger.info(
+                f"Transliterating {len(pending)} segments in {len(batches)} batches"
+                + (f" (retry {attempt})" if attempt else "")
+            )
+            for batch_results in await asyncio.gather(*(run(batch) for batch in batches)):
+                results.update(batch_results)
+
+            pending = [(index, text) for index, text in pending if index not in results]
+
+        if pending:
+            self.logger.warning(f"{len(pending)} segments failed transliteration, keeping original text")
+        return results
+
+    @staticmethod
+    def _memo_key(segment: Dict) -> Tuple[float, str]:
+        return (round(segment.get('start', 0.0), 3), segment.get('text', '').strip())
+
+    @staticmethod
+    def _overlaps(segment: Dict, time_ranges: List[Tuple[float, float]]) -> bool:
+        """Whether the segment overlaps any range (untimed segments always do)"""
+        try:
+            start, end = segment_bounds(segment)
+        except ValueError:
+            return True
+        return any(start < range_end and end > range_start for range_start, range_end in time_ranges)
+
+    def _update_dictionary(self, items: List[Tuple[int, str]], romanized: Dict[int, str]) -> None:
+        """
+        Record word pairs from validated LLM lines in one batch (trusted
+        once they reach agreement). Segments that could not be learned
+        (failed, or word counts differ) seed ITRANS entries, which fill
+        gaps but never replace LLM spellings.
+        """
+        learnable = [(index, text) for index, text in items if index in romanized]
+        counts = dict(zip(
+            (index for index, _ in learnable),
+            self.dictionary.learn_segments((text, romanized[index]) for index, text in learnable)
+        ))
+        learned = sum(counts.values())
+        unlearned = [text for index, text in items if not counts.get(index)]
+
+        seeded = 0
+        backend = self._itrans() if unlearned else None
+        if backend:
+            words = {split_word(token)[1] for text in unlearned for token in text.split()}
+            pairs = [
+                (word, itrans_to_hinglish(backend._transliterate_text(word), word))
+                for word in words if DEVANAGARI.search(word)
+            ]
+            seeded = self.dictionary.add_many(pairs, source="itrans")
+
+        self.logger.info(f"Dictionary recorded {learned} word pairs from LLM output, seeded {seeded} from ITRANS")
+
+    def _itrans(self) -> Optional["FallbackTransliterator"]:
+        """Rule-based ITRANS backend, when indic-transliteration is installed"""
+        if self._itrans_backend is None:
+            if importlib.util.find_spec("indic_transliteration") is None:
+                self._itrans_backend = False
+            else:
+                self._itrans_backend = FallbackTransliterator(self.job_folder)
+        return self._itrans_backend or None
+
+    @staticmethod
+    def _apply_roman(segment: Dict, hinglish_text: Optional[str]) -> None:
+        """Set text_roman on a segment and spread its words over segment words"""
+        if not hinglish_text:
+            # Fallback if LLM fails
+            segment['text_roman'] = segment.get('text', '')
+            for word in segment.get('words', []):
+                word['text_roman'] = word.get('text', '')
+            return
+
+        segment['text_roman'] = hinglish_text
+
+        # Word counts might not match. Simple approach: split hinglish text
+        # by space and assign to words; fall back to the original text for
+        # remaining words.
+        hinglish_words = hinglish_text.split()
+        for j, word in enumerate(segment.get('words', [])):
+            if j < len(hinglish_words):
+                # Clean punctuation from the hinglish word to match the "word" concept
+                clean_word = hinglish_words[j].strip(string.punctuation)
+                word['text_roman'] = clean_word if clean_word else hinglish_words[j]
+            else:
+                word['text_roman'] = word.get('text', '')
 
-    async def transliterate_transcript(self, transcript: Dict) -> Dict:
+    async def transliterate_transcript(
+        self,
+        transcript: Dict,
+        time_ranges: Optional[List[Tuple[float, float]]] = None
+    ) -> Dict:
         """
         Add 'text_roman' field to transcript using LLM for natural Hinglish
+
+        With time_ranges (seconds), only segments overlapping a range are
+        transliterated, e.g. just the selected clips. Results are memoized
+        per segment, so later calls reuse earlier work.
         """
         self.logger.info("Starting transliteration...")
         
@@ -88,45 +355,59 @@ class UniversalTransliterator:
                         word['text_roman'] = word['text']
             return transcript
 
-        # For Hindi (or others), use LLM to generate Hinglish
-        # We will process segment by segment to maintain context but keep it manageable
-        
-        for i, segment in enumerate(transcript.get('segments', [])):
-            original_text = segment.get('text', '')
-            if not original_text:
-                continue
-
-            self.logger.info(f"Transliterating segment {i+1}/{len(transcript['segments'])}")
-            
-            # Call LLM for the whole segment
-            hinglish_text = await self._call_llm(original_text)
-            
-            if hinglish_text:
-                segment['text_roman'] = hinglish_text
-                
-                # Now we need to map words. This is tricky because word counts might not match.
-                # Simple approach: Split hinglish text by space and assign to words.
-                # If counts mismatch, we fallback to original text for remaining words.
-                
-                hinglish_words = hinglish_text.split()
-                original_words = segment.get('words', [])
-                
-                import string
-                for j, word in enumerate(original_words):
-                    if j < len(hinglish_words):
-                        # Clean punctuation from the hinglish word to match the "word" concept
-                        clean_word = hinglish_words[j].strip(string.punctuation)
-                        word['text_roman'] = clean_word if clean_word else hinglish_words[j]
-                    else:
-                        # Fallback
-                        word['text_roman'] = word.get('text', '')
-            else:
-                # Fallback if LLM fails
-                segment['text_roman'] = original_text
-                for word in segment.get('words', []):
-                    word['text_roman'] = word.get('text', '')
+        # For Hindi (or others), use LLM to generate Hinglish in batches
+        segments = transcript.get('segments', [])
+        items = [
+            (i, segment['text'].strip()) for i, segment in enumerate(segments)
+            if segment.get('text', '').strip()
+            and (time_ranges is None or self._overlaps(segment, time_ranges))
+        ]
+        total = len(items)
+        requested = {i for i, _ in items}
+
+        memoized = {
+            i: self._memo[self._memo_key(segments[i])] for i, _ in items
+            if self._memo_key(segments[i]) in self._memo
+        }
+        items = [(i, text) for i, text in items if i not in memoized]
+        if time_ranges is not None or memoized:
+            self.logger.info(
+                f"Transliterating {len(items)} new segments "
+                f"({len(memoized)} memoized, {len(segments) - total} outside the requested ranges)"
+            )
 
-        self.logger.info("Transliteration complete")
+        local: Dict[int, str] = {}
+        if self.dictionary is not None:
+            # One dictionary lookup for every segment, off the event loop
+            local_romans = await asyncio.to_thread(
+                self.dictionary.transliterate_local_many, [text for _, text in items]
+            )
+            local = {
+                i: roman for (i, _), roman in zip(items, local_romans)
+                if roman is not None
+            }
+            items = [(i, text) for i, text in items if i not in local]
+            self.logger.info(f"Dictionary covered {len(local)} segments, {len(items)} go to the LLM")
+
+        romanized = await self._transliterate_segments(items) if items else {}
+
+        if self.dictionary is not None:
+            if items:
+                await asyncio.to_thread(self._update_dictionary, items, romanized)
+            self.dictionary.record_segments(local=len(local), llm=len(items))
+            stats = await asyncio.to_thread(self.dictionary.stats)
+            self.logger.info(f"Transliteration dictionary: {stats}")
+            romanized.update(local)
+
+        for i, roman in romanized.items():
+            self._memo[self._memo_key(segments[i])] = roman
+        romanized.update(memoized)
+
+        # Segments outside the requested ranges are left untouched
+        for i in requested:
+            self._apply_roman(segments[i], romanized.get(i))
+
+        self.logger.info(f"Transliteration complete ({len(romanized)}/{total} segments)")
         
         # Save romanized transcript
         output_path = self.job_folder / "transcript_romanized.json"
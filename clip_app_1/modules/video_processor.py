@@ -1,12 +1,19 @@
+import json
 import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from utils.audio import SPEECH_OPUS_ARGS, build_offset_map, detect_speech_regions, frame_energies
 from utils.helpers import setup_logger
 
 
 class VideoProcessor:
     """Handles video processing operations using FFmpeg"""
 
+    # Dynamic reframing: moves within a shot ease over this long (capped by
+    # the time to the next keyframe), one crop command per step
+    crop_pan_seconds: float = 0.6
+    crop_pan_step_seconds: float = 1 / 15
+
     def __init__(self, job_folder: Path):
         self.job_folder = job_folder
         self.logger = setup_logger(
@@ -49,13 +56,101 @@ class VideoProcessor:
         self.logger.info(f"Audio extracted to {audio_path}")
         return audio_path
 
+    def extract_speech_audio(
+        self,
+        video_path: Path,
+        min_silence_seconds: float = 1.0,
+        padding_seconds: float = 0.25
+    ) -> Tuple[Path, List[Dict]]:
+        """
+        Extract a compact, silence-trimmed speech track for transcription.
+
+        Runs an energy-based VAD over the decoded audio, drops silences
+        longer than min_silence_seconds and encodes the remaining speech
+        as 16 kHz mono Opus. The offset map (also saved as
+        audio_offset_map.json) converts transcript timestamps back to the
+        original timeline.
+
+        Returns:
+            (audio path, offset map)
+        """
+        self.logger.info(f"Preparing speech audio from {video_path.name}")
+
+        frame_ms = 30
+        energies = frame_energies(video_path, frame_ms)
+        total_seconds = len(energies) * frame_ms / 1000
+        regions = detect_speech_regions(
+            energies,
+            frame_ms,
+            min_silence_seconds=min_silence_seconds,
+            padding_seconds=padding_seconds
+        )
+
+        if not regions:
+            self.logger.warning("VAD found no speech, keeping the full audio")
+            regions = [(0.0, total_seconds)]
+
+        offset_map = build_offset_map(regions)
+        kept_seconds = sum(end - start for start, end in regions)
+        self.logger.info(
+            f"VAD kept {kept_seconds:.1f}s of {total_seconds:.1f}s "
+            f"({len(regions)} speech regions)"
+        )
+
+        # The select expression can get long for podcasts, so pass it as a file
+        select_expr = '+'.join(
+            f"between(t,{start:.3f},{end:.3f})" for start, end in regions
+        )
+        filter_script = self.job_folder / "audio_speech_filter.txt"
+        filter_script.write_text(
+            f"aselect='{select_expr}',asetpts=N/SR/TB",
+            encoding="utf-8"
+        )
+
+        audio_path = self.job_folder / "audio_speech.ogg"
+        cmd = [
+            'ffmpeg',
+            '-err_detect', 'ignore_err',  # Ignore decoding errors
+            '-i', str(video_path),
+            '-vn',  # No video
+            '-map', '0:a:0',  # First audio stream
+            '-filter_script:a', str(filter_script),
+            *SPEECH_OPUS_ARGS,  # 16kHz mono Opus
+            '-y',
+            str(audio_path)
+        ]
+
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            stdin=subprocess.DEVNULL
+        )
+
+        if result.returncode != 0:
+            self.logger.warning(f"FFmpeg reported errors: {result.stderr[:200]}...")
+            if not audio_path.exists() or audio_path.stat().st_size < 1000:
+                raise Exception(f"Speech audio extraction failed: {result.stderr}")
+            self.logger.warning("Proceeding with partially extracted audio...")
+
+        offset_map_path = self.job_folder / "audio_offset_map.json"
+        with open(offset_map_path, 'w', encoding='utf-8') as f:
+            json.dump(offset_map, f)
+
+        self.logger.info(
+            f"Speech audio saved to {audio_path} "
+            f"({audio_path.stat().st_size / 1024:.0f} KB)"
+        )
+        return audio_path, offset_map
+
     def cut_clip(
         self,
         video_path: Path,
         start_time: str,
         duration: float,
         output_path: Path,
-        crop_params: Optional[dict] = None
+        crop_params: Optional[dict] = None,
+        crop_commands: Optional[Path] = None
     ) -> Path:
         """
         Cut a clip from video with optional cropping
@@ -66,6 +161,8 @@ class VideoProcessor:
             duration: Duration of the clip in seconds
             output_path: Output file path
             crop_params: Dict with 'x', 'y', 'width', 'height' for cropping
+            crop_commands: Optional sendcmd file that moves the crop window
+                over time (same encode pass, no extra cuts)
         """
         self.logger.info(f"Cutting clip: {start_time} for {duration} seconds")
 
@@ -78,6 +175,12 @@ class VideoProcessor:
                 f"crop={crop_params['width']}:{crop_params['height']}:"
                 f"{crop_params['x']}:{crop_params['y']}"
             )
+
+            if crop_commands:
+                # Named crop instance so sendcmd can retarget x/y per keyframe
+                filters.append(f"sendcmd=f={self._escape_filter_path(crop_commands)}")
+                crop_filter = crop_filter.replace("crop=", "crop@reframe=", 1)
+
             filters.append(crop_filter)
 
             # Scale to ~1080x1920 if needed, forcing even dimensions for H.264
@@ -130,7 +233,8 @@ class VideoProcessor:
         face_y: int,
         source_width: int,
         source_height: int,
-        output_name: str
+        output_name: str,
+        crop_trajectory: Optional[List[Dict]] = None
     ) -> Path:
         """
         Create a vertical 9:16 clip with face-centered cropping.
@@ -144,6 +248,9 @@ class VideoProcessor:
             source_width: Width of source video in pixels
             source_height: Height of source video in pixels
             output_name: Output filename
+            crop_trajectory: Optional per-shot face keyframes
+                ({'time', 'x', 'y'}, time relative to clip start) from
+                FaceTracker. Applied with sendcmd in the same encode pass.
         """
         output_path = self.job_folder / output_name
 
@@ -155,6 +262,64 @@ class VideoProcessor:
             source_width = 3840
             source_height = 2160
 
+        crop_x, crop_y, crop_width, crop_height = self._compute_crop_window(
+            face_x, face_y, source_width, source_height
+        )
+
+        self.logger.info("Vertical crop parameters:")
+        self.logger.info(
+            f"  - Source size: {source_width}x{source_height}, target aspect 9:16"
+        )
+        self.logger.info(
+            f"  - Face center: ({face_x}, {face_y}) -> crop window x={crop_x}, y={crop_y}, "
+            f"w={crop_width}, h={crop_height}"
+        )
+
+        crop_params = {
+            'x': crop_x,
+            'y': crop_y,
+            'width': crop_width,
+            'height': crop_height
+        }
+
+        crop_commands = None
+        if crop_trajectory:
+            crop_commands = self._write_crop_commands(
+                crop_trajectory,
+                source_width,
+                source_height,
+                output_path.with_suffix('.crop.cmd')
+            )
+            if crop_commands:
+                # Start the static crop on the first keyframe so frame 0 is right
+                first = crop_trajectory[0]
+                if first['time'] <= 0:
+                    crop_params['x'], crop_params['y'], _, _ = self._compute_crop_window(
+                        first['x'], first['y'], source_width, source_height
+                    )
+
+        return self.cut_clip(
+            video_path,
+            start_time,
+            duration,
+            output_path,
+            crop_params,
+            crop_commands
+        )
+
+    @staticmethod
+    def _compute_crop_window(
+        face_x: int,
+        face_y: int,
+        source_width: int,
+        source_height: int
+    ) -> Tuple[int, int, int, int]:
+        """
+        Largest 9:16 window that fits the source, centered on the face.
+
+        Returns:
+            (crop_x, crop_y, crop_width, crop_height)
+        """
         # Target vertical aspect ratio (width / height)
         target_aspect = 9 / 16
 
@@ -179,29 +344,88 @@ class VideoProcessor:
         crop_x = max(0, min(crop_x, source_width - crop_width))
         crop_y = max(0, min(crop_y, source_height - crop_height))
 
-        self.logger.info("Vertical crop parameters:")
-        self.logger.info(
-            f"  - Source size: {source_width}x{source_height}, target aspect 9:16"
-        )
-        self.logger.info(
-            f"  - Face center: ({face_x}, {face_y}) -> crop window x={crop_x}, y={crop_y}, "
-            f"w={crop_width}, h={crop_height}"
-        )
+        return crop_x, crop_y, crop_width, crop_height
 
-        crop_params = {
-            'x': crop_x,
-            'y': crop_y,
-            'width': crop_width,
-            'height': crop_height
-        }
+    def _write_crop_commands(
+        self,
+        crop_trajectory: List[Dict],
+        source_width: int,
+        source_height: int,
+        commands_path: Path
+    ) -> Optional[Path]:
+        """
+        Write an FFmpeg sendcmd script that moves the crop window.
 
-        return self.cut_clip(
-            video_path,
-            start_time,
-            duration,
-            output_path,
-            crop_params
+        sendcmd applies each command instantly, so shot changes ('cut'
+        keyframes) snap while moves within a shot are written as a series
+        of smoothstep-eased intermediate windows (a short pan).
+
+        Windows that resolve to the same clamped position are collapsed, so
+        a trajectory that never actually moves the crop returns None and
+        the clip is cut with the plain static crop.
+        """
+        lines = []
+        last_window = None
+        moves = 0
+
+        def emit(time: float, window: Tuple[int, int]) -> None:
+            nonlocal last_window
+            if window == last_window:
+                return
+            last_window = window
+            lines.append(
+                f"{max(0.0, time):.3f} "
+                f"crop@reframe x {window[0]}, crop@reframe y {window[1]};"
+            )
+
+        for i, keyframe in enumerate(crop_trajectory):
+            crop_x, crop_y, _, _ = self._compute_crop_window(
+                keyframe['x'], keyframe['y'], source_width, source_height
+            )
+            target = (crop_x, crop_y)
+            if target == last_window:
+                continue
+            moves += 1
+
+            if last_window is None or keyframe.get('cut', False):
+                emit(keyframe['time'], target)
+                continue
+
+            # Pan: ease from the current window, finishing before the next keyframe
+            next_time = (
+                crop_trajectory[i + 1]['time'] if i + 1 < len(crop_trajectory)
+                else keyframe['time'] + self.crop_pan_seconds
+            )
+            pan = max(0.0, min(self.crop_pan_seconds, next_time - keyframe['time']))
+            steps = max(1, int(round(pan / self.crop_pan_step_seconds)))
+            from_x, from_y = last_window
+            for step in range(1, steps + 1):
+                progress = step / steps
+                eased = progress * progress * (3 - 2 * progress)
+                emit(
+                    keyframe['time'] + pan * (step - 1) / steps,
+                    (
+                        int(round(from_x + (target[0] - from_x) * eased)),
+                        int(round(from_y + (target[1] - from_y) * eased))
+                    )
+                )
+
+        if moves < 2:
+            return None
+
+        commands_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self.logger.info(
+            f"Dynamic reframing: {moves} crop moves, {len(lines)} commands -> {commands_path.name}"
         )
+        return commands_path
+
+    @staticmethod
+    def _escape_filter_path(path: Path) -> str:
+        """Escape a file path for use as an FFmpeg filter option value"""
+        escaped = str(path).replace("\\", "/")
+        for char in ("'", ":", ",", ";", "[", "]"):
+            escaped = escaped.replace(char, "\\" + char)
+        return escaped
 
     def get_frame_at_time(self, video_path: Path, timestamp: str) -> Path:
         """Extract a single frame at given timestamp for analysis"""
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Modules import each other as top-level packages (utils.*, modules.*),
+# the same way main.py does when started from clip_app_1/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from utils.audio import build_offset_map, remap_timestamp
+
+
+@pytest.fixture
+def offset_map():
+    # Speech at 0-5s and 10-20s; the 5s silence between them was trimmed
+    return build_offset_map([(0.0, 5.0), (10.0, 20.0)])
+
+
+def test_build_offset_map(offset_map):
+    assert offset_map == [
+        {'compact_start': 0.0, 'original_start': 0.0, 'original_end': 5.0},
+        {'compact_start': 5.0, 'original_start': 10.0, 'original_end': 20.0},
+    ]
+
+
+@pytest.mark.parametrize("compact_time, original", [
+    (0.0, 0.0),
+    (3.25, 3.25),
+    (5.0, 10.0),      # Region boundary maps to the start of the next region
+    (7.5, 12.5),
+    (15.0, 20.0),
+])
+def test_remap_timestamp(offset_map, compact_time, original):
+    assert remap_timestamp(compact_time, offset_map) == pytest.approx(original)
+
+
+def test_remap_timestamp_clamps_to_region_end(offset_map):
+    assert remap_timestamp(42.0, offset_map) == 20.0
+
+
+def test_remap_timestamp_leading_silence():
+    offset_map = build_offset_map([(2.0, 4.0), (6.0, 8.0)])
+
+    assert remap_timestamp(0.0, offset_map) == 2.0
+    assert remap_timestamp(2.5, offset_map) == 6.5
+
+
+def test_remap_timestamp_without_map_is_identity():
+    assert remap_timestamp(12.345, []) == 12.345
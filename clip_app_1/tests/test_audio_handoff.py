@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from modules.audio_handoff import (
+    LocalObjectStoreHandoff,
+    SignedUrlHandoff,
+    create_audio_handoff,
+    sign_media_path,
+    verify_media_signature,
+)
+
+logger = logging.getLogger("test_audio_handoff")
+SECRET = "test-secret"
+
+
+def _split_signed_url(url: str):
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    media_path = unquote(parsed.path[len("/media/"):])
+    return parsed, media_path, int(query['expires'][0]), query['signature'][0]
+
+
+@pytest.fixture
+def job_audio(tmp_path: Path) -> Path:
+    job_folder = tmp_path / "outputs" / "job 1"
+    job_folder.mkdir(parents=True)
+    audio_path = job_folder / "speech.ogg"
+    audio_path.write_bytes(b"OggS fake opus payload")
+    return audio_path
+
+
+def test_signed_url_round_trip(tmp_path: Path, job_audio: Path):
+    handoff = SignedUrlHandoff("https://clips.example.com/", tmp_path / "outputs", SECRET, ttl=60)
+
+    payload = asyncio.run(handoff.prepare(job_audio, logger))
+
+    parsed, media_path, expires, signature = _split_signed_url(payload['audio_file'])
+    assert parsed.scheme == "https" and parsed.netloc == "clips.example.com"
+    assert media_path == "job 1/speech.ogg"
+    assert time.time() < expires <= time.time() + 60
+    assert verify_media_signature(media_path, expires, signature, SECRET)
+
+
+def test_signed_url_rejects_tampering(tmp_path: Path, job_audio: Path):
+    handoff = SignedUrlHandoff("https://clips.example.com", tmp_path / "outputs", SECRET)
+    _, media_path, expires, signature = _split_signed_url(handoff.url_for(job_audio))
+
+    assert not verify_media_signature("job 2/speech.ogg", expires, signature, SECRET)
+    assert not verify_media_signature(media_path, expires + 1, signature, SECRET)
+    assert not verify_media_signature(media_path, expires, signature, "other-secret")
+
+
+def test_signed_url_expires():
+    expires = int(time.time()) - 1
+    signature = sign_media_path("job/speech.ogg", expires, SECRET)
+    assert not verify_media_signature("job/speech.ogg", expires, signature, SECRET)
+
+
+def test_signed_url_outside_outputs_dir(tmp_path: Path):
+    outside = tmp_path / "elsewhere.ogg"
+    outside.write_bytes(b"x")
+    handoff = SignedUrlHandoff("https://clips.example.com", tmp_path / "outputs", SECRET)
+    with pytest.raises(ValueError):
+        handoff.url_for(outside)
+
+
+def test_object_store_is_content_addressed(tmp_path: Path, job_audio: Path):
+    store_dir = tmp_path / "object_store"
+    handoff = LocalObjectStoreHandoff(store_dir, "https://clips.example.com")
+
+    payload = asyncio.run(handoff.prepare(job_audio, logger))
+
+    key = payload['audio_file'].rsplit("/objects/", 1)[1]
+    assert key.endswith(".ogg")
+    assert (store_dir / key).read_bytes() == job_audio.read_bytes()
+
+    # Same bytes under another name map to the same object
+    copy_path = job_audio.with_name("copy.ogg")
+    copy_path.write_bytes(job_audio.read_bytes())
+    assert handoff.put(copy_path) == key
+    assert len(list(store_dir.iterdir())) == 1
+
+    changed = job_audio.with_name("changed.ogg")
+    changed.write_bytes(b"different audio")
+    assert handoff.put(changed) != key
+
+
+def test_create_audio_handoff_modes(tmp_path: Path):
+    assert create_audio_handoff("tmpfiles").name == "tmpfiles"
+    assert create_audio_handoff(
+        "signed_url", "https://clips.example.com", tmp_path, SECRET
+    ).name == "signed_url"
+    assert create_audio_handoff(
+        "object_store", "https://clips.example.com", object_store_dir=tmp_path / "store"
+    ).name == "object_store"
+
+    with pytest.raises(ValueError):
+        create_audio_handoff("signed_url")
+    with pytest.raises(ValueError):
+        create_audio_handoff("inline")
@@ -0,0 +1,77 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from modules.clip_selector import ClipSelector
+
+
+def _clip(start: int, score: int):
+    return {
+        "start_time": f"00:{start // 60:02d}:{start % 60:02d}",
+        "end_time": f"00:{(start + 30) // 60:02d}:{(start + 30) % 60:02d}",
+        "virality_score": score,
+        "title": f"clip at {start}s",
+    }
+
+
+@pytest.fixture
+def selector(tmp_path: Path) -> ClipSelector:
+    return ClipSelector(
+        api_key="test",
+        model="primary",
+        job_folder=tmp_path,
+        target_clips=2,
+        speculative_requests=3,
+        speculative_models=["backup"],
+        hedge_delay_seconds=30.0,
+    )
+
+
+def test_failed_request_launches_next_variant_immediately(selector, monkeypatch):
+    calls = []
+
+    async def fake_call_llm(prompt, model=None, temperature=None):
+        calls.append(model)
+        if len(calls) == 1:
+            raise RuntimeError("upstream 502")
+        return [_clip(0, 7), _clip(60, 9)]
+
+    monkeypatch.setattr(selector, "_call_llm", fake_call_llm)
+
+    # Would block for the 30s hedge delay (or raise on an empty wait set)
+    clips = asyncio.run(asyncio.wait_for(selector._select_clips_speculative("prompt"), timeout=2))
+
+    assert calls == ["primary", "backup"]
+    assert [c["virality_score"] for c in clips] == [9, 7]
+
+
+def test_stream_clips_uses_speculative_requests(selector, monkeypatch):
+    selector.hedge_delay_seconds = 0.0
+    calls = []
+
+    async def fake_call_llm(prompt, model=None, temperature=None):
+        calls.append(model)
+        if model == "primary":
+            await asyncio.sleep(0.05)
+        return [_clip(0, 8)] if model == "primary" else [_clip(120, 6), _clip(5, 9)]
+
+    def fail_stream(prompt):
+        raise AssertionError("single SSE stream used despite speculative_requests > 1")
+
+    monkeypatch.setattr(selector, "_call_llm", fake_call_llm)
+    monkeypatch.setattr(selector, "_stream_llm", fail_stream)
+
+    transcript = {"language": "en", "segments": [{"start": 0.0, "end": 200.0, "text": "hello"}]}
+
+    async def collect():
+        return [clip async for clip in selector.stream_clips(transcript)]
+
+    clips = asyncio.run(collect())
+
+    # Backup answers first; its best clip overlaps nothing so it is taken,
+    # then the 120s clip completes the target and both primaries are cancelled
+    assert [c["title"] for c in clips] == ["clip at 5s", "clip at 120s"]
+    assert calls == ["primary", "backup", "primary"]
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from utils.http_gateway import CircuitBreaker, OutboundGateway, ProviderPolicy
+
+
+def _gateway(handler) -> OutboundGateway:
+    policy = ProviderPolicy(
+        ('api.example.com',),
+        requests_per_second=1000.0,
+        burst=1000,
+        max_retries=0,
+        failure_threshold=1,
+        reset_timeout=0.0
+    )
+    gateway = OutboundGateway({'example': policy, 'default': policy}, http2=False)
+    transport = httpx.MockTransport(handler)
+    gateway.client_for = lambda url: httpx.AsyncClient(transport=transport)
+    return gateway
+
+
+def _open_breaker(gateway: OutboundGateway) -> CircuitBreaker:
+    breaker = gateway._state('example').breaker
+    breaker.record_failure()  # threshold 1, reset 0s: next call is the trial
+    assert breaker.state == "half_open"
+    return breaker
+
+
+def test_cancelled_trial_releases_breaker():
+    async def slow(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    async def scenario():
+        gateway = _gateway(slow)
+        breaker = _open_breaker(gateway)
+
+        task = asyncio.create_task(gateway.get("https://api.example.com/x"))
+        await asyncio.sleep(0.01)
+        assert breaker.trial_in_flight
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert not breaker.trial_in_flight
+        assert breaker.allow()
+
+    asyncio.run(scenario())
+
+
+def test_non_http_error_releases_breaker():
+    def broken(request):
+        raise RuntimeError("bug in caller-supplied hook")
+
+    async def scenario():
+        gateway = _gateway(broken)
+        breaker = _open_breaker(gateway)
+        with pytest.raises(RuntimeError):
+            await gateway.get("https://api.example.com/x")
+        assert not breaker.trial_in_flight
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_stream_trial_releases_breaker():
+    async def slow(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    async def consume(gateway):
+        async with gateway.stream("POST", "https://api.example.com/x") as response:
+            await response.aread()
+
+    async def scenario():
+        gateway = _gateway(slow)
+        breaker = _open_breaker(gateway)
+        task = asyncio.create_task(consume(gateway))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not breaker.trial_in_flight
+
+    asyncio.run(scenario())
+
+
+def test_trial_success_closes_breaker():
+    async def scenario():
+        gateway = _gateway(lambda request: httpx.Response(200))
+        breaker = _open_breaker(gateway)
+        response = await gateway.get("https://api.example.com/x")
+        assert response.status_code == 200
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
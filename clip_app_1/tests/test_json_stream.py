@@ -0,0 +1,78 @@
+import json
+
+from utils.json_stream import IncrementalArrayParser
+
+
+def _feed_all(parser: IncrementalArrayParser, chunks):
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return items
+
+
+def _char_chunks(text: str):
+    return list(text)
+
+
+def test_items_yielded_as_soon_as_complete():
+    parser = IncrementalArrayParser()
+
+    first = list(parser.feed('{"clips": [{"start_id": 1, "end_id": 4}, {"start_'))
+    assert first == [{"start_id": 1, "end_id": 4}]
+
+    second = list(parser.feed('id": 7, "end_id": 9}]}'))
+    assert second == [{"start_id": 7, "end_id": 9}]
+    assert parser.items == first + second
+
+
+def test_escape_split_across_chunks():
+    payload = {"clips": [{"title": 'He said \\"stop\\" }] {['}, {"title": "next"}]}
+    text = json.dumps(payload)
+    # Cut right after a backslash so the escaped quote arrives in the next chunk
+    cut = text.index('\\') + 1
+
+    items = _feed_all(IncrementalArrayParser(), [text[:cut], text[cut:]])
+
+    assert items == payload["clips"]
+
+
+def test_braces_and_brackets_inside_strings():
+    payload = {"clips": [
+        {"title": "set {x} = [1, 2]", "reason": "ends with ]"},
+        {"title": "}{", "virality_score": 8}
+    ]}
+
+    items = _feed_all(IncrementalArrayParser(), _char_chunks(json.dumps(payload)))
+
+    assert items == payload["clips"]
+
+
+def test_fenced_response_with_prose():
+    text = (
+        "Here are the best clips:\n"
+        "```json\n"
+        '{"clips": [{"start_id": 3, "end_id": 12, "title": "Opening [hook]"}]}\n'
+        "```\n"
+        "Let me know if you want more."
+    )
+
+    parser = IncrementalArrayParser()
+    items = _feed_all(parser, [text[i:i + 7] for i in range(0, len(text), 7)])
+
+    assert items == [{"start_id": 3, "end_id": 12, "title": "Opening [hook]"}]
+    # Anything after the closing bracket is ignored
+    assert list(parser.feed('{"clips": [{"start_id": 99}]}')) == []
+
+
+def test_key_split_across_chunks_and_custom_key():
+    parser = IncrementalArrayParser(key="segments")
+
+    items = _feed_all(parser, ['{"segm', 'ents"  :', '  [{"id": 1}', ']}'])
+
+    assert items == [{"id": 1}]
+
+
+def test_malformed_item_is_skipped():
+    items = _feed_all(IncrementalArrayParser(), ['{"clips": [{"a": 1,}, {"b": 2}]}'])
+
+    assert items == [{"b": 2}]
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("numpy")
+
+from modules.transcriber import Transcriber
+
+
+@pytest.fixture
+def transcriber(tmp_path: Path) -> Transcriber:
+    return Transcriber(api_key="test", endpoint="test-endpoint", job_folder=tmp_path)
+
+
+def _chunks():
+    # Owned ranges 0-10s and 10-20s, each padded by 1s into its neighbour
+    return [
+        {'index': 0, 'start': 0.0, 'end': 11.0, 'own_start': 0.0, 'own_end': 10.0},
+        {'index': 1, 'start': 9.0, 'end': 20.0, 'own_start': 10.0, 'own_end': 20.0},
+    ]
+
+
+def _words(segment):
+    return [(w['word'], w['start'], w['end']) for w in segment['words']]
+
+
+def test_merge_keeps_each_seam_word_once(transcriber):
+    results = [
+        {'language': 'hi', 'segments': [
+            {'text': 'a b c', 'start': 8.0, 'end': 10.8, 'words': [
+                {'word': 'a', 'start': 8.0, 'end': 8.5},
+                {'word': 'b', 'start': 9.5, 'end': 10.2},   # Midpoint 9.85: chunk 0
+                {'word': 'c', 'start': 10.3, 'end': 10.8},  # Midpoint 10.55: chunk 1
+            ]},
+        ]},
+        {'language': 'hi', 'segments': [
+            # Chunk-relative times (chunk 1 starts at 9s)
+            {'text': 'b c d', 'start': 0.5, 'end': 6.0, 'words': [
+                {'word': 'b', 'start': 0.5, 'end': 1.2},
+                {'word': 'c', 'start': 1.3, 'end': 1.8},
+                {'word': 'd', 'start': 5.0, 'end': 6.0},
+            ]},
+        ]},
+    ]
+
+    merged = transcriber._merge_chunk_transcripts(_chunks(), results)
+
+    segments = merged['segments']
+    assert [s['id'] for s in segments] == [0, 1]
+    assert _words(segments[0]) == [('a', 8.0, 8.5), ('b', 9.5, 10.2)]
+    assert _words(segments[1]) == [('c', 10.3, 10.8), ('d', 14.0, 15.0)]
+
+    # Straddling segments are rebuilt from the words they kept
+    assert (segments[0]['start'], segments[0]['end'], segments[0]['text']) == (8.0, 10.2, 'a b')
+    assert (segments[1]['start'], segments[1]['end'], segments[1]['text']) == (10.3, 15.0, 'c d')
+    assert merged['text'] == 'a b c d'
+    assert merged['language'] == 'hi'
+
+
+def test_merge_wordless_segments_use_midpoint(transcriber):
+    results = [
+        {'segments': [{'text': 'intro', 'start': 1.0, 'end': 3.0}]},
+        {'segments': [
+            {'text': 'overlap echo', 'start': 0.0, 'end': 0.8},  # 9.0-9.8: chunk 0's range
+            {'text': 'main', 'start': 2.0, 'end': 4.0},
+        ]},
+    ]
+
+    merged = transcriber._merge_chunk_transcripts(_chunks(), results)
+
+    assert [(s['text'], s['start'], s['end']) for s in merged['segments']] == [
+        ('intro', 1.0, 3.0),
+        ('main', 11.0, 13.0),
+    ]
+
+
+def test_merge_last_chunk_owns_its_end(transcriber):
+    results = [
+        {'segments': []},
+        {'segments': [{'text': 'outro', 'start': 10.5, 'end': 11.5, 'words': [
+            # Midpoint 20.0 is the end of the owned range; still kept by the last chunk
+            {'word': 'outro', 'start': 10.5, 'end': 11.5},
+        ]}]},
+    ]
+
+    merged = transcriber._merge_chunk_transcripts(_chunks(), results)
+
+    assert _words(merged['segments'][0]) == [('outro', 19.5, 20.5)]
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from modules.transcript import Transcript
+
+
+@pytest.fixture
+def transcript():
+    return Transcript.from_transcript({
+        'language': 'hi',
+        'segments': [
+            {'words': [
+                {'word': 'namaste', 'start': 0.0, 'end': 0.5},
+                {'word': '2024'},  # Unaligned, skipped
+                {'word': 'दोस्तों', 'start': 0.6, 'end': 4.0},
+            ]},
+            {'words': [
+                {'word': 'aaj', 'start': 1.0, 'end': 1.4},
+                {'word': 'hum', 'start': 5.0, 'end': 5.5},
+            ]},
+        ]
+    })
+
+
+def test_from_transcript_sorts_by_start(transcript):
+    assert len(transcript) == 4
+    assert [w['text'] for w in transcript.to_words()] == ['namaste', 'दोस्तों', 'aaj', 'hum']
+
+
+def test_slice_relative_shifts_and_clamps(transcript):
+    words = transcript.slice(1.2, 3.0)
+
+    # 'दोस्तों' started before the clip and is still being spoken at its
+    # end; 'aaj' ends inside it
+    assert [w['text'] for w in words] == ['दोस्तों', 'aaj']
+    assert words[0]['start'] == 0.0 and words[0]['end'] == pytest.approx(1.8)
+    assert words[1]['start'] == 0.0 and words[1]['end'] == pytest.approx(0.2)
+    assert (words[0]['segment_id'], words[0]['word_index']) == (0, 2)
+    assert (words[1]['segment_id'], words[1]['word_index']) == (1, 0)
+
+
+def test_slice_absolute(transcript):
+    words = transcript.slice(1.2, 3.0, relative=False)
+
+    assert [(w['start'], w['end']) for w in words] == [(0.6, 4.0), (1.0, 1.4)]
+
+
+def test_slice_finds_long_word_behind_short_ones(transcript):
+    # 'aaj' ends before 4.5 but the earlier 'दोस्तों' does not, so a plain
+    # searchsorted on ends would miss it
+    words = transcript.slice(3.5, 6.0, relative=False)
+
+    assert [w['text'] for w in words] == ['दोस्तों', 'hum']
+
+
+def test_slice_half_open_bounds(transcript):
+    assert transcript.slice(0.5, 0.6) == []            # Gap between words
+    assert [w['text'] for w in transcript.slice(4.9, 5.0)] == []
+    assert [w['text'] for w in transcript.slice(5.5, 9.0)] == []
+    assert [w['text'] for w in transcript.slice(5.49, 9.0)] == ['hum']
+
+
+def test_save_load_round_trip(transcript, tmp_path):
+    path = transcript.save(tmp_path / "words.npz")
+
+    loaded = Transcript.load(path)
+
+    assert loaded.language == 'hi'
+    assert loaded.to_words() == transcript.to_words()
+    assert loaded.slice(1.2, 3.0) == transcript.slice(1.2, 3.0)
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pytest
+
+from utils.transliteration_dict import TransliterationDictionary
+
+
+@pytest.fixture
+def dictionary(tmp_path: Path):
+    dictionary = TransliterationDictionary(tmp_path / "words.db", min_agreement=2, agreement_ratio=0.75)
+    yield dictionary
+    dictionary.close()
+
+
+def test_single_llm_line_is_not_trusted(dictionary):
+    assert dictionary.learn_segment("आज हम", "aaj hum") == 2
+
+    assert dictionary.lookup_many(["आज", "हम"]) == {}
+    assert dictionary.stats()['entries_pending'] == 2
+
+
+def test_agreeing_lines_are_promoted(dictionary):
+    recorded = dictionary.learn_segments([
+        ("आज हम", "aaj hum"),
+        ("हम आज", "hum aaj"),
+        ("दोस्तों", "doston"),   # Seen once only
+        ("आज बहुत", "aaj"),      # Word counts differ: nothing recorded
+    ])
+
+    assert recorded == [2, 2, 1, 0]
+    assert dictionary.lookup_many(["आज", "हम", "दोस्तों"]) == {"आज": "aaj", "हम": "hum"}
+    assert dictionary.transliterate_local_many(["आज, हम।", "आज दोस्तों"]) == ["aaj, hum.", None]
+
+
+def test_disagreement_blocks_promotion_until_a_clear_majority(dictionary):
+    dictionary.learn_segments([("नहीं", "nahi"), ("नहीं", "nahin")])
+    assert dictionary.lookup_many(["नहीं"]) == {}
+
+    # 2 of 3 sightings agree: still under the 75% ratio
+    dictionary.learn_segment("नहीं", "nahi")
+    assert dictionary.lookup_many(["नहीं"]) == {}
+
+    for _ in range(3):
+        dictionary.learn_segment("नहीं", "nahi")
+    assert dictionary.lookup_many(["नहीं"]) == {"नहीं": "nahi"}
+
+
+def test_itrans_never_replaces_promoted_spelling(dictionary):
+    dictionary.learn_segments([("यार", "yaar"), ("यार", "yaar")])
+    dictionary.add_many([("यार", "yAra")], source="itrans")
+
+    assert dictionary.lookup_many(["यार"]) == {"यार": "yaar"}
+    assert dictionary.stats()['entries_by_source'] == {"llm": 1}
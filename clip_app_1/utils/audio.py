@@ -0,0 +1,253 @@
+import bisect
+import hashlib
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+# Encoder settings for speech sent to WhisperX: 16 kHz mono Opus, far
+# smaller than MP3 at the same intelligibility
+SPEECH_OPUS_ARGS = [
+    '-c:a', 'libopus',
+    '-b:a', '24k',
+    '-application', 'voip',
+    '-ar', '16000',
+    '-ac', '1',
+]
+
+
+def _pcm_decode_cmd(audio_path: Path, sample_rate: int) -> list:
+    """FFmpeg command that decodes any audio to raw mono s16le on stdout"""
+    return [
+        'ffmpeg',
+        '-v', 'error',
+        '-i', str(audio_path),
+        '-vn',
+        '-ac', '1',  # Mono
+        '-ar', str(sample_rate),
+        '-f', 's16le',  # Raw 16-bit PCM
+        '-'
+    ]
+
+
+def decode_pcm(audio_path: Path, sample_rate: int = 16000) -> bytes:
+    """Decode audio to raw mono 16-bit PCM bytes"""
+    result = subprocess.run(
+        _pcm_decode_cmd(audio_path, sample_rate),
+        capture_output=True,
+        stdin=subprocess.DEVNULL
+    )
+    if result.returncode != 0:
+        raise Exception(f"PCM decode failed: {result.stderr.decode(errors='ignore')[:200]}")
+    return result.stdout
+
+
+def pcm_fingerprint(audio_path: Path, sample_rate: int = 16000) -> str:
+    """
+    SHA-256 of the decoded PCM stream.
+
+    Hashing decoded samples instead of file bytes makes identical audio
+    match across containers, bitrates and metadata (re-uploads, re-muxed
+    files, identical TTS output). The decode is streamed, so long files
+    are never held in memory.
+    """
+    digest = hashlib.sha256()
+    process = subprocess.Popen(
+        _pcm_decode_cmd(audio_path, sample_rate),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL
+    )
+
+    for block in iter(lambda: process.stdout.read(1024 * 1024), b''):
+        digest.update(block)
+
+    process.stdout.close()
+    if process.wait() != 0:
+        raise Exception(f"PCM decode failed for {audio_path}")
+
+    return digest.hexdigest()
+
+
+def probe_duration(audio_path: Path) -> float:
+    """Duration of a media file in seconds (ffprobe)"""
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        str(audio_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    if result.returncode != 0:
+        raise Exception(f"ffprobe failed: {result.stderr[:200]}")
+    return float(result.stdout.strip())
+
+
+def frame_energies(
+    audio_path: Path,
+    frame_ms: int = 50,
+    sample_rate: int = 16000
+) -> np.ndarray:
+    """
+    RMS energy (dBFS) of consecutive fixed-size frames.
+
+    The PCM stream is decoded and reduced block by block, so only one value
+    per frame is kept in memory (a 3-hour file is ~216k floats at 50 ms).
+    """
+    samples_per_frame = int(sample_rate * frame_ms / 1000)
+    block_bytes = samples_per_frame * 2 * 200  # 200 frames per read
+
+    process = subprocess.Popen(
+        _pcm_decode_cmd(audio_path, sample_rate),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL
+    )
+
+    energies = []
+    leftover = b''
+    for block in iter(lambda: process.stdout.read(block_bytes), b''):
+        data = leftover + block
+        usable = len(data) - len(data) % (samples_per_frame * 2)
+        leftover = data[usable:]
+        if not usable:
+            continue
+
+        frames = np.frombuffer(data[:usable], dtype=np.int16).reshape(-1, samples_per_frame)
+        rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+        energies.append(20 * np.log10(np.maximum(rms, 1.0) / 32768.0))
+
+    process.stdout.close()
+    if process.wait() != 0:
+        raise Exception(f"PCM decode failed for {audio_path}")
+
+    if not energies:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(energies)
+
+
+def find_split_points(
+    energies_db: np.ndarray,
+    frame_ms: int,
+    target_chunk_seconds: float,
+    search_window_seconds: float = 30.0
+) -> List[float]:
+    """
+    Pick chunk boundaries at the quietest point near each target boundary.
+
+    For every multiple of target_chunk_seconds, the frame with the lowest
+    energy (smoothed over ~0.5 s so single quiet frames inside words are
+    ignored) within +/- search_window_seconds is chosen.
+
+    Returns:
+        Boundary times in seconds, excluding 0 and the end of the audio
+    """
+    frames_per_second = 1000 / frame_ms
+    total_seconds = len(energies_db) / frames_per_second
+    if total_seconds <= target_chunk_seconds:
+        return []
+
+    smooth_frames = max(1, int(0.5 * frames_per_second))
+    kernel = np.ones(smooth_frames) / smooth_frames
+    smoothed = np.convolve(energies_db, kernel, mode='same')
+
+    boundaries = []
+    target = target_chunk_seconds
+    while target < total_seconds - target_chunk_seconds / 4:
+        lo = int(max(0, target - search_window_seconds) * frames_per_second)
+        hi = int(min(total_seconds, target + search_window_seconds) * frames_per_second)
+        if boundaries:
+            # Keep boundaries strictly increasing
+            lo = max(lo, int(boundaries[-1] * frames_per_second) + 1)
+        if hi <= lo:
+            break
+
+        quietest = lo + int(np.argmin(smoothed[lo:hi]))
+        boundaries.append(quietest / frames_per_second)
+        target = boundaries[-1] + target_chunk_seconds
+
+    return boundaries
+
+
+def detect_speech_regions(
+    energies_db: np.ndarray,
+    frame_ms: int,
+    min_silence_seconds: float = 1.0,
+    padding_seconds: float = 0.25,
+    threshold_db: float = None
+) -> List[Tuple[float, float]]:
+    """
+    Energy-based voice activity detection.
+
+    A frame counts as speech when it is louder than the threshold (by
+    default 10 dB above the 10th-percentile noise floor, never below
+    -55 dBFS). Pauses shorter than min_silence_seconds are kept so normal
+    speech rhythm is untouched; only long silences are dropped. Each
+    region is padded to avoid clipping word onsets and tails.
+
+    Returns:
+        List of (start, end) speech regions in seconds
+    """
+    if len(energies_db) == 0:
+        return []
+
+    frame_seconds = frame_ms / 1000
+    total_seconds = len(energies_db) * frame_seconds
+
+    if threshold_db is None:
+        threshold_db = max(float(np.percentile(energies_db, 10)) + 10.0, -55.0)
+
+    is_speech = energies_db > threshold_db
+    if not is_speech.any():
+        return []
+
+    # Rising / falling edges of speech runs
+    padded = np.concatenate([[False], is_speech, [False]])
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, ends = edges[0::2] * frame_seconds, edges[1::2] * frame_seconds
+
+    regions: List[Tuple[float, float]] = []
+    for start, end in zip(starts, ends):
+        start = max(0.0, start - padding_seconds)
+        end = min(total_seconds, end + padding_seconds)
+        if regions and start - regions[-1][1] < min_silence_seconds:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+
+    return regions
+
+
+def build_offset_map(regions: List[Tuple[float, float]]) -> List[Dict]:
+    """
+    Map kept regions onto the compacted timeline.
+
+    Returns:
+        List of {'compact_start', 'original_start', 'original_end'}
+    """
+    offset_map = []
+    compact_start = 0.0
+    for start, end in regions:
+        offset_map.append({
+            'compact_start': round(compact_start, 3),
+            'original_start': round(start, 3),
+            'original_end': round(end, 3)
+        })
+        compact_start += end - start
+    return offset_map
+
+
+def remap_timestamp(compact_time: float, offset_map: List[Dict]) -> float:
+    """Convert a time on the silence-trimmed audio back to original time"""
+    if not offset_map:
+        return compact_time
+
+    starts = [entry['compact_start'] for entry in offset_map]
+    index = max(0, bisect.bisect_right(starts, compact_time) - 1)
+    entry = offset_map[index]
+
+    original = entry['original_start'] + (compact_time - entry['compact_start'])
+    return round(min(original, entry['original_end']), 3)
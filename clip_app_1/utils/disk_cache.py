@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class DiskCache:
+    """
+    Small persistent key/value cache for JSON-serializable values.
+
+    Values are stored as gzip-compressed, whitespace-free JSON, one file
+    per key. When the folder grows past max_bytes the least recently used
+    entries (by mtime, refreshed on every hit) are evicted down to
+    evict_to_ratio of the budget. With ttl_seconds set, entries older than
+    that (by write time) are treated as misses.
+
+    The folder size is scanned once and then tracked incrementally, so a
+    set() only walks the directory when an eviction is actually due.
+    """
+
+    evict_to_ratio = 0.9
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = 500 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._total_bytes: Optional[int] = None
+
+    @staticmethod
+    def make_key(parts: Dict) -> str:
+        """Stable SHA-256 key for a dict of key components"""
+        encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss"""
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, EOFError, json.JSONDecodeError):
+            return None
+
+        # mtime tracks recency, so the write time lives inside the entry
+        if not isinstance(entry, dict) or '__created_at__' not in entry:
+            return None
+        if self.ttl_seconds is not None and time.time() - entry['__created_at__'] > self.ttl_seconds:
+            self.delete(key)
+            return None
+        value = entry['value']
+
+        # Refresh recency for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value: Any) -> Path:
+        """Store a value and evict old entries if over budget"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        old_size = self._size(path)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(
+                {'__created_at__': time.time(), 'value': value},
+                f,
+                ensure_ascii=False,
+                separators=(',', ':')
+            )
+
+        os.replace(tmp_path, path)
+        self._track(self._size(path) - old_size)
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+        return path
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry if present"""
+        path = self._path(key)
+        size = self._size(path)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        self._track(-size)
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _scan_total(self) -> int:
+        total = 0
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            total += self._size(path)
+        return total
+
+    def _track(self, delta: int) -> None:
+        """Apply a size delta, scanning the folder once on first use"""
+        if self._total_bytes is None:
+            # The scan already includes the write being tracked
+            self._total_bytes = self._scan_total()
+        else:
+            self._total_bytes = max(0, self._total_bytes + delta)
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the eviction target"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        # Resync with the folder: other processes may share it
+        self._total_bytes = total
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * self.evict_to_ratio)
+        for _, size, path in sorted(entries):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            total -= size
+            if total <= target:
+                break
+        self._total_bytes = total
@@ -0,0 +1,23 @@
+"""
+Process-wide gateway for outbound HTTP calls (OpenRouter, RunPod, tmpfiles).
+
+The implementation is shared with the root app (utils/http_gateway.py at
+the repository root); this module re-exports it so both apps run the same
+rate limits, retries and circuit breakers.
+"""
+from utils.shared import load_shared_module
+
+_gateway_module = load_shared_module("utils/http_gateway.py")
+
+HTTP2_AVAILABLE = _gateway_module.HTTP2_AVAILABLE
+RETRY_STATUS_CODES = _gateway_module.RETRY_STATUS_CODES
+DEFAULT_POLICIES = _gateway_module.DEFAULT_POLICIES
+
+CircuitOpenError = _gateway_module.CircuitOpenError
+TokenBucket = _gateway_module.TokenBucket
+CircuitBreaker = _gateway_module.CircuitBreaker
+ProviderPolicy = _gateway_module.ProviderPolicy
+OutboundGateway = _gateway_module.OutboundGateway
+
+get_gateway = _gateway_module.get_gateway
+configure_gateway = _gateway_module.configure_gateway
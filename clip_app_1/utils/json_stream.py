@@ -0,0 +1,90 @@
+import json
+from typing import Any, Iterator, List
+
+
+class IncrementalArrayParser:
+    """
+    Yield the items of a JSON array as soon as each one is complete.
+
+    Fed arbitrary text chunks of a streamed LLM response such as
+    {"clips": [{...}, {...}]}, it looks for the array under `key` and
+    decodes every top-level object in it the moment its closing brace
+    arrives. Markdown fences or prose before the JSON are skipped.
+    """
+
+    def __init__(self, key: str = "clips"):
+        self.key = key
+        self.buffer = ""
+        self.items: List[Any] = []
+
+        self._pos = 0           # Next character to scan
+        self._in_array = False
+        self._done = False
+        self._depth = 0         # Nesting depth inside the array
+        self._item_start = -1
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> Iterator[Any]:
+        """Add a chunk and yield every array item it completes"""
+        self.buffer += text
+        if self._done:
+            return
+
+        if not self._in_array and not self._find_array():
+            return
+
+        buffer = self.buffer
+        i = self._pos
+        while i < len(buffer):
+            char = buffer[i]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 0:
+                    self._item_start = i
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == 0 and char == ']':
+                    self._done = True  # End of the array
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    item = self._decode(buffer[self._item_start:i + 1])
+                    if item is not None:
+                        self.items.append(item)
+                        yield item
+                    self._item_start = -1
+            i += 1
+
+        self._pos = i
+
+    def _find_array(self) -> bool:
+        """Advance past '"<key>": [' once it has fully arrived"""
+        marker = self.buffer.find(f'"{self.key}"')
+        if marker < 0:
+            return False
+
+        colon = self.buffer.find(':', marker)
+        bracket = self.buffer.find('[', colon) if colon >= 0 else -1
+        if bracket < 0 or self.buffer[colon + 1:bracket].strip():
+            return False
+
+        self._in_array = True
+        self._pos = bracket + 1
+        return True
+
+    @staticmethod
+    def _decode(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
@@ -0,0 +1,57 @@
+import hashlib
+from typing import Dict, Optional
+
+from utils.disk_cache import DiskCache
+
+
+class LLMCacheMiss(Exception):
+    """Raised in replay mode when a prompt has no recorded response"""
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of LLM completions (raw message text).
+
+    Keyed by model, system prompt hash, user prompt hash and sampling
+    params. Modes:
+        read_write - serve hits, store fresh responses (default)
+        bypass     - always call the API, refresh stored responses
+                     (when we deliberately want new suggestions)
+        replay     - serve recorded responses only; a miss raises
+                     LLMCacheMiss (offline test fixture)
+        record     - same as bypass; used to (re)build a replay fixture
+    """
+
+    modes = ("read_write", "bypass", "replay", "record")
+
+    def __init__(self, cache: DiskCache, mode: str = "read_write"):
+        if mode not in self.modes:
+            raise ValueError(f"Unknown LLM cache mode: {mode}")
+        self.cache = cache
+        self.mode = mode
+
+    @staticmethod
+    def _sha256(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def make_key(self, model: str, system_prompt: str, user_prompt: str, params: Dict) -> str:
+        return self.cache.make_key({
+            'model': model,
+            'system_sha256': self._sha256(system_prompt),
+            'user_sha256': self._sha256(user_prompt),
+            'params': params
+        })
+
+    def get(self, key: str) -> Optional[str]:
+        """Recorded response, or None when the API should be called"""
+        if self.mode in ("bypass", "record"):
+            return None
+
+        content = self.cache.get(key)
+        if content is None and self.mode == "replay":
+            raise LLMCacheMiss(f"No recorded LLM response for key {key[:12]}")
+        return content
+
+    def set(self, key: str, content: str) -> None:
+        if self.mode != "replay" and content:
+            self.cache.set(key, content)
@@ -0,0 +1,30 @@
+"""
+Load modules shared with the root app (../utils, ../modules).
+
+Both apps import their own code as top-level `utils` and `modules`
+packages, so a shared file can't simply be put on sys.path. It is loaded
+once by file path under a distinct module name instead, and the local
+module re-exports what the clip app uses.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def load_shared_module(relative_path: str) -> ModuleType:
+    """Import REPO_ROOT/relative_path (e.g. "utils/http_gateway.py") once per process"""
+    name = "shared_" + relative_path[:-len(".py")].replace("/", "_")
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, REPO_ROOT / relative_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    return module
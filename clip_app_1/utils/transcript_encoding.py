@@ -0,0 +1,159 @@
+"""
+Compact transcript encoding for LLM prompts.
+
+The default prompt format repeats "[HH:MM:SS - HH:MM:SS]" on every segment
+and asks the model to echo timestamp strings back. The compact format:
+
+- merges very short segments so there are fewer lines to label,
+- numbers segments and prints each with its start as whole seconds
+  relative to the first line ("12 +347 text"),
+- asks the model to answer with segment IDs (start_id/end_id), which are
+  mapped back to exact absolute times here,
+- can replace segments outside the focus ranges with stop-word-stripped
+  summaries ("~" lines) that keep the story without the full text.
+"""
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.helpers import format_timestamp
+
+
+# Function words dropped from far-context summaries (English, Hinglish, Hindi)
+STOP_WORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'so', 'to', 'of', 'in', 'on', 'at',
+    'for', 'with', 'is', 'are', 'was', 'were', 'be', 'been', 'it', 'this',
+    'that', 'i', 'you', 'he', 'she', 'we', 'they', 'my', 'your', 'me', 'um',
+    'uh', 'like', 'just', 'very', 'really', 'then', 'there', 'do', 'did',
+    'hai', 'hain', 'tha', 'thi', 'ka', 'ki', 'ke', 'ko', 'se', 'mein',
+    'par', 'aur', 'ya', 'toh', 'bhi', 'hi', 'na', 'ye', 'yeh',
+    'vo', 'woh', 'wo', 'ek', 'kya', 'jo', 'ho', 'raha', 'rahi', 'rahe',
+    'है', 'हैं', 'था', 'थी', 'थे', 'का', 'की', 'के', 'को', 'से', 'में',
+    'पर', 'और', 'या', 'तो', 'भी', 'ही', 'न', 'ये', 'यह', 'वो', 'वह', 'एक',
+    'जो', 'हो', 'रहा', 'रही', 'रहे',
+}
+
+
+def strip_stop_words(text: str) -> str:
+    """Keep content words only (punctuation-insensitive match)"""
+    # \w alone would drop Devanagari vowel signs (combining marks)
+    kept = [
+        word for word in text.split()
+        if re.sub(r'[^\w\u0900-\u097F]|[।॥]', '', word.lower()) not in STOP_WORDS
+    ]
+    return " ".join(kept)
+
+
+def segment_bounds(segment: Dict) -> Tuple[float, float]:
+    """(start, end) of a segment, from its words when the segment has none"""
+    if 'start' in segment and 'end' in segment:
+        return segment['start'], segment['end']
+    timed = [w for w in segment.get('words', []) if 'start' in w and 'end' in w]
+    if not timed:
+        raise ValueError("Segment has no timing information")
+    return timed[0]['start'], timed[-1]['end']
+
+
+def segment_text(segment: Dict) -> str:
+    if segment.get('text'):
+        return segment['text'].strip()
+    return " ".join(w.get('text', w.get('word', '')) for w in segment.get('words', [])).strip()
+
+
+class CompactTranscript:
+    """
+    Numbered, merged view of a transcript used for prompting and for
+    mapping segment-ID answers back to absolute times.
+
+    Built once from the full transcript so IDs stay stable across map
+    windows and pre-ranked subsets.
+    """
+
+    def __init__(
+        self,
+        segments: List[Dict],
+        min_segment_seconds: float = 4.0,
+        max_segment_seconds: float = 15.0
+    ):
+        self.segments: List[Dict] = []
+        for segment in segments:
+            start, end = segment_bounds(segment)
+            text = segment_text(segment)
+            last = self.segments[-1] if self.segments else None
+
+            # Merge into the previous line while it is short and stays short
+            if last is not None and last['end'] - last['start'] < min_segment_seconds \
+                    and end - last['start'] <= max_segment_seconds:
+                last['end'] = end
+                last['text'] = f"{last['text']} {text}".strip()
+                continue
+
+            self.segments.append({'id': len(self.segments), 'start': start, 'end': end, 'text': text})
+
+    def select(self, segments: Sequence[Dict]) -> List[Dict]:
+        """Compact segments overlapping any of the given (source) segments"""
+        bounds = sorted(segment_bounds(s) for s in segments)
+        selected = []
+        i = 0
+        for compact in self.segments:
+            while i < len(bounds) and bounds[i][1] <= compact['start']:
+                i += 1
+            if i < len(bounds) and bounds[i][0] < compact['end']:
+                selected.append(compact)
+        return selected
+
+    def render(
+        self,
+        segments: Optional[Sequence[Dict]] = None,
+        focus_ranges: Optional[Sequence[Tuple[float, float]]] = None
+    ) -> str:
+        """
+        Prompt text for the given source segments (all when None).
+
+        With focus_ranges, lines outside every range are rendered as
+        stop-word-stripped "~" summaries.
+        """
+        lines_source = self.segments if segments is None else self.select(segments)
+        if not lines_source:
+            return ""
+
+        base = int(lines_source[0]['start'])
+        lines = [f"Times are whole seconds after {format_timestamp(base)}."]
+        for segment in lines_source:
+            offset = int(segment['start']) - base
+            if focus_ranges is not None and not any(
+                segment['start'] < end and segment['end'] > start for start, end in focus_ranges
+            ):
+                lines.append(f"{segment['id']} +{offset} ~ {strip_stop_words(segment['text'])}")
+            else:
+                lines.append(f"{segment['id']} +{offset} {segment['text']}")
+
+        last = lines_source[-1]
+        lines.append(f"END +{int(last['end']) - base}")
+        return "\n".join(lines)
+
+    def resolve(self, clip: Dict) -> Dict:
+        """
+        Replace start_id/end_id with absolute start_time/end_time.
+
+        Clips already carrying timestamps are returned unchanged.
+
+        Raises:
+            ValueError: unknown or reversed segment IDs
+        """
+        if 'start_id' not in clip or 'end_id' not in clip:
+            return clip
+
+        try:
+            start_id, end_id = int(clip['start_id']), int(clip['end_id'])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid segment IDs: {clip['start_id']!r}, {clip['end_id']!r}")
+        if not (0 <= start_id <= end_id < len(self.segments)):
+            raise ValueError(f"Segment IDs out of range: {start_id}-{end_id}")
+
+        resolved = {k: v for k, v in clip.items() if k not in ('start_id', 'end_id')}
+        resolved['start_time'] = format_timestamp(self.segments[start_id]['start'])
+        # Round the end up so the last word is never cut off
+        resolved['end_time'] = format_timestamp(math.ceil(self.segments[end_id]['end']))
+        resolved['segment_ids'] = [start_id, end_id]
+        return resolved
@@ -0,0 +1,281 @@
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Devanagari letters and signs, without the dandas (।, ॥ are punctuation)
+_DEVANAGARI_CLASS = "\u0900-\u0963\u0966-\u097F"
+_DEVANAGARI = re.compile(f"[{_DEVANAGARI_CLASS}]")
+# \w alone misses Devanagari vowel signs (combining marks)
+_EDGE_PUNCTUATION = re.compile(f"^([^\\w{_DEVANAGARI_CLASS}]*)(.*?)([^\\w{_DEVANAGARI_CLASS}]*)$")
+
+
+def split_word(token: str) -> Tuple[str, str, str]:
+    """(leading punctuation, word, trailing punctuation)"""
+    lead, core, trail = _EDGE_PUNCTUATION.match(token.strip()).groups()
+    return lead, core, trail
+
+
+def normalize_word(word: str) -> str:
+    """Dictionary key: NFC, nukta forms composed consistently"""
+    return unicodedata.normalize("NFC", word)
+
+
+def _is_word_pair(devanagari: str, roman: str) -> bool:
+    return bool(devanagari and roman and _DEVANAGARI.search(devanagari) and not _DEVANAGARI.search(roman))
+
+
+def _align_words(source_text: str, roman_text: str) -> Optional[List[Tuple[str, str]]]:
+    """Word pairs when the word counts line up one to one, else None"""
+    source_words = [w for w in (split_word(t)[1] for t in source_text.split()) if w]
+    roman_words = [w for w in (split_word(t)[1] for t in roman_text.split()) if w]
+    if len(source_words) != len(roman_words):
+        return None
+    return list(zip(source_words, roman_words))
+
+
+class TransliterationDictionary:
+    """
+    Persistent Devanagari -> Hinglish word dictionary (SQLite).
+
+    Word pairs from validated LLM output are first recorded as votes; a
+    spelling is promoted to a trusted entry (source 'llm') only once it
+    has been seen min_agreement times and makes up at least
+    agreement_ratio of all spellings seen for that word, so one odd LLM
+    line can't poison the dictionary. ITRANS entries (source 'itrans')
+    only fill gaps and never overwrite an LLM entry. Lookup hit/miss
+    counters are kept per process for metrics.
+
+    All methods are synchronous and take whole batches; async callers
+    run them in a thread.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        trusted_sources: Iterable[str] = ("llm",),
+        min_agreement: int = 2,
+        agreement_ratio: float = 0.75
+    ):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.trusted_sources = tuple(trusted_sources)
+        self.min_agreement = max(1, min_agreement)
+        self.agreement_ratio = agreement_ratio
+
+        # One shared connection; SQLite calls are short so a lock is enough
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS words (
+                devanagari TEXT PRIMARY KEY,
+                roman TEXT NOT NULL,
+                source TEXT NOT NULL,
+                uses INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # Spellings seen in LLM output, not yet trusted on their own
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS candidates (
+                devanagari TEXT NOT NULL,
+                roman TEXT NOT NULL,
+                seen INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (devanagari, roman)
+            )
+        """)
+        self._conn.commit()
+
+        self.counters = {
+            'word_lookups': 0,
+            'word_hits': 0,
+            'segments_local': 0,
+            'segments_llm': 0,
+            'words_learned': 0,
+        }
+
+    def lookup_many(self, words: Iterable[str]) -> Dict[str, str]:
+        """Trusted romanizations for the given words (misses are absent)"""
+        keys = list({normalize_word(w) for w in words if w})
+        if not keys:
+            return {}
+
+        found: Dict[str, str] = {}
+        placeholders = ",".join("?" * len(self.trusted_sources))
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT devanagari, roman FROM words WHERE devanagari IN ({','.join('?' * len(chunk))}) "
+                    f"AND source IN ({placeholders})",
+                    (*chunk, *self.trusted_sources)
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE words SET uses = uses + 1 WHERE devanagari = ?",
+                    [(key,) for key in found]
+                )
+                self._conn.commit()
+
+            self.counters['word_lookups'] += len(keys)
+            self.counters['word_hits'] += len(found)
+        return found
+
+    def add_many(self, pairs: Iterable[Tuple[str, str]], source: str) -> int:
+        """Store word pairs; ITRANS never replaces an LLM entry"""
+        rows = [
+            (normalize_word(dev), roman, source, time.time())
+            for dev, roman in pairs
+            if _is_word_pair(dev, roman)
+        ]
+        if not rows:
+            return 0
+
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO words (devanagari, roman, source, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(devanagari) DO UPDATE SET
+                    roman = excluded.roman,
+                    source = excluded.source,
+                    updated_at = excluded.updated_at
+                WHERE excluded.source = 'llm' OR words.source != 'llm'
+            """, rows)
+            self._conn.commit()
+            self.counters['words_learned'] += len(rows)
+        return len(rows)
+
+    def transliterate_local(self, text: str) -> Optional[str]:
+        """Romanize one segment from the dictionary alone (see transliterate_local_many)"""
+        return self.transliterate_local_many([text])[0]
+
+    def transliterate_local_many(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Romanize segments from the dictionary alone, with one lookup for
+        all of their words.
+
+        A segment maps to None when any of its Devanagari words is out of
+        vocabulary, so the caller sends the whole segment to the LLM.
+        """
+        tokenized = [[split_word(token) for token in text.split()] for text in texts]
+        known = self.lookup_many(
+            core for tokens in tokenized for _, core, _ in tokens if _DEVANAGARI.search(core)
+        )
+
+        results: List[Optional[str]] = []
+        for tokens in tokenized:
+            output: Optional[List[str]] = []
+            for lead, core, trail in tokens:
+                if _DEVANAGARI.search(core):
+                    roman = known.get(normalize_word(core))
+                    if roman is None:
+                        output = None
+                        break
+                    core = roman
+                # Dandas become full stops in Roman script
+                output.append(f"{lead}{core}{trail.replace('।', '.').replace('॥', '.')}")
+            results.append(" ".join(output) if output is not None else None)
+        return results
+
+    def learn_segment(self, source_text: str, roman_text: str, source: str = "llm") -> int:
+        """Record word pairs from one segment (see learn_segments)"""
+        return self.learn_segments([(source_text, roman_text)], source)[0]
+
+    def learn_segments(self, segments: Iterable[Tuple[str, str]], source: str = "llm") -> List[int]:
+        """
+        Record word pairs from (source_text, roman_text) segments whose word
+        counts line up one to one, then promote the spellings that reached
+        agreement.
+
+        Each segment votes once per distinct pair. Returns the number of
+        pairs recorded per segment (0 when the word counts differ).
+        """
+        recorded: List[int] = []
+        votes: Dict[Tuple[str, str], int] = {}
+        for source_text, roman_text in segments:
+            pairs = _align_words(source_text, roman_text) or []
+            unique = {(normalize_word(dev), roman) for dev, roman in pairs if _is_word_pair(dev, roman)}
+            for pair in unique:
+                votes[pair] = votes.get(pair, 0) + 1
+            recorded.append(len(unique))
+
+        if not votes:
+            return recorded
+
+        keys = list({dev for dev, _ in votes})
+        promoted: List[Tuple[str, str]] = []
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO candidates (devanagari, roman, seen) VALUES (?, ?, ?)
+                ON CONFLICT(devanagari, roman) DO UPDATE SET seen = seen + excluded.seen
+            """, [(dev, roman, count) for (dev, roman), count in votes.items()])
+
+            tallies: Dict[str, List[Tuple[str, int]]] = {}
+            current: Dict[str, Tuple[str, str]] = {}
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for dev, roman, seen in self._conn.execute(
+                    f"SELECT devanagari, roman, seen FROM candidates WHERE devanagari IN ({placeholders})",
+                    chunk
+                ):
+                    tallies.setdefault(dev, []).append((roman, seen))
+                for dev, roman, entry_source in self._conn.execute(
+                    f"SELECT devanagari, roman, source FROM words WHERE devanagari IN ({placeholders})",
+                    chunk
+                ):
+                    current[dev] = (roman, entry_source)
+            self._conn.commit()
+
+        for dev, spellings in tallies.items():
+            roman, seen = max(spellings, key=lambda spelling: spelling[1])
+            total = sum(count for _, count in spellings)
+            if seen < self.min_agreement or seen / total < self.agreement_ratio:
+                continue
+            if current.get(dev) != (roman, source):
+                promoted.append((dev, roman))
+
+        if promoted:
+            self.add_many(promoted, source)
+        return recorded
+
+    def record_segments(self, local: int, llm: int) -> None:
+        with self._lock:
+            self.counters['segments_local'] += local
+            self.counters['segments_llm'] += llm
+
+    def stats(self) -> Dict:
+        """Entry counts plus hit rates since the process started"""
+        with self._lock:
+            by_source = dict(self._conn.execute(
+                "SELECT source, COUNT(*) FROM words GROUP BY source"
+            ).fetchall())
+            # Words with LLM spellings that haven't reached agreement yet
+            pending = self._conn.execute("""
+                SELECT COUNT(DISTINCT devanagari) FROM candidates
+                WHERE devanagari NOT IN (SELECT devanagari FROM words WHERE source = 'llm')
+            """).fetchone()[0]
+            counters = dict(self.counters)
+
+        lookups = counters['word_lookups']
+        segments = counters['segments_local'] + counters['segments_llm']
+        return {
+            'entries': sum(by_source.values()),
+            'entries_by_source': by_source,
+            'entries_pending': pending,
+            **counters,
+            'word_hit_rate': round(counters['word_hits'] / lookups, 4) if lookups else 0.0,
+            'segment_local_rate': round(counters['segments_local'] / segments, 4) if segments else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -8,6 +8,7 @@ class Settings(BaseSettings):
     static_dir: Path = base_dir / "static"
     outputs_dir: Path = base_dir / "outputs"
     modules_dir: Path = base_dir / "modules"
+    cache_dir: Path = base_dir / "cache"
     
     # API Keys
     openai_api_key: Optional[str] = None
@@ -22,6 +23,28 @@ class Settings(BaseSettings):
     runpod_whisper_api_key: Optional[str] = None # Specific key for Whisper (if different)
     runpod_whisper_endpoint_id: Optional[str] = None # For Transcription (WhisperX)
     
+    # RunPod job client
+    runpod_webhook_base_url: Optional[str] = None # Public URL of this app; enables push completion
+    runpod_webhook_secret: str = "" # Sent as ?token= on the webhook URL; required for webhooks
+    runpod_poll_initial_interval: float = 1.0
+    runpod_poll_max_interval: float = 15.0
+    runpod_job_timeout: float = 600.0 # Seconds before the job is cancelled
+    
+    # TTS Cache (content-addressed, hard-linked into job folders)
+    enable_tts_cache: bool = True
+    tts_seed: int = -1 # Chatterbox seed; -1 = random take (never cached)
+    
+    # Sentence-chunked TTS
+    tts_chunk_max_chars: int = 300 # Short sentences are packed up to this length
+    tts_max_concurrency: int = 4 # Concurrent chunk requests per provider
+    tts_chunk_retries: int = 2 # Extra rounds for failed chunks only
+    tts_crossfade_seconds: float = 0.03
+    
+    # Subtitle alignment: "script" aligns the known script locally and only
+    # falls back to WhisperX below the confidence threshold; "whisperx" always transcribes
+    alignment_mode: str = "script"
+    alignment_min_confidence: float = 0.6
+    
     # Processing Settings
     subtitle_fps: int = 30
     
@@ -33,3 +56,4 @@ settings = Settings()
 
 # Ensure directories exist
 settings.outputs_dir.mkdir(exist_ok=True)
+settings.cache_dir.mkdir(exist_ok=True)
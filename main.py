@@ -1,4 +1,5 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import asyncio
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
@@ -11,8 +12,13 @@ import json
 
 from config import settings
 from utils.logging import setup_logger
+from utils.http_gateway import get_gateway
 from modules.voice_generator import VoiceGenerator
+from modules.tts_cache import TTSCache
+from modules.script_aligner import ScriptAligner
 from modules.transcriber import Transcriber
+from modules.transcript import Transcript
+from modules.runpod_client import RunPodClient, deliver_webhook, verify_webhook_token
 from modules.video_processor import VideoProcessor
 from modules.subtitle_renderer import SubtitleRenderer
 
@@ -31,6 +37,11 @@ class ScriptRequest(BaseModel):
     reference_audio_path: Optional[str] = None # For cloning
     gameplay_video_path: str # Path to background video
 
+@app.on_event("shutdown")
+async def close_outbound_gateway():
+    """Close pooled keep-alive connections"""
+    await get_gateway().aclose()
+
 @app.get("/")
 async def homepage():
     """Serve the web interface"""
@@ -44,8 +55,60 @@ async def health_check():
         "runpod_enabled": bool(settings.runpod_api_key and settings.runpod_endpoint_id)
     }
 
+def create_runpod_client(api_key: str, endpoint: str) -> RunPodClient:
+    """RunPod job client configured from settings (webhook + polling)"""
+    return RunPodClient(
+        api_key=api_key,
+        endpoint=endpoint,
+        logger=logger,
+        webhook_base_url=settings.runpod_webhook_base_url,
+        webhook_secret=settings.runpod_webhook_secret,
+        poll_initial_interval=settings.runpod_poll_initial_interval,
+        poll_max_interval=settings.runpod_poll_max_interval,
+        job_timeout=settings.runpod_job_timeout
+    )
+
+async def run_until_disconnect(http_request: Request, coro, poll_interval: float = 1.0):
+    """
+    Await coro, cancelling it if the HTTP client disconnects.
+
+    Cancellation propagates into RunPodClient.run, which cancels the
+    remote RunPod job so an abandoned request stops burning GPU time.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while not task.done():
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                break
+            if await http_request.is_disconnected():
+                logger.info("Client disconnected, cancelling job")
+                task.cancel()
+                break
+        return await task
+    finally:
+        if not task.done():
+            task.cancel()
+
+@app.post("/runpod/webhook")
+async def runpod_webhook(http_request: Request, token: Optional[str] = None):
+    """Push completion from RunPod; wakes the job waiting in RunPodClient.run"""
+    if not verify_webhook_token(token, settings.runpod_webhook_secret):
+        raise HTTPException(status_code=403, detail="Invalid webhook token")
+    
+    payload = await http_request.json()
+    delivered = deliver_webhook(payload)
+    logger.info(f"RunPod webhook for job {payload.get('id')} ({payload.get('status')}), delivered={delivered}")
+    return {"received": True, "delivered": delivered}
+
 @app.post("/process_script")
-async def process_script(request: ScriptRequest, background_tasks: BackgroundTasks):
+async def process_script(request: ScriptRequest, background_tasks: BackgroundTasks, http_request: Request):
+    try:
+        return await run_until_disconnect(http_request, _process_script(request))
+    except asyncio.CancelledError:
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
+async def _process_script(request: ScriptRequest):
     job_id = f"job_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     job_folder = settings.outputs_dir / job_id
     job_folder.mkdir(parents=True, exist_ok=True)
@@ -54,7 +117,8 @@ async def process_script(request: ScriptRequest, background_tasks: BackgroundTas
 
     try:
         # Initialize modules
-        voice_gen = VoiceGenerator(settings, job_folder)
+        tts_cache = TTSCache(settings.cache_dir / "tts") if settings.enable_tts_cache else None
+        voice_gen = VoiceGenerator(settings, job_folder, tts_cache=tts_cache)
         
         # Initialize Transcriber with RunPod Whisper Endpoint
         # Use specific Whisper key if available, otherwise fallback to default
@@ -63,22 +127,44 @@ async def process_script(request: ScriptRequest, background_tasks: BackgroundTas
         transcriber = Transcriber(
             api_key=whisper_key, 
             endpoint=settings.runpod_whisper_endpoint_id, 
-            job_folder=job_folder
+            job_folder=job_folder,
+            runpod_client=create_runpod_client(whisper_key, settings.runpod_whisper_endpoint_id)
         )
         
         # 1. Generate Audio
         logger.info("Step 1: Generating Audio...")
-        audio_path = voice_gen.generate_audio(
+        audio_path = await voice_gen.generate_audio(
             text=request.script,
             provider=request.voice_provider,
             voice_id=request.voice_id,
             reference_audio_path=Path(request.reference_audio_path) if request.reference_audio_path else None
         )
         
-        # 2. Transcribe Audio (for timestamps)
-        logger.info("Step 2: Transcribing Audio for Alignment...")
-        # Call transcriber same way as clip_app_1 - pass audio_path directly
-        transcript_data = await transcriber.transcribe(audio_path, language="en")
+        # 2. Word timestamps: align the known script locally, WhisperX as fallback
+        words = None
+        if settings.alignment_mode == "script":
+            logger.info("Step 2: Aligning script to synthesized audio...")
+            alignment = await asyncio.to_thread(ScriptAligner(job_folder).align)
+            if alignment['confidence'] >= settings.alignment_min_confidence:
+                words = alignment['words']
+            else:
+                logger.info(
+                    f"Script alignment confidence {alignment['confidence']:.2f} below "
+                    f"{settings.alignment_min_confidence}, falling back to WhisperX"
+                )
+        
+        if words is None:
+            logger.info("Step 2: Transcribing Audio for Alignment...")
+            # Call transcriber same way as clip_app_1 - pass audio_path directly
+            transcript_data = await transcriber.transcribe(audio_path, language="en")
+            
+            # The transcriber saves a columnar word store next to the transcript;
+            # flatten it to the {'text', 'start', 'end'} list SubtitleRenderer expects
+            words_store_path = job_folder / "transcript_words.npz"
+            if words_store_path.exists():
+                words = Transcript.load(words_store_path).to_words()
+            else:
+                words = Transcript.from_transcript(transcript_data).to_words()
         
         # 3. Process Video
         logger.info("Step 3: Processing Video...")
@@ -131,22 +217,6 @@ async def process_script(request: ScriptRequest, background_tasks: BackgroundTas
         logger.info("Step 4: Rendering Subtitles...")
         subtitle_renderer = SubtitleRenderer(job_folder)
         
-        # We need 'words' from transcript_data
-        # Transcriber saves them to 'transcript_words.json', but we can also extract from return value
-        # The Transcriber.transcribe returns the full WhisperX response
-        # We need to convert it to the format SubtitleRenderer expects
-        
-        # Helper to extract words
-        words = []
-        for seg in transcript_data.get('segments', []):
-            if 'words' in seg:
-                for w in seg['words']:
-                    words.append({
-                        'text': w.get('word', w.get('text', '')),
-                        'start': w['start'],
-                        'end': w['end']
-                    })
-        
         # Render
         subtitle_overlay = subtitle_renderer.render_subtitles_for_clip(
             romanized_words=words, # It expects 'text_roman' but 'text' works too if no transliteration needed
@@ -0,0 +1,233 @@
+import asyncio
+import hmac
+import random
+import time
+from typing import Dict, Optional
+
+from utils.http_gateway import get_gateway
+
+RUNPOD_API_BASE = "https://api.runpod.ai/v2"
+
+# Jobs waiting for a webhook callback, keyed by RunPod job id
+_pending_webhooks: Dict[str, asyncio.Future] = {}
+
+
+def deliver_webhook(payload: Dict) -> bool:
+    """
+    Hand a RunPod webhook payload to the job waiting on it.
+
+    Returns False when no local job is waiting (unknown or already finished).
+    """
+    job_id = payload.get("id")
+    future = _pending_webhooks.get(job_id)
+    if future is None or future.done():
+        return False
+    future.set_result(payload)
+    return True
+
+
+def verify_webhook_token(token: Optional[str], secret: str) -> bool:
+    """
+    Webhook URLs carry the shared secret as ?token=...
+
+    Without a configured secret every webhook is rejected; otherwise anyone
+    could complete a job by posting a fake result.
+    """
+    if not secret:
+        return False
+    return bool(token) and hmac.compare_digest(token, secret)
+
+
+class RunPodJobError(Exception):
+    """A RunPod job failed, was cancelled or timed out"""
+
+
+class RunPodClient:
+    """
+    Async client for RunPod serverless jobs (shared by TTS and transcription).
+
+    Jobs are submitted to /run and awaited by polling /status with
+    exponential backoff and jitter. When a webhook base URL is configured
+    (together with a webhook secret) the job also asks RunPod to POST its
+    result to /runpod/webhook, which completes the wait immediately; polling
+    keeps running at the slow end of the backoff as a safety net. If the awaiting task is cancelled (e.g. the
+    HTTP client disconnected) or times out, the remote job is cancelled too.
+    """
+
+    terminal_statuses = {"COMPLETED", "FAILED", "CANCELLED", "TIMED_OUT"}
+
+    def __init__(
+        self,
+        api_key: str,
+        endpoint: str,
+        logger,
+        webhook_base_url: Optional[str] = None,
+        webhook_secret: str = "",
+        poll_initial_interval: float = 1.0,
+        poll_max_interval: float = 15.0,
+        poll_backoff: float = 1.6,
+        poll_jitter: float = 0.25,
+        job_timeout: float = 600.0,
+        api_base: str = RUNPOD_API_BASE
+    ):
+        self.api_key = api_key
+        self.endpoint_url = self._resolve_endpoint(endpoint, api_base)
+        self.logger = logger
+        self.webhook_base_url = webhook_base_url.rstrip('/') if webhook_base_url else None
+        self.webhook_secret = webhook_secret
+        self.poll_initial_interval = poll_initial_interval
+        self.poll_max_interval = poll_max_interval
+        self.poll_backoff = poll_backoff
+        self.poll_jitter = poll_jitter
+        self.job_timeout = job_timeout
+
+        if self.webhook_base_url and not self.webhook_secret:
+            self.logger.warning(
+                "RunPod webhook base URL set without a webhook secret; "
+                "webhooks disabled, polling only"
+            )
+
+    @staticmethod
+    def _resolve_endpoint(endpoint: str, api_base: str) -> str:
+        """Accept a bare endpoint id or a full URL (with or without /run, /runsync)"""
+        if not endpoint:
+            raise ValueError("RunPod endpoint not configured")
+        if not endpoint.startswith('http'):
+            return f"{api_base.rstrip('/')}/{endpoint}"
+
+        url = endpoint.rstrip('/')
+        for suffix in ('/runsync', '/run'):
+            if url.endswith(suffix):
+                url = url[:-len(suffix)]
+                break
+        return url
+
+    @property
+    def headers(self) -> Dict:
+        return {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+
+    @property
+    def webhook_url(self) -> Optional[str]:
+        """Only registered when a secret is set (unauthenticated webhooks are refused)"""
+        if not self.webhook_base_url or not self.webhook_secret:
+            return None
+        return f"{self.webhook_base_url}/runpod/webhook?token={self.webhook_secret}"
+
+    async def submit(self, input_payload: Dict) -> str:
+        """Queue a job on /run and return its id"""
+        payload = {'input': input_payload}
+        if self.webhook_url:
+            payload['webhook'] = self.webhook_url
+
+        response = await get_gateway().post(
+            f"{self.endpoint_url}/run",
+            headers=self.headers,
+            json=payload
+        )
+        response.raise_for_status()
+        result = response.json()
+
+        job_id = result.get('id')
+        if not job_id:
+            raise RunPodJobError(f"Unexpected /run response: {result}")
+
+        self.logger.info(f"RunPod job submitted: {job_id} ({result.get('status', 'IN_QUEUE')})")
+        return job_id
+
+    async def status(self, job_id: str) -> Dict:
+        response = await get_gateway().get(
+            f"{self.endpoint_url}/status/{job_id}",
+            headers=self.headers
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def cancel(self, job_id: str) -> None:
+        """Best-effort cancel; never raises"""
+        try:
+            response = await get_gateway().post(
+                f"{self.endpoint_url}/cancel/{job_id}",
+                headers=self.headers
+            )
+            response.raise_for_status()
+            self.logger.info(f"RunPod job {job_id} cancelled")
+        except Exception as e:
+            self.logger.warning(f"Could not cancel RunPod job {job_id}: {e}")
+
+    def _next_interval(self, interval: float) -> float:
+        """Grow the poll interval and add +/- jitter so workers don't sync up"""
+        interval = min(interval * self.poll_backoff, self.poll_max_interval)
+        return interval * random.uniform(1 - self.poll_jitter, 1 + self.poll_jitter)
+
+    async def _wait(self, job_id: str, webhook: Optional[asyncio.Future]) -> Dict:
+        """Poll until the job reaches a terminal status (or the webhook fires)"""
+        interval = self.poll_initial_interval
+        last_status = None
+
+        while True:
+            if webhook is not None:
+                done, _ = await asyncio.wait({webhook}, timeout=interval)
+                if done:
+                    self.logger.info(f"RunPod job {job_id} completed via webhook")
+                    return webhook.result()
+            else:
+                await asyncio.sleep(interval)
+
+            result = await self.status(job_id)
+            status = result.get('status')
+            if status != last_status:
+                self.logger.info(f"RunPod job {job_id} status: {status}")
+                last_status = status
+
+            if status in self.terminal_statuses:
+                return result
+
+            interval = self._next_interval(interval)
+
+    async def run(self, input_payload: Dict, timeout: Optional[float] = None) -> Dict:
+        """
+        Submit a job and wait for it to finish.
+
+        Returns:
+            The final job status payload (with 'output' on success)
+
+        Raises:
+            RunPodJobError: job failed, was cancelled remotely or timed out
+        """
+        timeout = timeout or self.job_timeout
+        started = time.monotonic()
+
+        job_id = await self.submit(input_payload)
+
+        webhook = None
+        if self.webhook_url:
+            webhook = asyncio.get_running_loop().create_future()
+            _pending_webhooks[job_id] = webhook
+
+        try:
+            result = await asyncio.wait_for(
+                self._wait(job_id, webhook),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            await self.cancel(job_id)
+            raise RunPodJobError(f"RunPod job {job_id} did not complete within {timeout:.0f}s")
+        except asyncio.CancelledError:
+            # Caller went away (client disconnect / shutdown); free the worker
+            self.logger.info(f"Request cancelled, cancelling RunPod job {job_id}")
+            await asyncio.shield(self.cancel(job_id))
+            raise
+        finally:
+            _pending_webhooks.pop(job_id, None)
+
+        status = result.get('status')
+        elapsed = time.monotonic() - started
+        if status != "COMPLETED":
+            error = result.get('error', 'Unknown error')
+            raise RunPodJobError(f"RunPod job {job_id} {status}: {error}")
+
+        self.logger.info(f"RunPod job {job_id} completed in {elapsed:.1f}s")
+        return result
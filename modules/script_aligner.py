@@ -0,0 +1,247 @@
+import json
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logging import setup_logger
+
+
+def alignment_path_for(audio_path: Path) -> Path:
+    """Sidecar file holding provider character timestamps for an audio file"""
+    return audio_path.with_suffix(".alignment.json")
+
+
+def estimate_syllables(word: str) -> int:
+    """
+    Rough syllable count used as a duration weight.
+
+    Latin script: vowel groups. Devanagari: consonants plus independent
+    vowels (each carries one vowel sound). Anything else: length / 3.
+    """
+    latin = re.findall(r"[aeiouy]+", word.lower())
+    if latin:
+        return len(latin)
+
+    devanagari = re.findall(r"[अ-औक-हक़-य़]", word)
+    if devanagari:
+        return len(devanagari)
+
+    letters = re.sub(r"\W", "", word)
+    return max(1, len(letters) // 3)
+
+
+def word_weight(word: str) -> float:
+    """Relative spoken duration of a word, including the pause after it"""
+    weight = float(estimate_syllables(word))
+    if re.search(r"[.!?।]$", word):
+        weight += 1.0  # Sentence-final pause
+    elif re.search(r"[,;:]$", word):
+        weight += 0.5
+    return weight
+
+
+class ScriptAligner:
+    """
+    Word timestamps for synthesized speech without a transcription round trip.
+
+    We already know the exact script in the TTS pipeline, so only timing
+    is unknown. Per synthesized chunk (tts_chunks.json):
+
+    1. Provider timestamps (ElevenLabs character alignment sidecar) are
+       used as-is when present.
+    2. Otherwise words are spread over the chunk's speech span in
+       proportion to estimated syllables, then snapped to energy-envelope
+       onsets (pauses between words) computed with NumPy.
+
+    Each chunk gets a confidence; callers fall back to WhisperX when the
+    overall confidence is low.
+    """
+
+    sample_rate = 16000
+    frame_ms = 10
+    onset_snap_seconds = 0.15
+    min_words_per_second = 1.2
+    max_words_per_second = 5.5
+
+    def __init__(self, job_folder: Path):
+        self.job_folder = job_folder
+        self.logger = setup_logger("ScriptAligner", job_folder / "processing.log")
+
+    def align(self, chunk_timings: Optional[List[Dict]] = None) -> Dict:
+        """
+        Align every TTS chunk.
+
+        Returns:
+            {'words': [{'text', 'start', 'end'}], 'confidence': float,
+             'chunks': [{'index', 'method', 'confidence'}]}
+        """
+        if chunk_timings is None:
+            with open(self.job_folder / "tts_chunks.json", 'r', encoding='utf-8') as f:
+                chunk_timings = json.load(f)
+
+        words: List[Dict] = []
+        chunk_reports = []
+        weighted_confidence = 0.0
+        total_words = 0
+
+        for chunk in chunk_timings:
+            audio_path = self.job_folder / chunk['file']
+            chunk_words, method, confidence = self._align_chunk(chunk['text'], audio_path)
+
+            for word in chunk_words:
+                words.append({
+                    'text': word['text'],
+                    'start': round(chunk['start'] + word['start'], 3),
+                    'end': round(chunk['start'] + word['end'], 3)
+                })
+
+            chunk_reports.append({'index': chunk['index'], 'method': method, 'confidence': round(confidence, 3)})
+            weighted_confidence += confidence * len(chunk_words)
+            total_words += len(chunk_words)
+
+        confidence = weighted_confidence / total_words if total_words else 0.0
+        result = {'words': words, 'confidence': round(confidence, 3), 'chunks': chunk_reports}
+
+        output_path = self.job_folder / "script_alignment.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+        self.logger.info(f"Aligned {len(words)} words from script (confidence {confidence:.2f})")
+        return result
+
+    def _align_chunk(self, text: str, audio_path: Path) -> Tuple[List[Dict], str, float]:
+        """Words with chunk-relative times, the method used and its confidence"""
+        sidecar = alignment_path_for(audio_path)
+        if sidecar.exists():
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                words = self._words_from_characters(json.load(f))
+            if words:
+                return words, "provider", 1.0
+
+        words, confidence = self._estimate_words(text, audio_path)
+        return words, "estimated", confidence
+
+    @staticmethod
+    def _words_from_characters(alignment: Dict) -> List[Dict]:
+        """Group provider character timings into whitespace-separated words"""
+        characters = alignment.get('characters', [])
+        starts = alignment.get('character_start_times_seconds', [])
+        ends = alignment.get('character_end_times_seconds', [])
+
+        words = []
+        current = None
+        for char, start, end in zip(characters, starts, ends):
+            if char.isspace():
+                if current:
+                    words.append(current)
+                current = None
+                continue
+            if current is None:
+                current = {'text': char, 'start': start, 'end': end}
+            else:
+                current['text'] += char
+                current['end'] = end
+        if current:
+            words.append(current)
+
+        return words
+
+    def _energy_envelope(self, audio_path: Path) -> np.ndarray:
+        """Per-frame energy in dBFS of the decoded mono audio"""
+        cmd = [
+            'ffmpeg', '-v', 'error', '-i', str(audio_path),
+            '-f', 's16le', '-ac', '1', '-ar', str(self.sample_rate), '-'
+        ]
+        pcm = subprocess.run(cmd, capture_output=True, check=True, stdin=subprocess.DEVNULL).stdout
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+        frame = self.sample_rate * self.frame_ms // 1000
+        usable = len(samples) // frame * frame
+        if usable == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        frames = samples[:usable].reshape(-1, frame)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        return 20 * np.log10(np.maximum(rms, 1e-6))
+
+    def _speech_onsets(self, energies: np.ndarray) -> Tuple[float, float, np.ndarray]:
+        """
+        Speech span and onset times (seconds) from the energy envelope.
+
+        Onsets are the starts of voiced runs that follow at least 40 ms of
+        low energy, i.e. audible gaps between words or phrases.
+        """
+        frame_seconds = self.frame_ms / 1000
+        threshold = max(float(np.percentile(energies, 10)) + 12.0, -50.0)
+
+        # Smooth over 30 ms so plosives don't split a word
+        smoothed = np.convolve(energies, np.ones(3) / 3, mode='same')
+        voiced = smoothed > threshold
+        if not voiced.any():
+            return 0.0, len(energies) * frame_seconds, np.zeros(0)
+
+        voiced_frames = np.flatnonzero(voiced)
+        speech_start = voiced_frames[0] * frame_seconds
+        speech_end = (voiced_frames[-1] + 1) * frame_seconds
+
+        edges = np.diff(np.concatenate([[False], voiced]).astype(np.int8))
+        rises = np.flatnonzero(edges == 1)
+        falls = np.flatnonzero(edges == -1)
+
+        onsets = []
+        for rise in rises[1:]:
+            previous_falls = falls[falls < rise]
+            if len(previous_falls) and rise - previous_falls[-1] >= 4:
+                onsets.append(rise * frame_seconds)
+
+        return speech_start, speech_end, np.array(onsets)
+
+    def _estimate_words(self, text: str, audio_path: Path) -> Tuple[List[Dict], float]:
+        """Syllable-weighted word timing refined by energy onsets"""
+        tokens = text.split()
+        if not tokens:
+            return [], 0.0
+
+        energies = self._energy_envelope(audio_path)
+        if len(energies) == 0:
+            return [], 0.0
+
+        speech_start, speech_end, onsets = self._speech_onsets(energies)
+        span = max(speech_end - speech_start, 1e-3)
+
+        weights = np.array([word_weight(token) for token in tokens])
+        boundaries = speech_start + np.concatenate([[0.0], np.cumsum(weights)]) / weights.sum() * span
+        starts = boundaries[:-1].copy()
+
+        # Snap each word start (after the first) to a nearby onset, staying
+        # strictly between the previous (snapped) start and the next word's
+        # estimated start so the order never flips
+        matched = 0
+        for i in range(1, len(starts)):
+            if len(onsets) == 0:
+                break
+            nearest = onsets[np.argmin(np.abs(onsets - starts[i]))]
+            if abs(nearest - starts[i]) <= self.onset_snap_seconds \
+                    and starts[i - 1] < nearest < boundaries[i + 1]:
+                starts[i] = nearest
+                matched += 1
+
+        # Snapping keeps starts ordered; the clamp only guards the last word
+        # against a speech end detected before its start
+        ends = np.maximum(np.append(starts[1:], speech_end), starts)
+        words = [
+            {'text': token, 'start': round(float(start), 3), 'end': round(float(end), 3)}
+            for token, start, end in zip(tokens, starts, ends)
+        ]
+
+        # Confidence: share of detected pauses that landed on a word boundary,
+        # and whether the implied speaking rate is plausible
+        onset_score = matched / len(onsets) if len(onsets) else 0.7
+        rate = len(tokens) / span
+        rate_score = 1.0 if self.min_words_per_second <= rate <= self.max_words_per_second else 0.3
+        confidence = 0.5 * min(onset_score, 1.0) + 0.5 * rate_score
+
+        return words, confidence
@@ -1,7 +1,9 @@
-import httpx
 import json
 from pathlib import Path
 from typing import Dict, List, Optional
+from modules.runpod_client import RunPodClient
+from modules.transcript import Transcript
+from utils.http_gateway import get_gateway
 from utils.logging import setup_logger
 
 
@@ -13,46 +15,46 @@ async def upload_audio_to_tmpfiles(audio_path: Path, logger) -> str:
     """
     logger.info("Uploading audio to tmpfiles.org for public access...")
     
-    async with httpx.AsyncClient(timeout=300.0, follow_redirects=True) as client:
-        with open(audio_path, 'rb') as f:
-            files = {'file': (audio_path.name, f, 'audio/wav')}
-            
-            # Upload to tmpfiles.org
-            response = await client.post(
-                'https://tmpfiles.org/api/v1/upload',
-                files=files
-            )
-            
-            logger.info(f"tmpfiles.org response status: {response.status_code}")
-            
-            response.raise_for_status()
-            
-            try:
-                result = response.json()
-            except Exception as e:
-                logger.error(f"Failed to parse JSON: {e}")
-                raise Exception(f"tmpfiles.org returned invalid JSON: {response.text[:200]}")
-                
-            if result.get('status') != 'success':
-                raise Exception(f"tmpfiles.org upload failed: {result}")
-                
-            # tmpfiles.org returns URL like "https://tmpfiles.org/1234/file.wav"
-            # We need to convert it to direct download URL: "https://tmpfiles.org/dl/1234/file.wav"
-            url = result['data']['url']
-            
-            # Convert to direct download URL
-            if 'tmpfiles.org/' in url:
-                # Change https://tmpfiles.org/ABC/file.wav to https://tmpfiles.org/dl/ABC/file.wav
-                url = url.replace('tmpfiles.org/', 'tmpfiles.org/dl/')
-                
-            logger.info(f"Audio uploaded successfully to: {url}")
-            return url
+    # Read into memory so the gateway can resend the body on retry
+    files = {'file': (audio_path.name, audio_path.read_bytes(), 'audio/wav')}
+    
+    # Upload to tmpfiles.org
+    response = await get_gateway().post(
+        'https://tmpfiles.org/api/v1/upload',
+        files=files,
+        timeout=300.0
+    )
+    
+    logger.info(f"tmpfiles.org response status: {response.status_code}")
+    
+    response.raise_for_status()
+    
+    try:
+        result = response.json()
+    except Exception as e:
+        logger.error(f"Failed to parse JSON: {e}")
+        raise Exception(f"tmpfiles.org returned invalid JSON: {response.text[:200]}")
+        
+    if result.get('status') != 'success':
+        raise Exception(f"tmpfiles.org upload failed: {result}")
+        
+    # tmpfiles.org returns URL like "https://tmpfiles.org/1234/file.wav"
+    # We need to convert it to direct download URL: "https://tmpfiles.org/dl/1234/file.wav"
+    url = result['data']['url']
+    
+    # Convert to direct download URL
+    if 'tmpfiles.org/' in url:
+        # Change https://tmpfiles.org/ABC/file.wav to https://tmpfiles.org/dl/ABC/file.wav
+        url = url.replace('tmpfiles.org/', 'tmpfiles.org/dl/')
+        
+    logger.info(f"Audio uploaded successfully to: {url}")
+    return url
 
 
 class Transcriber:
     """Handles audio transcription using WhisperX on RunPod"""
 
-    def __init__(self, api_key: str, endpoint: str, job_folder: Path):
+    def __init__(self, api_key: str, endpoint: str, job_folder: Path, runpod_client: Optional[RunPodClient] = None):
         self.api_key = api_key
         self.endpoint = endpoint
         self.job_folder = job_folder
@@ -60,6 +62,7 @@ class Transcriber:
             "Transcriber",
             job_folder / "processing.log"
         )
+        self.runpod = runpod_client or RunPodClient(api_key, endpoint, self.logger)
 
     async def transcribe(self, audio_path: Path, audio_url: str = None, initial_prompt: Optional[str] = None, language: str = None) -> Dict:
         """
@@ -67,93 +70,60 @@ class Transcriber:
         """
         self.logger.info(f"Sending audio to WhisperX: {audio_path.name}")
 
-        async with httpx.AsyncClient(timeout=600.0) as client:
-            try:
-                # Send transcription request using /runsync
-                self.logger.info("Starting transcription job...")
-
-                # Build full RunPod URL
-                # If endpoint is just an ID, prepend the base URL
-                if not self.endpoint.startswith('http'):
-                    endpoint = f"https://api.runpod.ai/v2/{self.endpoint}/runsync"
-                else:
-                    # Make endpoint use /runsync for synchronous processing
-                    endpoint = self.endpoint
-                    if not endpoint.endswith('/runsync'):
-                        if endpoint.endswith('/run'):
-                            endpoint = endpoint[:-4] + '/runsync'
-                        else:
-                            endpoint = endpoint.rstrip('/') + '/runsync'
-
-                headers = {
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json'
-                }
-
-                # Upload audio to tmpfiles.org if no URL provided
-                if not audio_url:
-                    audio_url = await upload_audio_to_tmpfiles(audio_path, self.logger)
-
-                self.logger.info(f"Using audio URL: {audio_url}")
-
-                # Build payload according to kodxana/whisperx-worker spec
-                input_payload = {
-                    'audio_file': audio_url,
-                    'batch_size': 64,
-                    'align_output': True,
-                    'diarization': False  # Disabled - requires Hugging Face auth
-                }
-                
-                # Only add language if specified (otherwise auto-detect)
-                if language:
-                    input_payload['language'] = language
-                    self.logger.info(f"Language forced to: {language}")
-                else:
-                    self.logger.info("Language set to auto-detect")
-
-                payload = {
-                    'input': input_payload
-                }
-                if initial_prompt:
-                    payload['input']['initial_prompt'] = initial_prompt
-
-                self.logger.info(f"Sending request to: {endpoint}")
-
-                response = await client.post(
-                    endpoint,
-                    headers=headers,
-                    json=payload
-                )
-
-                # Log response for debugging
-                self.logger.info(f"Response status: {response.status_code}")
-
-                response.raise_for_status()
-                result = response.json()
-
-                self.logger.info("Transcription received from WhisperX")
-
-                # Parse WhisperX response
-                transcript_data = self._parse_whisperx_response(result)
-
-                # Save transcript as JSON
-                transcript_path = self.job_folder / "transcript.json"
-                with open(transcript_path, 'w', encoding='utf-8') as f:
-                    json.dump(transcript_data, f, ensure_ascii=False, indent=2)
-
-                # Save as SRT
-                srt_path = self.job_folder / "transcript.srt"
-                self._save_as_srt(transcript_data['segments'], srt_path)
-
-                # Save word-level timestamps for subtitle generation
-                self.save_word_timestamps(transcript_data)
-
-                self.logger.info(f"Transcript saved to {transcript_path}")
-                return transcript_data
-
-            except Exception as e:
-                self.logger.error(f"Transcription error: {e}")
-                raise
+        try:
+            self.logger.info("Starting transcription job...")
+
+            # Upload audio to tmpfiles.org if no URL provided
+            if not audio_url:
+                audio_url = await upload_audio_to_tmpfiles(audio_path, self.logger)
+
+            self.logger.info(f"Using audio URL: {audio_url}")
+
+            # Build payload according to kodxana/whisperx-worker spec
+            input_payload = {
+                'audio_file': audio_url,
+                'batch_size': 64,
+                'align_output': True,
+                'diarization': False  # Disabled - requires Hugging Face auth
+            }
+            
+            # Only add language if specified (otherwise auto-detect)
+            if language:
+                input_payload['language'] = language
+                self.logger.info(f"Language forced to: {language}")
+            else:
+                self.logger.info("Language set to auto-detect")
+
+            if initial_prompt:
+                input_payload['initial_prompt'] = initial_prompt
+
+            # Queued job + backoff polling instead of holding /runsync open
+            self.logger.info(f"Sending request to: {self.runpod.endpoint_url}")
+            result = await self.runpod.run(input_payload)
+
+            self.logger.info("Transcription received from WhisperX")
+
+            # Parse WhisperX response
+            transcript_data = self._parse_whisperx_response(result)
+
+            # Save transcript as JSON
+            transcript_path = self.job_folder / "transcript.json"
+            with open(transcript_path, 'w', encoding='utf-8') as f:
+                json.dump(transcript_data, f, ensure_ascii=False, indent=2)
+
+            # Save as SRT
+            srt_path = self.job_folder / "transcript.srt"
+            self._save_as_srt(transcript_data['segments'], srt_path)
+
+            # Save word-level timestamps for subtitle generation
+            self.save_word_timestamps(transcript_data)
+
+            self.logger.info(f"Transcript saved to {transcript_path}")
+            return transcript_data
+
+        except Exception as e:
+            self.logger.error(f"Transcription error: {e}")
+            raise
 
     def _parse_whisperx_response(self, response: Dict) -> Dict:
         """
@@ -230,10 +200,12 @@ class Transcriber:
                     })
                     word_count += 1
 
-        # Save word-level timestamps
+        # Save word-level timestamps (compact JSON for inspection; later
+        # stages load the columnar .npz store instead of re-parsing it)
         words_path = self.job_folder / "transcript_words.json"
         with open(words_path, 'w', encoding='utf-8') as f:
-            json.dump(word_data, f, ensure_ascii=False, indent=2)
+            json.dump(word_data, f, ensure_ascii=False, separators=(',', ':'))
+        Transcript.from_transcript(transcript_data).save(self.job_folder / "transcript_words.npz")
 
         self.logger.info(f"Saved {word_count} word-level timestamps to {words_path}")
 
@@ -0,0 +1,132 @@
+import base64
+import json
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import quote
+
+import httpx
+
+from utils.http_gateway import get_gateway
+
+
+class StreamingTTSAdapter(ABC):
+    """
+    Async text-to-speech provider that yields audio bytes as they arrive.
+
+    alignment, when given, is filled with provider character timestamps
+    ({'characters', 'character_start_times_seconds',
+    'character_end_times_seconds'}) for providers that return them.
+
+    Requests go through the shared outbound gateway's stream(), so TTS
+    calls share its per-provider rate limits, concurrency caps and circuit
+    breakers with every other outbound call.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def stream(
+        self,
+        text: str,
+        voice_id: Optional[str],
+        alignment: Optional[Dict] = None
+    ) -> AsyncIterator[bytes]:
+        """Synthesize text, yielding audio bytes as they arrive"""
+
+    @staticmethod
+    async def _raise_for_status(response: httpx.Response) -> None:
+        """raise_for_status with the error body included (streams aren't read yet)"""
+        if response.is_error:
+            body = (await response.aread()).decode(errors='ignore')
+            raise httpx.HTTPStatusError(
+                f"{response.status_code} from {response.url}: {body[:300]}",
+                request=response.request,
+                response=response
+            )
+
+
+class OpenAITTSAdapter(StreamingTTSAdapter):
+    """OpenAI /v1/audio/speech, body streamed as it is synthesized"""
+
+    name = "openai"
+    url = "https://api.openai.com/v1/audio/speech"
+    chunk_size = 16 * 1024
+
+    def __init__(self, api_key: str, model: str):
+        self.api_key = api_key
+        self.model = model
+
+    async def stream(
+        self,
+        text: str,
+        voice_id: Optional[str],
+        alignment: Optional[Dict] = None
+    ) -> AsyncIterator[bytes]:
+        async with get_gateway().stream(
+            'POST',
+            self.url,
+            headers={'Authorization': f'Bearer {self.api_key}'},
+            json={
+                'model': self.model,
+                'voice': voice_id or "alloy",
+                'input': text,
+                'response_format': "mp3"
+            },
+            timeout=120.0
+        ) as response:
+            await self._raise_for_status(response)
+            async for chunk in response.aiter_bytes(self.chunk_size):
+                yield chunk
+
+
+class ElevenLabsTTSAdapter(StreamingTTSAdapter):
+    """
+    ElevenLabs stream/with-timestamps: newline-delimited JSON chunks, each
+    with base64 audio and the character alignment for that audio
+    """
+
+    name = "elevenlabs"
+    base_url = "https://api.elevenlabs.io/v1/text-to-speech"
+    default_voice_id = "JBFqnCBsd6RMkjVDRZzb"  # George - Natural and clear
+
+    def __init__(self, api_key: str, model: str, output_format: str):
+        self.api_key = api_key
+        self.model = model
+        self.output_format = output_format
+
+    async def stream(
+        self,
+        text: str,
+        voice_id: Optional[str],
+        alignment: Optional[Dict] = None
+    ) -> AsyncIterator[bytes]:
+        if alignment is not None:
+            alignment.update({
+                'characters': [],
+                'character_start_times_seconds': [],
+                'character_end_times_seconds': []
+            })
+
+        voice = quote(voice_id or self.default_voice_id, safe='')
+        async with get_gateway().stream(
+            'POST',
+            f"{self.base_url}/{voice}/stream/with-timestamps",
+            params={'output_format': self.output_format},
+            headers={'xi-api-key': self.api_key},
+            json={'text': text, 'model_id': self.model},
+            timeout=120.0
+        ) as response:
+            await self._raise_for_status(response)
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+
+                chunk_alignment = chunk.get('alignment')
+                if alignment is not None and chunk_alignment:
+                    # Chunk timings are relative to the start of the request
+                    for key in alignment:
+                        alignment[key].extend(chunk_alignment.get(key, []))
+
+                if chunk.get('audio_base64'):
+                    yield base64.b64decode(chunk['audio_base64'])
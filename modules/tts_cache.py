@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def normalize_tts_text(text: str) -> str:
+    """Canonical form of a script for cache keys (NFC, collapsed whitespace)"""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def link_or_copy(src: Path, dest: Path) -> None:
+    """Hard link src to dest (no extra disk use), copying across filesystems"""
+    if dest.exists():
+        dest.unlink()
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized audio.
+
+    Entries are keyed by provider, voice, model, normalized text and the
+    synthesis parameters, and stored as <cache_dir>/<key[:2]>/<key><suffix>.
+    Hits are hard-linked into the job folder. Sidecar files next to the
+    audio (e.g. provider word alignment) are cached along with it.
+    """
+
+    sidecar_suffixes = (".alignment.json",)
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(provider: str, voice_id: Optional[str], model: str, text: str, params: Dict) -> str:
+        encoded = json.dumps({
+            'provider': provider,
+            'voice_id': voice_id,
+            'model': model,
+            'text': normalize_tts_text(text),
+            'params': params
+        }, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    def fetch(self, key: str, output_path: Path) -> bool:
+        """Link a cached entry to output_path; False on a miss"""
+        entry = self._entry_path(key, output_path.suffix)
+        if not entry.exists():
+            return False
+        link_or_copy(entry, output_path)
+
+        for suffix in self.sidecar_suffixes:
+            sidecar = entry.with_suffix(suffix)
+            if sidecar.exists():
+                link_or_copy(sidecar, output_path.with_suffix(suffix))
+        return True
+
+    def store(self, key: str, audio_path: Path) -> Path:
+        """Add a freshly synthesized file to the cache"""
+        entry = self._entry_path(key, audio_path.suffix)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        # Sidecars first: an entry is only visible once its audio is in place
+        for suffix in self.sidecar_suffixes:
+            sidecar = audio_path.with_suffix(suffix)
+            if sidecar.exists():
+                self._atomic_link(sidecar, entry.with_suffix(suffix))
+
+        self._atomic_link(audio_path, entry)
+        return entry
+
+    @staticmethod
+    def _atomic_link(src: Path, dest: Path) -> None:
+        """Link under a temp name then rename, so readers never see a partial file"""
+        tmp_path = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+        link_or_copy(src, tmp_path)
+        os.replace(tmp_path, dest)
@@ -1,31 +1,86 @@
-import requests
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import subprocess
 from pathlib import Path
-from typing import Optional, Dict
-from openai import OpenAI
-from elevenlabs.client import ElevenLabs
+from typing import AsyncIterator, Optional, Dict, List
+
+import httpx
+
+from modules.runpod_client import RunPodClient, RunPodJobError
+from modules.script_aligner import alignment_path_for
+from modules.tts_adapters import ElevenLabsTTSAdapter, OpenAITTSAdapter, StreamingTTSAdapter
+from modules.tts_cache import TTSCache
+from utils.http_gateway import get_gateway
 from utils.logging import setup_logger
 
+def split_sentences(text: str, max_chars: int = 300) -> List[str]:
+    """
+    Split a script at sentence boundaries (. ! ? and the Devanagari danda).
+    
+    Consecutive short sentences are packed together up to max_chars so
+    chunks aren't too short to sound natural; a single longer sentence
+    stays whole.
+    """
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?\u0964])\s+', text.strip()) if s.strip()]
+    
+    chunks: List[str] = []
+    for sentence in sentences:
+        if chunks and len(chunks[-1]) + 1 + len(sentence) <= max_chars:
+            chunks[-1] = f"{chunks[-1]} {sentence}"
+        else:
+            chunks.append(sentence)
+    return chunks
+
+
+def probe_duration(path: Path) -> float:
+    """Audio duration in seconds (ffprobe)"""
+    cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1', str(path)]
+    return float(subprocess.check_output(cmd).strip())
+
+
+def file_sha256(path: Path, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 class VoiceGenerator:
     """
     Handles Text-to-Speech generation using OpenAI or RunPod (Chatterbox)
     """
     
-    def __init__(self, config, job_folder: Path):
+    # Chunk synthesis slots per provider, shared across jobs
+    _provider_semaphores: Dict[str, asyncio.Semaphore] = {}
+    
+    openai_model = "tts-1"
+    elevenlabs_model = "eleven_multilingual_v2"
+    elevenlabs_output_format = "mp3_44100_128"
+    chatterbox_model = "chatterbox"
+    
+    def __init__(self, config, job_folder: Path, tts_cache: Optional[TTSCache] = None):
         self.config = config
         self.job_folder = job_folder
         self.logger = setup_logger("VoiceGenerator", job_folder / "processing.log")
+        self.tts_cache = tts_cache
         
-        # Initialize OpenAI client if key is present
-        self.openai_client = None
+        # Async streaming adapters for providers whose key is present
+        self.adapters: Dict[str, StreamingTTSAdapter] = {}
         if config.openai_api_key:
-            self.openai_client = OpenAI(api_key=config.openai_api_key)
-        
-        # Initialize ElevenLabs client if key is present
-        self.elevenlabs_client = None
+            self.adapters["openai"] = OpenAITTSAdapter(config.openai_api_key, self.openai_model)
         if config.elevenlabs_api_key:
-            self.elevenlabs_client = ElevenLabs(api_key=config.elevenlabs_api_key)
+            self.adapters["elevenlabs"] = ElevenLabsTTSAdapter(
+                config.elevenlabs_api_key,
+                self.elevenlabs_model,
+                self.elevenlabs_output_format
+            )
             
-    def generate_audio(
+    async def generate_audio(
         self, 
         text: str, 
         provider: str = "openai", 
@@ -47,87 +102,272 @@ class VoiceGenerator:
         self.logger.info(f"Generating audio using {provider} with voice {voice_id}")
         
         output_path = self.job_folder / "generated_audio.mp3"
+        chunks = split_sentences(text, self.config.tts_chunk_max_chars)
+        
+        if len(chunks) <= 1:
+            await self._synthesize_cached(text, provider, voice_id, reference_audio_path, output_path)
+            chunk_paths = [output_path]
+        else:
+            chunk_paths = await self._synthesize_chunks(chunks, provider, voice_id, reference_audio_path)
+            await self._concatenate(chunk_paths, output_path)
+        
+        await self._save_chunk_timings(chunks or [text], chunk_paths)
+        return output_path
+    
+    async def _synthesize_cached(
+        self,
+        text: str,
+        provider: str,
+        voice_id: Optional[str],
+        reference_audio_path: Optional[Path],
+        output_path: Path
+    ) -> Path:
+        """Synthesize one piece of text, going through the TTS cache"""
+        # Hashing a cloned-voice reference clip is file I/O; keep it off the loop
+        cache_key = await asyncio.to_thread(
+            self._tts_cache_key, text, provider, voice_id, reference_audio_path
+        )
+        if cache_key and self.tts_cache.fetch(cache_key, output_path):
+            self.logger.info(f"TTS cache hit ({cache_key[:12]}), skipping synthesis")
+            return output_path
+        
+        output_path = await self._synthesize(text, provider, voice_id, reference_audio_path, output_path)
+        
+        if cache_key:
+            self.tts_cache.store(cache_key, output_path)
+            self.logger.info(f"TTS audio cached as {cache_key[:12]}")
+        
+        return output_path
+    
+    def _provider_semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Concurrency limit per provider, shared by every job in the process"""
+        if provider not in self._provider_semaphores:
+            self._provider_semaphores[provider] = asyncio.Semaphore(self.config.tts_max_concurrency)
+        return self._provider_semaphores[provider]
+    
+    async def _synthesize_chunks(
+        self,
+        chunks: List[str],
+        provider: str,
+        voice_id: Optional[str],
+        reference_audio_path: Optional[Path]
+    ) -> List[Path]:
+        """
+        Synthesize sentence chunks concurrently.
+        
+        Failed chunks are retried on their own (up to tts_chunk_retries
+        rounds), so one bad request doesn't throw away the rest.
+        """
+        chunk_dir = self.job_folder / "tts_chunks"
+        chunk_dir.mkdir(exist_ok=True)
+        chunk_paths = [chunk_dir / f"chunk_{i:03d}.mp3" for i in range(len(chunks))]
+        semaphore = self._provider_semaphore(provider)
+        
+        self.logger.info(f"Synthesizing {len(chunks)} sentence chunks concurrently")
+        
+        async def synthesize(index: int) -> Path:
+            async with semaphore:
+                return await self._synthesize_cached(
+                    chunks[index], provider, voice_id, reference_audio_path, chunk_paths[index]
+                )
+        
+        pending = list(range(len(chunks)))
+        for attempt in range(self.config.tts_chunk_retries + 1):
+            results = await asyncio.gather(
+                *(synthesize(i) for i in pending),
+                return_exceptions=True
+            )
+            failed = [i for i, result in zip(pending, results) if isinstance(result, Exception)]
+            for i, result in zip(pending, results):
+                if isinstance(result, Exception):
+                    self.logger.warning(f"TTS chunk {i} failed (attempt {attempt + 1}): {result}")
+            
+            if not failed:
+                return chunk_paths
+            pending = failed
+        
+        raise RuntimeError(f"TTS failed for chunks {pending} after {self.config.tts_chunk_retries + 1} attempts")
+    
+    async def _concatenate(self, chunk_paths: List[Path], output_path: Path) -> Path:
+        """Join chunks with short acrossfades so sentence seams are inaudible"""
+        crossfade = self.config.tts_crossfade_seconds
+        
+        cmd = ['ffmpeg', '-y']
+        for path in chunk_paths:
+            cmd += ['-i', str(path)]
+        
+        # [0][1]acrossfade[a1];[a1][2]acrossfade[a2];...
+        filters = []
+        previous = "[0:a]"
+        for i in range(1, len(chunk_paths)):
+            label = f"[a{i}]"
+            filters.append(f"{previous}[{i}:a]acrossfade=d={crossfade}:c1=tri:c2=tri{label}")
+            previous = label
+        
+        cmd += [
+            '-filter_complex', ';'.join(filters),
+            '-map', previous,
+            '-c:a', 'libmp3lame',
+            '-b:a', '192k',
+            str(output_path)
+        ]
+        
+        if output_path.exists():
+            output_path.unlink()
+        
+        # Async subprocess: other jobs keep running while FFmpeg mixes
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"Failed to concatenate TTS chunks: {stderr.decode(errors='ignore')[-500:]}"
+            )
+        
+        self.logger.info(f"Concatenated {len(chunk_paths)} chunks into {output_path}")
+        return output_path
+    
+    async def _save_chunk_timings(self, chunks: List[str], chunk_paths: List[Path]) -> Path:
+        """
+        Write per-sentence timing of the final audio to tts_chunks.json.
+        
+        Each crossfade overlaps neighbouring chunks, so every chunk after the
+        first starts crossfade seconds before the previous one ends.
+        """
+        crossfade = self.config.tts_crossfade_seconds if len(chunk_paths) > 1 else 0.0
+        
+        durations = await asyncio.gather(
+            *(asyncio.to_thread(probe_duration, path) for path in chunk_paths)
+        )
+        
+        timings = []
+        cursor = 0.0
+        for index, (text, path, duration) in enumerate(zip(chunks, chunk_paths, durations)):
+            start = max(0.0, cursor - crossfade) if index else 0.0
+            timings.append({
+                'index': index,
+                'text': text,
+                'start': round(start, 3),
+                'end': round(start + duration, 3),
+                'duration': round(duration, 3),
+                'file': str(path.relative_to(self.job_folder))
+            })
+            cursor = start + duration
+        
+        timings_path = self.job_folder / "tts_chunks.json"
+        with open(timings_path, 'w', encoding='utf-8') as f:
+            json.dump(timings, f, ensure_ascii=False, indent=2)
+        
+        return timings_path
+    
+    def _tts_cache_key(
+        self,
+        text: str,
+        provider: str,
+        voice_id: Optional[str],
+        reference_audio_path: Optional[Path]
+    ) -> Optional[str]:
+        """
+        Cache key for a synthesis request, or None when it must not be cached
+        (cache disabled, or a random seed makes every take different)
+        """
+        if self.tts_cache is None:
+            return None
         
         if provider == "openai":
-            return self._generate_openai(text, voice_id, output_path)
+            model, params = self.openai_model, {}
         elif provider == "elevenlabs":
-            return self._generate_elevenlabs(text, voice_id, output_path)
+            model, params = self.elevenlabs_model, {"output_format": self.elevenlabs_output_format}
         elif provider == "runpod":
-            return self._generate_runpod(text, voice_id, reference_audio_path, output_path)
+            model = self.chatterbox_model
+            params = self._runpod_input("", voice_id, reference_audio_path)
+            params.pop("text")
+            if params.get("seed", -1) < 0:
+                self.logger.info("Random seed requested, bypassing TTS cache")
+                return None
+            if reference_audio_path and reference_audio_path.exists():
+                # Same filename can hold a different reference voice
+                params["reference_sha256"] = file_sha256(reference_audio_path)
+        else:
+            return None
+        
+        return self.tts_cache.make_key(provider, voice_id, model, text, params)
+    
+    async def _synthesize(
+        self,
+        text: str,
+        provider: str,
+        voice_id: Optional[str],
+        reference_audio_path: Optional[Path],
+        output_path: Path
+    ) -> Path:
+        """Call the provider (no caching)"""
+        # A previous result may be a hard link into the cache; never write through it
+        for path in (output_path, alignment_path_for(output_path)):
+            if path.exists():
+                path.unlink()
+        
+        if provider in ("openai", "elevenlabs"):
+            return await self._generate_streamed(text, provider, voice_id, output_path)
+        elif provider == "runpod":
+            return await self._generate_runpod(text, voice_id, reference_audio_path, output_path)
         else:
             raise ValueError(f"Unknown provider: {provider}")
             
-    def _generate_openai(self, text: str, voice_id: str, output_path: Path) -> Path:
-        """Generate using OpenAI TTS"""
-        if not self.openai_client:
-            raise ValueError("OpenAI API key not configured")
-            
-        try:
-            response = self.openai_client.audio.speech.create(
-                model="tts-1",
-                voice=voice_id,
-                input=text
-            )
-            
-            response.stream_to_file(output_path)
-            self.logger.info(f"OpenAI audio saved to {output_path}")
-            return output_path
-            
-        except Exception as e:
-            self.logger.error(f"OpenAI TTS failed: {e}")
-            raise
-    
-    def _generate_elevenlabs(self, text: str, voice_id: str, output_path: Path) -> Path:
-        """Generate using ElevenLabs TTS"""
-        if not self.elevenlabs_client:
-            raise ValueError("ElevenLabs API key not configured")
+    async def stream_audio(
+        self,
+        text: str,
+        provider: str,
+        voice_id: Optional[str],
+        output_path: Path
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream synthesized audio to output_path, yielding each chunk as it lands.
         
-        # Default voice if none provided
-        if not voice_id:
-            voice_id = "JBFqnCBsd6RMkjVDRZzb"  # George - Natural and clear
+        Downstream steps (duration probing, progressive encoding) can start
+        on the partial file before synthesis finishes. Provider character
+        timestamps are written to the alignment sidecar at the end.
+        """
+        adapter = self.adapters.get(provider)
+        if adapter is None:
+            raise ValueError(f"{provider} API key not configured")
         
+        alignment: Dict = {}
+        total_bytes = 0
         try:
-            self.logger.info(f"Generating ElevenLabs audio with voice {voice_id}")
-            
-            # Generate audio using ElevenLabs SDK
-            audio_generator = self.elevenlabs_client.text_to_speech.convert(
-                text=text,
-                voice_id=voice_id,
-                model_id="eleven_multilingual_v2",
-                output_format="mp3_44100_128"
-            )
-            
-            # Write audio to file
             with open(output_path, 'wb') as f:
-                for chunk in audio_generator:
+                async for chunk in adapter.stream(text, voice_id, alignment):
                     f.write(chunk)
-            
-            self.logger.info(f"ElevenLabs audio saved to {output_path}")
-            return output_path
-            
+                    f.flush()
+                    total_bytes += len(chunk)
+                    yield chunk
         except Exception as e:
-            self.logger.error(f"ElevenLabs TTS failed: {e}")
+            self.logger.error(f"{provider} TTS failed: {e}")
             raise
-            
-    def _generate_runpod(
-        self, 
-        text: str, 
-        voice_id: Optional[str], 
-        reference_audio_path: Optional[Path], 
-        output_path: Path
-    ) -> Path:
-        """Generate using RunPod Chatterbox"""
-        if not self.config.runpod_api_key or not self.config.runpod_endpoint_id:
-            raise ValueError("RunPod credentials not configured")
-            
-        # Use /run endpoint (not /runsync) as per Chatterbox documentation
-        endpoint_url = f"https://api.runpod.ai/v2/{self.config.runpod_endpoint_id}/run"
         
-        headers = {
-            "Authorization": f"Bearer {self.config.runpod_api_key}",
-            "Content-Type": "application/json"
-        }
+        if alignment.get('characters'):
+            with open(alignment_path_for(output_path), 'w', encoding='utf-8') as f:
+                json.dump(alignment, f, ensure_ascii=False)
         
+        self.logger.info(f"{provider} audio streamed to {output_path} ({total_bytes} bytes)")
+    
+    async def _generate_streamed(self, text: str, provider: str, voice_id: Optional[str], output_path: Path) -> Path:
+        """Drain stream_audio into output_path"""
+        async for _ in self.stream_audio(text, provider, voice_id, output_path):
+            pass
+        return output_path
+            
+    def _runpod_input(
+        self,
+        text: str,
+        voice_id: Optional[str],
+        reference_audio_path: Optional[Path]
+    ) -> Dict:
+        """Chatterbox job input (also the parameter set used for TTS cache keys)"""
         # Construct payload based on Chatterbox API documentation
         input_data = {
             "text": text,
@@ -137,7 +377,7 @@ class VoiceGenerator:
             "temperature": 0.7,
             "exaggeration": 0.5,
             "cfg_weight": 3.0,
-            "seed": -1,
+            "seed": self.config.tts_seed,
             "speed_factor": 1.0,
             "language": "en"
         }
@@ -145,7 +385,6 @@ class VoiceGenerator:
         # Handle Voice Cloning vs Predefined
         if reference_audio_path and reference_audio_path.exists():
             # Voice Cloning
-            self.logger.info(f"Using voice cloning with reference: {reference_audio_path.name}")
             input_data["voice_mode"] = "clone"
             input_data["reference_audio_filename"] = reference_audio_path.name
             # Note: For voice cloning, the reference audio needs to be uploaded to the server first
@@ -155,74 +394,67 @@ class VoiceGenerator:
             input_data["voice_mode"] = "predefined"
             if voice_id:
                 input_data["predefined_voice_id"] = voice_id
-            
-        payload = {
-            "input": input_data
-        }
+        
+        return input_data
+    
+    async def _generate_runpod(
+        self, 
+        text: str, 
+        voice_id: Optional[str], 
+        reference_audio_path: Optional[Path], 
+        output_path: Path
+    ) -> Path:
+        """Generate using RunPod Chatterbox"""
+        if not self.config.runpod_api_key or not self.config.runpod_endpoint_id:
+            raise ValueError("RunPod credentials not configured")
+        
+        input_data = self._runpod_input(text, voice_id, reference_audio_path)
+        if input_data["voice_mode"] == "clone":
+            self.logger.info(f"Using voice cloning with reference: {reference_audio_path.name}")
+        
+        runpod = RunPodClient(
+            api_key=self.config.runpod_api_key,
+            endpoint=self.config.runpod_endpoint_id,
+            logger=self.logger,
+            webhook_base_url=self.config.runpod_webhook_base_url,
+            webhook_secret=self.config.runpod_webhook_secret,
+            poll_initial_interval=self.config.runpod_poll_initial_interval,
+            poll_max_interval=self.config.runpod_poll_max_interval,
+            job_timeout=self.config.runpod_job_timeout
+        )
         
         try:
-            self.logger.info(f"Sending request to RunPod: {endpoint_url}")
-            response = requests.post(endpoint_url, json=payload, headers=headers, timeout=120)
-            response.raise_for_status()
+            # /run + backoff polling (5 min covers cold starts)
+            self.logger.info(f"Sending request to RunPod: {runpod.endpoint_url}")
+            status_result = await runpod.run(input_data)
             
-            result = response.json()
-            self.logger.info(f"RunPod response: {result}")
+            output = status_result.get("output")
+            if not output:
+                raise ValueError(f"No output in completed job: {status_result}")
             
-            # RunPod /run endpoint returns a job ID, we need to poll for results
-            # Or use /runsync for synchronous response
-            # Let's try /runsync instead for simplicity
-            if "id" in result:
-                job_id = result["id"]
-                self.logger.info(f"Job submitted: {job_id}. Polling for results...")
-                
-                # Poll for results
-                status_url = f"https://api.runpod.ai/v2/{self.config.runpod_endpoint_id}/status/{job_id}"
-                max_attempts = 150  # 150 attempts * 2 seconds = 5 minutes max (for cold starts)
-                
-                for attempt in range(max_attempts):
-                    import time
-                    time.sleep(2)
-                    
-                    status_response = requests.get(status_url, headers=headers)
-                    status_response.raise_for_status()
-                    status_result = status_response.json()
-                    
-                    status = status_result.get("status")
-                    self.logger.info(f"Job status: {status}")
-                    
-                    if status == "COMPLETED":
-                        output = status_result.get("output")
-                        if not output:
-                            raise ValueError(f"No output in completed job: {status_result}")
-                        
-                        # Download audio from output
-                        if isinstance(output, str) and output.startswith("http"):
-                            audio_data = requests.get(output).content
-                        elif isinstance(output, dict) and "audio_url" in output:
-                            audio_data = requests.get(output["audio_url"]).content
-                        elif isinstance(output, dict) and "audio_base64" in output:
-                            import base64
-                            audio_data = base64.b64decode(output["audio_base64"])
-                        else:
-                            raise ValueError(f"Unknown output format: {output}")
-                        
-                        # Save audio
-                        with open(output_path, 'wb') as f:
-                            f.write(audio_data)
-                        
-                        self.logger.info(f"Audio saved to {output_path}")
-                        return output_path
-                        
-                    elif status == "FAILED":
-                        error = status_result.get("error", "Unknown error")
-                        raise ValueError(f"RunPod job failed: {error}")
-                    
-                    # Continue polling if IN_QUEUE or IN_PROGRESS
-                
-                raise TimeoutError(f"Job {job_id} did not complete within timeout")
+            # Download audio from output
+            if isinstance(output, str) and output.startswith("http"):
+                audio_data = await self._download(output)
+            elif isinstance(output, dict) and "audio_url" in output:
+                audio_data = await self._download(output["audio_url"])
+            elif isinstance(output, dict) and "audio_base64" in output:
+                audio_data = base64.b64decode(output["audio_base64"])
             else:
-                raise ValueError(f"Unexpected response format: {result}")
+                raise ValueError(f"Unknown output format: {output}")
+            
+            # Save audio
+            with open(output_path, 'wb') as f:
+                f.write(audio_data)
+            
+            self.logger.info(f"Audio saved to {output_path}")
+            return output_path
                 
-        except requests.exceptions.HTTPError as e:
+        except (httpx.HTTPError, RunPodJobError) as e:
             self.logger.error(f"RunPod TTS failed: {e}")
             raise
+    
+    @staticmethod
+    async def _download(url: str) -> bytes:
+        response = await get_gateway().get(url, timeout=120.0)
+        response.raise_for_status()
+        return response.content
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI
+
+from modules.runpod_client import RunPodClient, RunPodJobError, deliver_webhook, verify_webhook_token
+
+# Exercise RunPodClient against a local fake RunPod server (no credits used)
+HOST, PORT = "127.0.0.1", 8765
+API_BASE = f"http://{HOST}:{PORT}/v2"
+
+fake = FastAPI()
+jobs = {}
+cancelled = set()
+
+
+@fake.post("/v2/{endpoint}/run")
+async def fake_run(endpoint: str, body: dict):
+    job_id = f"job-{len(jobs) + 1}"
+    # endpoint name picks the scenario: ok / fail / hang
+    jobs[job_id] = {"scenario": endpoint, "polls": 0, "webhook": body.get("webhook")}
+    return {"id": job_id, "status": "IN_QUEUE"}
+
+
+@fake.get("/v2/{endpoint}/status/{job_id}")
+async def fake_status(endpoint: str, job_id: str):
+    job = jobs[job_id]
+    job["polls"] += 1
+    if job_id in cancelled:
+        return {"id": job_id, "status": "CANCELLED"}
+    if job["scenario"] == "ok" and job["polls"] >= 3:
+        return {"id": job_id, "status": "COMPLETED", "output": {"text": "hello"}}
+    if job["scenario"] == "fail" and job["polls"] >= 2:
+        return {"id": job_id, "status": "FAILED", "error": "worker crashed"}
+    return {"id": job_id, "status": "IN_PROGRESS"}
+
+
+@fake.post("/v2/{endpoint}/cancel/{job_id}")
+async def fake_cancel(endpoint: str, job_id: str):
+    cancelled.add(job_id)
+    return {"id": job_id, "status": "CANCELLED"}
+
+
+def make_client(endpoint: str, **kwargs) -> RunPodClient:
+    return RunPodClient(
+        api_key="test",
+        endpoint=endpoint,
+        logger=logging.getLogger("RunPodClientTest"),
+        poll_initial_interval=0.05,
+        poll_max_interval=0.2,
+        api_base=API_BASE,
+        **kwargs
+    )
+
+
+async def check_completes():
+    result = await make_client("ok").run({"text": "hi"})
+    assert result["status"] == "COMPLETED" and result["output"] == {"text": "hello"}, result
+    print("✅ completes via backoff polling")
+
+
+async def check_failure():
+    try:
+        await make_client("fail").run({"text": "hi"})
+    except RunPodJobError as e:
+        assert "worker crashed" in str(e)
+        print("✅ failed job raises RunPodJobError")
+        return
+    raise AssertionError("expected RunPodJobError")
+
+
+async def check_timeout_cancels():
+    try:
+        await make_client("hang").run({"text": "hi"}, timeout=0.5)
+    except RunPodJobError:
+        job_id = f"job-{len(jobs)}"
+        assert job_id in cancelled, cancelled
+        print("✅ timeout cancels the remote job")
+        return
+    raise AssertionError("expected timeout")
+
+
+async def check_caller_cancel():
+    task = asyncio.create_task(make_client("hang").run({"text": "hi"}))
+    await asyncio.sleep(0.3)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    job_id = f"job-{len(jobs)}"
+    assert job_id in cancelled, cancelled
+    print("✅ caller cancellation (client disconnect) cancels the remote job")
+
+
+async def check_webhook():
+    client = make_client("hang", webhook_base_url="http://localhost:8000", webhook_secret="s3cret")
+    task = asyncio.create_task(client.run({"text": "hi"}))
+    await asyncio.sleep(0.2)
+
+    job_id = f"job-{len(jobs)}"
+    assert jobs[job_id]["webhook"] == "http://localhost:8000/runpod/webhook?token=s3cret"
+    assert deliver_webhook({"id": job_id, "status": "COMPLETED", "output": {"text": "pushed"}})
+
+    result = await asyncio.wait_for(task, timeout=2)
+    assert result["output"] == {"text": "pushed"}, result
+    print("✅ webhook completes the job without waiting for polling")
+
+
+async def check_webhook_requires_secret():
+    client = make_client("ok", webhook_base_url="http://localhost:8000")
+    assert client.webhook_url is None
+    await client.run({"text": "hi"})
+    assert jobs[f"job-{len(jobs)}"]["webhook"] is None
+    assert not verify_webhook_token(None, "")
+    assert not verify_webhook_token("anything", "")
+    assert not verify_webhook_token("wrong", "s3cret")
+    assert verify_webhook_token("s3cret", "s3cret")
+    print("✅ webhooks are neither registered nor accepted without a secret")
+
+
+async def main():
+    await check_completes()
+    await check_failure()
+    await check_timeout_cancels()
+    await check_caller_cancel()
+    await check_webhook()
+    await check_webhook_requires_secret()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    server = uvicorn.Server(uvicorn.Config(fake, host=HOST, port=PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        asyncio.run(main())
+        print("\n✅ All RunPod client checks passed")
+    finally:
+        server.should_exit = True
+        thread.join()
@@ -0,0 +1,373 @@
+"""
+Process-wide gateway for outbound HTTP calls (OpenRouter, RunPod, TTS
+providers, tmpfiles).
+
+Every provider gets a pooled keep-alive client per host (HTTP/2 when the
+h2 package is installed), a token-bucket rate limit, a concurrency cap,
+retries with exponential backoff for transient failures, and a circuit
+breaker that fails fast while a provider is down. Under load, jobs queue
+behind the limits instead of stampeding the upstream API.
+"""
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Status codes worth retrying (rate limited / upstream overloaded)
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is open"""
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single trial call through
+    (half-open). A success closes it again; a trial that ends without a
+    verdict (cancelled, or a non-HTTP error) must be given back with
+    release_trial() so the next call can try.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Free the half-open trial slot without counting a success or failure"""
+        self.trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class ProviderPolicy:
+    """Limits applied to one upstream provider"""
+
+    def __init__(
+        self,
+        hosts: tuple,
+        requests_per_second: float = 5.0,
+        burst: int = 10,
+        max_concurrency: int = 16,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        self.hosts = hosts
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+
+DEFAULT_POLICIES: Dict[str, ProviderPolicy] = {
+    'openrouter': ProviderPolicy(('openrouter.ai',), requests_per_second=2.0, burst=5, max_concurrency=8),
+    'runpod': ProviderPolicy(('api.runpod.ai',), requests_per_second=5.0, burst=10, max_concurrency=16),
+    'tmpfiles': ProviderPolicy(('tmpfiles.org',), requests_per_second=1.0, burst=2, max_concurrency=2),
+    'openai': ProviderPolicy(('api.openai.com',), requests_per_second=5.0, burst=10, max_concurrency=8),
+    'elevenlabs': ProviderPolicy(('api.elevenlabs.io',), requests_per_second=2.0, burst=4, max_concurrency=4),
+    'default': ProviderPolicy((), requests_per_second=10.0, burst=20, max_concurrency=32),
+}
+
+
+class _ProviderState:
+    """Runtime limiters for one provider (bound to the running event loop)"""
+
+    def __init__(self, policy: ProviderPolicy):
+        self.policy = policy
+        self.bucket = TokenBucket(policy.requests_per_second, policy.burst)
+        self.semaphore = asyncio.Semaphore(policy.max_concurrency)
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+
+
+class OutboundGateway:
+    """Pooled, rate-limited, retrying HTTP client shared by all modules"""
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, ProviderPolicy]] = None,
+        http2: bool = True,
+        max_keepalive_connections: int = 20,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.policies = dict(policies or DEFAULT_POLICIES)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=60.0
+        )
+        self.logger = logger or logging.getLogger("OutboundGateway")
+
+        self._loop = None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._providers: Dict[str, _ProviderState] = {}
+
+    def _bind_loop(self) -> None:
+        """Clients, locks and semaphores belong to one event loop; reset on a new one"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._clients = {}
+            self._providers = {}
+
+    def provider_for(self, url: str) -> str:
+        host = urlsplit(url).hostname or ''
+        for name, policy in self.policies.items():
+            if any(host == h or host.endswith('.' + h) for h in policy.hosts):
+                return name
+        return 'default'
+
+    def _state(self, provider: str) -> _ProviderState:
+        if provider not in self._providers:
+            policy = self.policies.get(provider) or self.policies['default']
+            self._providers[provider] = _ProviderState(policy)
+        return self._providers[provider]
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """Keep-alive client for the URL's scheme + host (created on first use)"""
+        self._bind_loop()
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=60.0,
+                follow_redirects=True
+            )
+            self._clients[origin] = client
+        return client
+
+    def _backoff(self, policy: ProviderPolicy, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Exponential backoff with full jitter; honours Retry-After when given"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return min(float(retry_after), policy.backoff_max)
+                except ValueError:
+                    pass
+        return random.uniform(0, min(policy.backoff_max, policy.backoff_base * 2 ** attempt))
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        provider: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the provider's limits.
+
+        Retries 429/502/503/504 and connection failures (the request never
+        reached the server, so POSTs are safe to resend). Other responses
+        are returned as-is; callers still call raise_for_status().
+
+        Raises:
+            CircuitOpenError: provider is failing and the breaker is open
+        """
+        client = self.client_for(url)
+        provider = provider or self.provider_for(url)
+        state = self._state(provider)
+        policy = state.policy
+        retries = policy.max_retries if max_retries is None else max_retries
+
+        for attempt in range(retries + 1):
+            is_trial = state.breaker.state == "half_open"
+            if not state.breaker.allow():
+                raise CircuitOpenError(
+                    f"Circuit open for {provider}, retry in {policy.reset_timeout:.0f}s"
+                )
+
+            response = None
+            error = None
+
+            try:
+                await state.bucket.acquire()
+                async with state.semaphore:
+                    try:
+                        response = await client.request(method, url, **kwargs)
+                    except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                        error = e
+            except httpx.TransportError:
+                # Request may have been processed; don't resend, but count it
+                state.breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled (lost hedge, client disconnect) or not an HTTP
+                # failure: no verdict on the provider, but never keep the
+                # half-open trial slot, or the breaker stays open for good
+                if is_trial:
+                    state.breaker.release_trial()
+                raise
+
+            retryable = error is not None or response.status_code in RETRY_STATUS_CODES
+            if not retryable:
+                if response.status_code >= 500:
+                    state.breaker.record_failure()
+                else:
+                    state.breaker.record_success()
+                return response
+
+            state.breaker.record_failure()
+            if attempt == retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._backoff(policy, attempt, response)
+            reason = error or f"HTTP {response.status_code}"
+            self.logger.warning(
+                f"{provider} request failed ({reason}), retry {attempt + 1}/{retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        provider: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streaming response through the provider's limits.
+
+        The concurrency slot is held until the body has been consumed.
+        Streams are never retried (part of the body may already have been
+        used), so 429/5xx responses are returned for the caller to handle.
+
+        Raises:
+            CircuitOpenError: provider is failing and the breaker is open
+        """
+        client = self.client_for(url)
+        provider = provider or self.provider_for(url)
+        state = self._state(provider)
+
+        is_trial = state.breaker.state == "half_open"
+        if not state.breaker.allow():
+            raise CircuitOpenError(
+                f"Circuit open for {provider}, retry in {state.policy.reset_timeout:.0f}s"
+            )
+
+        try:
+            await state.bucket.acquire()
+            async with state.semaphore:
+                async with client.stream(method, url, **kwargs) as response:
+                    if response.status_code >= 500 or response.status_code == 429:
+                        state.breaker.record_failure()
+                    else:
+                        state.breaker.record_success()
+                    yield response
+        except httpx.TransportError:
+            state.breaker.record_failure()
+            raise
+        except BaseException:
+            # Same as request(): a cancelled trial must not wedge the breaker
+            if is_trial:
+                state.breaker.release_trial()
+            raise
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients = {}
+
+
+_gateway: Optional[OutboundGateway] = None
+
+
+def get_gateway() -> OutboundGateway:
+    """The shared gateway (created with default policies on first use)"""
+    global _gateway
+    if _gateway is None:
+        _gateway = OutboundGateway()
+    return _gateway
+
+
+def configure_gateway(policies: Dict[str, ProviderPolicy], http2: bool = True) -> OutboundGateway:
+    """Replace the shared gateway, e.g. with limits from settings at startup"""
+    global _gateway
+    _gateway = OutboundGateway(policies, http2=http2)
+    return _gateway